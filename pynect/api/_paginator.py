@@ -1,15 +1,87 @@
-from typing import Any, Callable, Optional
-from concurrent.futures import ThreadPoolExecutor
+import time
+from collections import deque
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                wait)
+from typing import Any, Callable, Deque, Iterator, Optional, Set
+
+from requests import RequestException, Response, Session
+
+from ..utils.query_helpers import RestAPIQuery
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def get_with_retries(
+    session: Session,
+    url: str,
+    retries: int = 3,
+    backoff: float = 0.5,
+    timeout: Optional[float] = None,
+    rate_limiter: Optional[Any] = None,
+) -> Response:
+    """
+    Requests url, retrying connection errors and retryable statuses with
+    exponential backoff. With a rate_limiter, see rate_limit.RateLimiter,
+    every attempt goes through it.
+
+    Raises:
+        RequestException: if the request still fails after every retry
+    """
+    for attempt in range(retries + 1):
+        last_attempt = attempt == retries
+        try:
+            if rate_limiter is None:
+                response = session.get(url, timeout=timeout)
+            else:
+                response = rate_limiter.send(
+                    lambda: session.get(url, timeout=timeout))
+        except RequestException:
+            if last_attempt:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                response.raise_for_status()
+                return response
+        time.sleep(backoff * 2 ** attempt)
 
 
 class ApiPaginator:
-    # testing somethign
+    """
+    Builds the url of every page of a numbered pagination and fetches them
+    concurrently with at most max_workers threads.
+
+    Args:
+        total_pages (int): amount of pages
+        page_param_name (str): query parameter with the page number
+        query_builder (Callable[..., str]): builds the url of a page, e.g.
+            a RestAPIQuery
+        index (int, optional): number of the first page. [1]
+        path_params (Optional[str], optional): path after the base url. [None]
+        session (Optional[Session], optional): session used to fetch the
+            pages, usually Authentication.session. [None]
+        max_workers (int, optional): max concurrent requests. [8]
+        retries (int, optional): extra attempts for a page that fails with a
+            connection error or a retryable status. [3]
+        backoff (float, optional): seconds to wait before the first retry,
+            doubled on every attempt. [0.5]
+        timeout (Optional[float], optional): request timeout. [None]
+        rate_limiter (Optional[RateLimiter], optional): limits the requests
+            of the paginator. [None]
+        **kwargs: static query parameters
+    """
+
     def __init__(self,
                  total_pages: int,
                  page_param_name: str,
                  query_builder: Callable[..., str],
                  index: int = 1,
                  path_params: Optional[str] = None,
+                 session: Optional[Session] = None,
+                 max_workers: int = 8,
+                 retries: int = 3,
+                 backoff: float = 0.5,
+                 timeout: Optional[float] = None,
+                 rate_limiter: Optional[Any] = None,
                  **kwargs
                  ) -> None:
         self.__total_pages = total_pages
@@ -17,20 +89,97 @@ class ApiPaginator:
         self.__query = query_builder
         self.__index = index
         self.__path_params = path_params
+        self.__session = session
+        self.__max_workers = max(1, max_workers)
+        self.__retries = retries
+        self.__backoff = backoff
+        self.__timeout = timeout
+        self.__rate_limiter = rate_limiter
         self.__kwargs = kwargs
+        self.__template = (
+            query_builder.compile(path_params, **kwargs)
+            if isinstance(query_builder, RestAPIQuery) else None)
 
-    def build_query(self, index: int) -> str:
-        if self.__index == self.__total_pages:
-            raise StopIteration
-        query = self.__query(
+    @property
+    def pages(self) -> range:
+        """Numbers of the pages fetched by iter_pages"""
+        return range(self.__index, self.__index + self.__total_pages)
+
+    def __build_url(self, index: int) -> str:
+        if self.__template is not None:
+            return self.__template(**{self.__page_param_name: index})
+        return self.__query(
             path_params=self.__path_params,
             **{self.__page_param_name: index},
             **self.__kwargs,
         )
-        return query
+
+    def build_query(self, index: int) -> str:
+        if self.__index == self.__total_pages:
+            raise StopIteration
+        return self.__build_url(index)
+
+    def fetch_page(self, index: int) -> Response:
+        """
+        Requests a page, retrying connection errors and retryable statuses
+        with exponential backoff.
+
+        Raises:
+            RequestException: if the page still fails after every retry
+        """
+        if self.__session is None:
+            raise ValueError('A session is required to fetch pages')
+        return get_with_retries(self.__session, self.__build_url(index),
+                                self.__retries, self.__backoff,
+                                self.__timeout, self.__rate_limiter)
+
+    def iter_pages(self, ordered: bool = True) -> Iterator[Response]:
+        """
+        Generator that fetches every page and yields the responses, in page
+        order or as they complete. At most twice max_workers pages are
+        fetched ahead of the consumer.
+        """
+        pages = iter(self.pages)
+        in_flight = 2 * self.__max_workers
+        with ThreadPoolExecutor(self.__max_workers) as pool:
+            if ordered:
+                futures: Deque[Future] = deque(
+                    pool.submit(self.fetch_page, i)
+                    for _, i in zip(range(in_flight), pages))
+                try:
+                    while futures:
+                        response = futures.popleft().result()
+                        if (i := next(pages, None)) is not None:
+                            futures.append(pool.submit(self.fetch_page, i))
+                        yield response
+                finally:
+                    for future in futures:
+                        future.cancel()
+            else:
+                pending: Set[Future] = {
+                    pool.submit(self.fetch_page, i)
+                    for _, i in zip(range(in_flight), pages)}
+                try:
+                    while pending:
+                        done, pending = wait(
+                            pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            if (i := next(pages, None)) is not None:
+                                pending.add(pool.submit(self.fetch_page, i))
+                            yield future.result()
+                finally:
+                    for future in pending:
+                        future.cancel()
+
+    def __iter__(self) -> Iterator[Response]:
+        return self.iter_pages()
+
+    def fetch_all(self, ordered: bool = True) -> list[Response]:
+        return list(self.iter_pages(ordered))
 
     def __call__(self) -> Any:
-        pool = ThreadPoolExecutor(self.__total_pages)
+        pool = ThreadPoolExecutor(
+            min(self.__max_workers, max(1, self.__total_pages)))
         results = [pool.submit(self.build_query, i)
                    for i in range(0, self.__total_pages)]
         pool.shutdown()
@@ -0,0 +1,280 @@
+import asyncio
+from collections import deque
+from typing import (AsyncIterator, Callable, Deque, Generator, Optional,
+                    Set)
+
+from ..utils.query_helpers import RestAPIQuery
+from .authentication import Authentication, BearerAuthentication
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def require_httpx():
+    if httpx is None:
+        raise ImportError(
+            'httpx is required for the async client, install it with '
+            '"pip install pynect[async]"')
+
+
+class _BearerTokenAuth(httpx.Auth if httpx is not None else object):
+    """
+    Sets the current token of a BearerAuthentication on every request, so
+    tokens refreshed by its TokenCache are used, and retries a request
+    rejected with 401 once with a new token. Token fetches run in a thread
+    to not block the event loop.
+    """
+
+    def __init__(self, auth: BearerAuthentication):
+        self.auth = auth
+
+    def auth_flow(self, request: 'httpx.Request'
+                  ) -> Generator['httpx.Request', 'httpx.Response', None]:
+        request.headers['Authorization'] = f'Bearer {self.auth.token}'
+        response = yield request
+        if response.status_code == 401:
+            request.headers['Authorization'] = \
+                f'Bearer {self.auth.refresh_token()}'
+            yield request
+
+    async def async_auth_flow(self, request: 'httpx.Request'
+                              ) -> AsyncIterator['httpx.Request']:
+        token = await asyncio.to_thread(lambda: self.auth.token)
+        request.headers['Authorization'] = f'Bearer {token}'
+        response = yield request
+        if response.status_code == 401:
+            token = await asyncio.to_thread(self.auth.refresh_token)
+            request.headers['Authorization'] = f'Bearer {token}'
+            yield request
+
+
+class AsyncSessionAdapter:
+    """
+    Builds an httpx.AsyncClient with the headers, auth and TLS settings
+    that an Authentication configured on its requests session, so every
+    authentication type can be used from asyncio code. Bearer tokens are
+    read from the TokenCache of the authentication on every request.
+
+    Args:
+        auth (Authentication): authentication object, called first if its
+            session has no credentials yet
+        max_connections (int, optional): connection pool size. [100]
+        timeout (Optional[float], optional): request timeout. [30]
+        transport (Optional[httpx.AsyncBaseTransport], optional): e.g. a
+            MockTransport. [None]
+    """
+
+    def __init__(self, auth: Authentication, max_connections: int = 100,
+                 timeout: Optional[float] = 30,
+                 transport: Optional['httpx.AsyncBaseTransport'] = None):
+        require_httpx()
+        self.auth = auth
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.transport = transport
+        self.__client: Optional['httpx.AsyncClient'] = None
+
+    def client(self) -> 'httpx.AsyncClient':
+        session = self.auth.session
+        if 'Authorization' not in session.headers and session.auth is None:
+            self.auth()
+        headers = dict(session.headers)
+        auth = None
+        if isinstance(self.auth, BearerAuthentication):
+            # The header only holds the token of the time it was set
+            headers.pop('Authorization', None)
+            auth = _BearerTokenAuth(self.auth)
+        elif isinstance(session.auth, tuple):
+            auth = httpx.BasicAuth(*session.auth)
+        # Other authentication types set a static Authorization header
+        return httpx.AsyncClient(
+            headers=headers,
+            auth=auth,
+            transport=self.transport,
+            verify=session.verify,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections),
+        )
+
+    async def __aenter__(self) -> 'httpx.AsyncClient':
+        self.__client = self.client()
+        return self.__client
+
+    async def __aexit__(self, *args):
+        await self.__client.aclose()
+        self.__client = None
+
+
+class AsyncApiClient:
+    """
+    Async counterpart of the PSelect, PUpdate and PDelete protocols.
+
+    Protocols:
+    * PAsyncSelect
+    * PAsyncUpdate
+    * PAsyncDelete
+
+    Args:
+        client (httpx.AsyncClient): e.g. from an AsyncSessionAdapter
+        base_url (str): url the endpoints are relative to
+    """
+
+    def __init__(self, client: 'httpx.AsyncClient', base_url: str):
+        self.client = client
+        self.base_url = base_url.rstrip('/')
+
+    def url(self, endpoint: Optional[str] = None) -> str:
+        return f'{self.base_url}/{endpoint}' if endpoint else self.base_url
+
+    async def select(self, endpoint: Optional[str] = None,
+                     params: Optional[dict] = None,
+                     **kwargs) -> 'httpx.Response':
+        return await self.client.get(self.url(endpoint), params=params,
+                                     **kwargs)
+
+    async def update(self, data: dict, endpoint: Optional[str] = None,
+                     params: Optional[dict] = None,
+                     **kwargs) -> 'httpx.Response':
+        return await self.client.put(self.url(endpoint), json=data,
+                                     params=params, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs) -> 'httpx.Response':
+        return await self.client.delete(self.url(endpoint), **kwargs)
+
+
+class AsyncApiPaginator:
+    """
+    Async counterpart of ApiPaginator. Keeps up to max_concurrency requests
+    in flight on one event loop instead of one thread per request.
+
+    Args:
+        total_pages (int): amount of pages
+        page_param_name (str): query parameter with the page number
+        query_builder (Callable[..., str]): builds the url of a page
+        client (httpx.AsyncClient): client used to fetch the pages
+        index (int, optional): number of the first page. [1]
+        path_params (Optional[str], optional): path after the base url. [None]
+        max_concurrency (int, optional): max requests in flight. [100]
+        retries (int, optional): extra attempts for a failed page. [3]
+        backoff (float, optional): seconds to wait before the first retry,
+            doubled on every attempt. [0.5]
+        **kwargs: static query parameters
+    """
+
+    def __init__(self,
+                 total_pages: int,
+                 page_param_name: str,
+                 query_builder: Callable[..., str],
+                 client: 'httpx.AsyncClient',
+                 index: int = 1,
+                 path_params: Optional[str] = None,
+                 max_concurrency: int = 100,
+                 retries: int = 3,
+                 backoff: float = 0.5,
+                 **kwargs
+                 ) -> None:
+        require_httpx()
+        self.__total_pages = total_pages
+        self.__page_param_name = page_param_name
+        self.__query = query_builder
+        self.__client = client
+        self.__index = index
+        self.__path_params = path_params
+        self.__max_concurrency = max(1, max_concurrency)
+        self.__retries = retries
+        self.__backoff = backoff
+        self.__kwargs = kwargs
+        self.__template = (
+            query_builder.compile(path_params, **kwargs)
+            if isinstance(query_builder, RestAPIQuery) else None)
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def pages(self) -> range:
+        return range(self.__index, self.__index + self.__total_pages)
+
+    def build_query(self, index: int) -> str:
+        if self.__template is not None:
+            return self.__template(**{self.__page_param_name: index})
+        return self.__query(
+            path_params=self.__path_params,
+            **{self.__page_param_name: index},
+            **self.__kwargs,
+        )
+
+    async def fetch_page(self, index: int) -> 'httpx.Response':
+        """
+        Requests a page, retrying connection errors and retryable statuses
+        with exponential backoff.
+
+        Raises:
+            httpx.HTTPError: if the page still fails after every retry
+        """
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.__max_concurrency)
+        url = self.build_query(index)
+        for attempt in range(self.__retries + 1):
+            last_attempt = attempt == self.__retries
+            try:
+                async with self.__semaphore:
+                    response = await self.__client.get(url)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES \
+                        or last_attempt:
+                    response.raise_for_status()
+                    return response
+            await asyncio.sleep(self.__backoff * 2 ** attempt)
+
+    async def iter_pages(
+        self, ordered: bool = True
+    ) -> AsyncIterator['httpx.Response']:
+        """
+        Async generator that fetches every page and yields the responses, in
+        page order or as they complete. At most max_concurrency pages are
+        fetched ahead of the consumer.
+        """
+        pages = iter(self.pages)
+
+        def schedule(i: int) -> asyncio.Task:
+            return asyncio.ensure_future(self.fetch_page(i))
+
+        window = zip(range(self.__max_concurrency), pages)
+        if ordered:
+            tasks: Deque[asyncio.Task] = deque(schedule(i) for _, i in window)
+            try:
+                while tasks:
+                    response = await tasks.popleft()
+                    if (i := next(pages, None)) is not None:
+                        tasks.append(schedule(i))
+                    yield response
+            finally:
+                for task in tasks:
+                    task.cancel()
+        else:
+            pending: Set[asyncio.Task] = {schedule(i) for _, i in window}
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if (i := next(pages, None)) is not None:
+                            pending.add(schedule(i))
+                        yield task.result()
+            finally:
+                for task in pending:
+                    task.cancel()
+
+    def __aiter__(self) -> AsyncIterator['httpx.Response']:
+        return self.iter_pages()
+
+    async def fetch_all(self, ordered: bool = True) -> list:
+        return [response async for response in self.iter_pages(ordered)]
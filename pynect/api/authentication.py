@@ -1,11 +1,17 @@
-from abc import ABC, abstractmethod
+import json
+from abc import ABC
 from enum import Enum
-from typing import Dict, Optional
+from threading import Lock
+from typing import Any, Dict, List, Optional
 
 from oauthlib.oauth2 import BackendApplicationClient
-from requests import Session
+from requests import PreparedRequest, Response, Session
+from requests.auth import AuthBase
 from requests_oauthlib import OAuth2Session
 
+from .session import SessionOptions, build_session, session_pool_stats
+from .token_cache import TokenCache, default_token_cache
+
 
 class AuthenticationEnum(str, Enum):
     BASIC = 'basic'
@@ -14,61 +20,124 @@ class AuthenticationEnum(str, Enum):
 
 
 class Authentication:
-    def __init__(self):
-        self.session: Session = Session()
+    """
+    Base class of the authentication types.
+
+    Args:
+        session_options (Optional[SessionOptions], optional): connection
+            pool, retry and timeout settings of the session. [None]
+    """
+
+    def __init__(self, session_options: Optional[SessionOptions] = None):
+        self.session: Session = build_session(session_options)
 
     def __call__(self):
         raise NotImplementedError
 
+    def pool_stats(self) -> List[Dict[str, Any]]:
+        """Connection pool usage of the session, per host"""
+        return session_pool_stats(self.session)
+
 # API Keys
 # AWS Signatures
 # Kerberos
 
 
+class _CachedBearerAuth(AuthBase):
+    """Sets the current cached token on every request"""
+
+    def __init__(self, auth: 'BearerAuthentication'):
+        self.auth = auth
+
+    def __call__(self, request: PreparedRequest) -> PreparedRequest:
+        request.headers['Authorization'] = f'Bearer {self.auth.token}'
+        return request
+
+
 class BearerAuthentication(Authentication):
     """Class for configuring bearer token auth.
 
+    Tokens are shared through a TokenCache by every instance with the same
+    client_id and token_url, refreshed before they expire, and a request
+    rejected with 401 is retried once with a new token.
+
     Args:
         Authentication ([type]): Extends Authentication
+        token_cache (Optional[TokenCache], optional): cache of the tokens.
+            [the process wide cache]
     """
 
-    def __init__(self, client_id: str, client_secret: str, token_url: str):
-        Authentication.__init__(self)
+    def __init__(self, client_id: str, client_secret: str, token_url: str,
+                 token_cache: Optional[TokenCache] = None,
+                 session_options: Optional[SessionOptions] = None):
+        Authentication.__init__(self, session_options)
         self.__client_id = client_id
         self.__client_secret = client_secret
         self.__token_url = token_url
+        self.__token_cache = token_cache or default_token_cache
 
-    def __call__(self):
-        """
-        Initialize Session information. Fetch the user token and configures
-        it in the session headers.
-        """
+    @property
+    def token_key(self) -> str:
+        return f'{self.__token_url}|{self.__client_id}'
+
+    @property
+    def token(self) -> str:
+        return self.__token_cache.get(self.token_key, self.__fetch_token)
+
+    def __fetch_token(self) -> dict:
         client = BackendApplicationClient(client_id=self.__client_id)
         oauth = OAuth2Session(client=client)
-        token = oauth.fetch_token(
+        return oauth.fetch_token(
             token_url=self.__token_url,
             include_client_id=self.__client_id,
             client_secret=self.__client_secret
         )
-        access_token = token['access_token']
-        self.session.headers = {
+
+    def refresh_token(self) -> str:
+        """Drops the cached token, e.g. after a 401, and fetches a new one"""
+        self.__token_cache.invalidate(self.token_key)
+        return self.token
+
+    def __retry_unauthorized(self, response: Response, *args,
+                             **kwargs) -> Response:
+        request = response.request
+        if response.status_code != 401 or getattr(
+                request, 'token_retried', False):
+            return response
+        retry = request.copy()
+        retry.token_retried = True
+        retry.headers['Authorization'] = f'Bearer {self.refresh_token()}'
+        response.close()
+        return self.session.send(retry, **kwargs)
+
+    def __call__(self):
+        """
+        Initialize Session information. Fetch the user token and configures
+        it in the session headers.
+        """
+        access_token = self.token
+        self.session.auth = _CachedBearerAuth(self)
+        if self.__retry_unauthorized not in self.session.hooks['response']:
+            self.session.hooks['response'].append(self.__retry_unauthorized)
+        self.session.headers.update({
             'Authorization': f'Bearer {access_token}',
             'Accept': 'application/json',
             'Content-Type': 'application/json',
-        }
+        })
 
 
 class TokenAuthentication(Authentication):
-    def __init__(self, access_token: str):
-        Authentication.__init__(self)
+    def __init__(self, access_token: str,
+                 session_options: Optional[SessionOptions] = None):
+        Authentication.__init__(self, session_options)
         self.access_token = access_token
 
     def __call__(self):
-        self.session.headers = {
+        self.session.headers.update({
             'Authorization': f'Bearer {self.access_token}',
             'Accept': 'application/json',
             'Content-Type': 'application/json',
-        }
+        })
 
 
 class BasicAuthentication(Authentication):
@@ -78,8 +147,9 @@ class BasicAuthentication(Authentication):
         Authentication ([type]): Extends Authentication
     """
 
-    def __init__(self, user: str, password: str):
-        Authentication.__init__(self)
+    def __init__(self, user: str, password: str,
+                 session_options: Optional[SessionOptions] = None):
+        Authentication.__init__(self, session_options)
         self.__user = user
         self.__password = password
 
@@ -91,9 +161,16 @@ class BasicAuthentication(Authentication):
 
 class AuthenticationFactory(ABC):
     """ Factory that provides an authentication object. """
+    __shared: Dict[str, Authentication] = {}
+    __shared_lock = Lock()
 
     @staticmethod
-    def get(auth_type: str, credentials: dict) -> Authentication:
+    def get(
+        auth_type: str,
+        credentials: dict,
+        shared: bool = False,
+        session_options: Optional[SessionOptions] = None,
+    ) -> Authentication:
         """
         Factory method that provides a BasicAuthentication or
         BearerAuthentication class object
@@ -103,6 +180,11 @@ class AuthenticationFactory(ABC):
             credentials (dict): data dictionary containing the init params.
             For BasicAuthentication user and password.
             For BearerAuthentication client_id, client_secret, token_url.
+            shared (bool, optional): return the same object, and so the same
+            session and connection pool, to every call with these
+            credentials. [False]
+            session_options (Optional[SessionOptions], optional): settings
+            of the session. [None]
 
         Raises:
             ValueError: If an invalid authentication type is provided
@@ -110,12 +192,23 @@ class AuthenticationFactory(ABC):
         Returns:
             Optional[Authentication]: Authentication object or None
         """
+        if shared:
+            key = json.dumps([auth_type, credentials], sort_keys=True,
+                             default=str)
+            with AuthenticationFactory.__shared_lock:
+                if (auth := AuthenticationFactory.__shared.get(key)) is None:
+                    auth = AuthenticationFactory.get(
+                        auth_type, credentials,
+                        session_options=session_options)
+                    AuthenticationFactory.__shared[key] = auth
+                return auth
         try:
             auth_options: Dict[str, type[Authentication]] = {
                 'basic': BasicAuthentication,
                 'bearer': BearerAuthentication,
                 'token': TokenAuthentication,
             }
-            return auth_options[auth_type](**credentials)
+            auth_class = auth_options[auth_type]
         except KeyError:
             raise ValueError(f'Authentication ({auth_type}) type invalid')
+        return auth_class(**credentials, session_options=session_options)
@@ -0,0 +1,143 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional
+
+from attrs import define, field
+from requests import RequestException, Response
+
+from ..utils.utils import split_list
+from ._paginator import RETRY_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+@define
+class ItemResult:
+    """Outcome of one item of a bulk operation"""
+    index: int
+    item: Any
+    response: Optional[Response] = field(default=None)
+    error: Optional[Exception] = field(default=None)
+    attempts: int = field(default=0)
+
+    @property
+    def ok(self) -> bool:
+        return (self.error is None and self.response is not None
+                and self.response.ok)
+
+    @property
+    def retryable(self) -> bool:
+        if self.error is not None:
+            return isinstance(self.error, RequestException)
+        return self.response.status_code in RETRY_STATUSES
+
+
+@define
+class BulkResult:
+    """Per item results of a bulk operation, in the order of the items"""
+    results: List[ItemResult] = field(factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results)
+
+    @property
+    def succeeded(self) -> List[ItemResult]:
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> List[ItemResult]:
+        return [result for result in self.results if not result.ok]
+
+
+def send_many(
+    items: Iterable[Any],
+    send: Callable[[Any], Response],
+    batch_size: int = 100,
+    max_workers: int = 8,
+    retries: int = 2,
+    backoff: float = 0.5,
+) -> BulkResult:
+    """
+    Sends every item with send. The items are grouped into batches of
+    batch_size that up to max_workers threads send concurrently. Only the
+    items that failed with a connection error or a retryable status are
+    retried, with exponential backoff.
+
+    Args:
+        items (Iterable[Any]): items passed one by one to send
+        send (Callable[[Any], Response]): sends one item
+        batch_size (int, optional): items sent by a worker at a time. [100]
+        max_workers (int, optional): max concurrent batches. [8]
+        retries (int, optional): extra attempts for a failed item. [2]
+        backoff (float, optional): seconds to wait before the first retry,
+            doubled on every attempt. [0.5]
+
+    Returns:
+        BulkResult: result of every item
+    """
+    results = [ItemResult(index, item) for index, item in enumerate(items)]
+
+    def send_batch(batch: List[ItemResult]):
+        for result in batch:
+            result.attempts += 1
+            try:
+                result.response, result.error = send(result.item), None
+            except Exception as exc:
+                result.response, result.error = None, exc
+
+    pending = results
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(backoff * 2 ** (attempt - 1))
+                logger.info(f'Retrying {len(pending)} failed items')
+            list(executor.map(send_batch, split_list(pending, batch_size)))
+            pending = [r for r in pending if not r.ok and r.retryable]
+            if not pending:
+                break
+    return BulkResult(results)
+
+
+class BulkOperationsMixin:
+    """
+    Adds update_many and delete_many to classes that implement the PUpdate
+    and PDelete protocols.
+
+    Protocols:
+    * PBulkUpdate
+    * PBulkDelete
+    """
+
+    def update_many(
+        self,
+        records: List[dict],
+        endpoint: Optional[str] = None,
+        params: Optional[dict] = None,
+        batch_size: int = 100,
+        max_workers: int = 8,
+        retries: int = 2,
+        backoff: float = 0.5,
+        **kwargs
+    ) -> BulkResult:
+        """Updates every record, see send_many"""
+        return send_many(
+            records,
+            lambda data: self.update(data, endpoint, params, **kwargs),
+            batch_size, max_workers, retries, backoff)
+
+    def delete_many(
+        self,
+        endpoints: List[str],
+        batch_size: int = 100,
+        max_workers: int = 8,
+        retries: int = 2,
+        backoff: float = 0.5,
+        **kwargs
+    ) -> BulkResult:
+        """Deletes every endpoint, see send_many"""
+        return send_many(
+            endpoints,
+            lambda endpoint: self.delete(endpoint, **kwargs),
+            batch_size, max_workers, retries, backoff)
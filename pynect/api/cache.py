@@ -0,0 +1,258 @@
+import base64
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Mapping, Optional, Set, Union
+
+from attrs import asdict, define, field
+from requests import PreparedRequest, Response, Session
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from ..utils.file_management import (get_cache_folder, read_json,
+                                     write_json_atomic)
+from .session import PooledHTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_STATUSES = frozenset({200, 203, 300, 301, 308, 404, 410})
+# Request headers that identify the client the response belongs to
+IDENTITY_HEADERS = ('Authorization', 'Cookie')
+
+
+def cache_control(headers: Mapping[str, str]) -> Set[str]:
+    """Names of the Cache-Control directives of headers"""
+    return {directive.split('=')[0].strip().lower()
+            for directive in headers.get('Cache-Control', '').split(',')
+            if directive.strip()}
+
+
+def cache_key(request: PreparedRequest) -> str:
+    """
+    Url of request plus a hash of its credentials, so clients with
+    different credentials never share a response.
+    """
+    identity = '\n'.join(request.headers.get(name, '')
+                         for name in IDENTITY_HEADERS)
+    if not identity.strip():
+        return request.url
+    return f'{request.url} {hashlib.sha256(identity.encode()).hexdigest()}'
+
+
+@define
+class CacheStats:
+    hits: int = field(default=0)
+    misses: int = field(default=0)
+    revalidated: int = field(default=0)
+    bytes_saved: int = field(default=0)
+
+
+@define
+class CachedResponse:
+    url: str
+    status_code: int
+    headers: CaseInsensitiveDict = field(converter=CaseInsensitiveDict)
+    content: bytes
+    stored: float = field(factory=time.time)
+    vary: Dict[str, str] = field(factory=dict)
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers that revalidate the response"""
+        validators = {}
+        if etag := self.headers.get('ETag'):
+            validators['If-None-Match'] = etag
+        if last_modified := self.headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = last_modified
+        return validators
+
+    def is_fresh(self, ttl: float) -> bool:
+        if 'no-cache' in cache_control(self.headers):
+            return False
+        return time.time() - self.stored < ttl
+
+    def matches(self, request: PreparedRequest) -> bool:
+        """Whether request has the values of the headers in Vary"""
+        return all(request.headers.get(name, '') == value
+                   for name, value in self.vary.items())
+
+    def to_response(self, request: PreparedRequest) -> Response:
+        response = Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = self.content
+        response.url = self.url
+        response.request = request
+        response.from_cache = True
+        return response
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data['headers'] = dict(self.headers)
+        data['content'] = base64.b64encode(self.content).decode('ascii')
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CachedResponse':
+        data['content'] = base64.b64decode(data['content'])
+        return cls(**data)
+
+    @classmethod
+    def from_response(cls, response: Response,
+                      request: PreparedRequest) -> 'CachedResponse':
+        vary = [name.strip() for name in
+                response.headers.get('Vary', '').split(',') if name.strip()]
+        return cls(response.url, response.status_code,
+                   response.headers, response.content,
+                   vary={name: request.headers.get(name, '')
+                         for name in vary})
+
+
+class ResponseCache:
+    """
+    Cache of GET responses with an in-memory LRU and an optional on-disk
+    store.
+
+    Fresh responses are returned without a request. Stale responses with an
+    ETag or Last-Modified header are revalidated with If-None-Match and
+    If-Modified-Since, so a 304 reuses the cached body.
+
+    Args:
+        max_entries (int, optional): responses kept in memory. [256]
+        default_ttl (float, optional): seconds a response stays fresh. [300]
+        ttls (Optional[Mapping[str, float]], optional): ttl of the urls
+            matching each regex pattern, the first match wins. [None]
+        disk (bool, optional): persists the responses under path. [False]
+        path (Optional[Union[Path, str]], optional): folder of the disk
+            store. [~/cache/http]
+    """
+
+    def __init__(self,
+                 max_entries: int = 256,
+                 default_ttl: float = 300,
+                 ttls: Optional[Mapping[str, float]] = None,
+                 disk: bool = False,
+                 path: Optional[Union[Path, str]] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.__ttls = [(re.compile(pattern), ttl)
+                       for pattern, ttl in (ttls or {}).items()]
+        self.path = None
+        if disk:
+            self.path = Path(path) if path else get_cache_folder('http')
+        self.__entries: 'OrderedDict[str, CachedResponse]' = OrderedDict()
+        self.__lock = Lock()
+        self.__stats = CacheStats()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self.__lock:
+            return CacheStats(**asdict(self.__stats))
+
+    def ttl(self, url: str) -> float:
+        for pattern, ttl in self.__ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def __file(self, key: str) -> Path:
+        return self.path / f'{hashlib.sha256(key.encode()).hexdigest()}.json'
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self.__lock:
+            if (entry := self.__entries.get(key)) is not None:
+                self.__entries.move_to_end(key)
+                return entry
+        if self.path is None:
+            return None
+        try:
+            data = read_json(self.__file(key))
+        except (OSError, ValueError):
+            logger.warning(f'Discarding unreadable cache entry of {key}')
+            return None
+        if data is None:
+            return None
+        entry = CachedResponse.from_dict(data)
+        self.__remember(key, entry)
+        return entry
+
+    def __remember(self, key: str, entry: CachedResponse):
+        with self.__lock:
+            self.__entries[key] = entry
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+
+    def put(self, key: str, entry: CachedResponse):
+        self.__remember(key, entry)
+        if self.path is not None:
+            write_json_atomic(self.__file(key), entry.to_dict())
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__stats = CacheStats()
+        if self.path is not None and self.path.exists():
+            for file in self.path.glob('*.json'):
+                file.unlink()
+
+    def __count(self, **counters: int):
+        with self.__lock:
+            for name, value in counters.items():
+                setattr(self.__stats, name,
+                        getattr(self.__stats, name) + value)
+
+    def send(self, request: PreparedRequest,
+             send: Callable[[PreparedRequest], Response],
+             stream: bool = False) -> Response:
+        """
+        Returns the cached response of request or sends it with send,
+        caching the result.
+        """
+        if (request.method != 'GET' or stream
+                or 'no-store' in cache_control(request.headers)):
+            return send(request)
+        key = cache_key(request)
+        ttl = self.ttl(request.url)
+        entry = self.get(key)
+        if entry is not None and not entry.matches(request):
+            entry = None
+        if (entry is not None and entry.is_fresh(ttl)
+                and 'no-cache' not in cache_control(request.headers)):
+            self.__count(hits=1, bytes_saved=len(entry.content))
+            return entry.to_response(request)
+        if entry is not None and entry.validators:
+            request = request.copy()
+            request.headers.update(entry.validators)
+        response = send(request)
+        if entry is not None and response.status_code == 304:
+            self.__count(revalidated=1, bytes_saved=len(entry.content))
+            entry.stored = time.time()
+            entry.headers.update(
+                (k, v) for k, v in response.headers.items()
+                if k.lower() in ('etag', 'last-modified', 'cache-control'))
+            self.put(key, entry)
+            response.close()
+            return entry.to_response(request)
+        self.__count(misses=1)
+        directives = cache_control(response.headers)
+        if (ttl > 0 and response.status_code in CACHEABLE_STATUSES
+                and not directives & {'no-store', 'private'}
+                and response.headers.get('Vary', '').strip() != '*'):
+            self.put(key, CachedResponse.from_response(response, request))
+        return response
+
+    def attach(self, session: Session) -> Session:
+        """Caches the responses of every PooledHTTPAdapter of session"""
+        adapters = [a for a in session.adapters.values()
+                    if isinstance(a, PooledHTTPAdapter)]
+        if not adapters:
+            raise ValueError('The session has no PooledHTTPAdapter')
+        for adapter in adapters:
+            adapter.response_cache = self
+        return session
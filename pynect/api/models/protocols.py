@@ -1,4 +1,4 @@
-from typing import Optional, Protocol, Any
+from typing import Any, List, Optional, Protocol
 from requests import Response
 
 
@@ -63,6 +63,124 @@ class PDelete(Protocol):
     ...
 
 
+class PBulkUpdate(Protocol):
+    """Protocol for objects that can update many records"""
+
+    def update_many(
+        self,
+        records: List[dict],
+        endpoint: Optional[str] = None,
+        params: Optional[dict] = None,
+        batch_size: int = 100,
+        max_workers: int = 8,
+        retries: int = 2,
+        **kwargs
+    ) -> Any:
+        """Performs an Api Update per record concurrently
+
+        Args:
+            records (List[dict]): Data to update
+            endpoint (Optional[str], optional): Api endpoint path. [None]
+            params (Optional[dict], optional): all keywords and values for the
+            query. [None]
+            batch_size (int, optional): records sent by a worker at a time.
+            [100]
+            max_workers (int, optional): max concurrent batches. [8]
+            retries (int, optional): extra attempts for failed records. [2]
+
+        Returns:
+            Any: Result of every record, e.g. bulk.BulkResult
+        """
+    ...
+
+
+class PBulkDelete(Protocol):
+    """Protocol for objects that can delete many records"""
+
+    def delete_many(
+        self,
+        endpoints: List[str],
+        batch_size: int = 100,
+        max_workers: int = 8,
+        retries: int = 2,
+        **kwargs
+    ) -> Any:
+        """Performs an Api Delete per endpoint concurrently
+
+        Args:
+            endpoints (List[str]): Api endpoint paths
+            batch_size (int, optional): endpoints sent by a worker at a time.
+            [100]
+            max_workers (int, optional): max concurrent batches. [8]
+            retries (int, optional): extra attempts for failed endpoints. [2]
+
+        Returns:
+            Any: Result of every endpoint, e.g. bulk.BulkResult
+        """
+    ...
+
+
 class PFactory(Protocol):
     """Protocol for objects with get factory method"""
     def get(*args, **kwargs) -> Any: ...
+
+
+class PAsyncSelect(Protocol):
+    """Protocol for objects that can select data (query) asynchronously"""
+
+    async def select(
+        self,
+        endpoint: Optional[str] = None,
+        params: Optional[dict] = None,
+        **kwargs
+    ) -> Any:
+        """Queries Api with the params provided
+
+        Args:
+            endpoint (Optional[str], optional): Api endpoint path. [None]
+            params (Optional[dict], optional): all keywords and values for the
+            query. [None]
+
+        Returns:
+            Any: Response from the Api call.
+        """
+    ...
+
+
+class PAsyncUpdate(Protocol):
+    """Protocol for objects that can update data asynchronously"""
+
+    async def update(
+        self,
+        data: dict,
+        endpoint: Optional[str] = None,
+        params: Optional[dict] = None,
+        **kwargs
+    ) -> Any:
+        """Performs Api Update
+
+        Args:
+            data (dict): Data to update
+            endpoint (Optional[str], optional): Api endpoint path. [None]
+            params (Optional[dict], optional): all keywords and values for the
+            query. [None]
+
+        Returns:
+            Any: Response from the Api call.
+        """
+    ...
+
+
+class PAsyncDelete(Protocol):
+    """Protocol for objects that can delete data asynchronously"""
+
+    async def delete(self, endpoint: str, **kwargs) -> Any:
+        """Performs Api Delete
+
+        Args:
+            endpoint (str): Api endpoint path
+
+        Returns:
+            Any: Response from the Api call.
+        """
+    ...
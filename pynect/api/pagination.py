@@ -0,0 +1,179 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional
+
+from requests import Response, Session
+
+from ._paginator import ApiPaginator, get_with_retries
+
+
+class PaginationStrategy:
+    """
+    Base class of the pagination strategies. pages yields every response
+    of a paginated endpoint.
+
+    Args:
+        retries (int, optional): extra attempts for a failed page. [3]
+        backoff (float, optional): seconds to wait before the first retry,
+            doubled on every attempt. [0.5]
+        timeout (Optional[float], optional): request timeout. [None]
+    """
+
+    def __init__(self, retries: int = 3, backoff: float = 0.5,
+                 timeout: Optional[float] = None):
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+    def get(self, session: Session, url: str) -> Response:
+        return get_with_retries(session, url, self.retries, self.backoff,
+                                self.timeout)
+
+    def pages(
+        self,
+        session: Session,
+        query_builder: Callable[..., str],
+        path_params: Optional[str] = None,
+        **kwargs
+    ) -> Iterator[Response]:
+        raise NotImplementedError
+
+
+class PageNumberStrategy(PaginationStrategy):
+    """
+    Offset style pagination where the total is only known after the first
+    page. The first page is fetched alone and the rest are fanned out in
+    parallel with an ApiPaginator.
+
+    Args:
+        page_param_name (str): query parameter with the page number
+        total_pages (Callable[[Response], int]): reads the amount of pages
+            from the first response, e.g. with utils.calc_iterations
+        index (int, optional): number of the first page. [1]
+        max_workers (int, optional): max concurrent requests. [8]
+    """
+
+    def __init__(self, page_param_name: str,
+                 total_pages: Callable[[Response], int], index: int = 1,
+                 max_workers: int = 8, **kwargs):
+        PaginationStrategy.__init__(self, **kwargs)
+        self.page_param_name = page_param_name
+        self.total_pages = total_pages
+        self.index = index
+        self.max_workers = max_workers
+
+    def pages(self, session, query_builder, path_params=None, **kwargs):
+        first = self.get(session, query_builder(
+            path_params=path_params, **{self.page_param_name: self.index},
+            **kwargs))
+        yield first
+        paginator = ApiPaginator(
+            self.total_pages(first) - 1, self.page_param_name, query_builder,
+            index=self.index + 1, path_params=path_params, session=session,
+            max_workers=self.max_workers, retries=self.retries,
+            backoff=self.backoff, timeout=self.timeout, **kwargs)
+        yield from paginator.iter_pages()
+
+
+class SequentialStrategy(PaginationStrategy):
+    """
+    Base class of the strategies where each page tells where the next one
+    is, so pages can only be requested one at a time. The next page is
+    prefetched in a background thread while the current one is processed.
+    """
+
+    def next_url(self, response: Response, query_builder: Callable[..., str],
+                 path_params: Optional[str], **kwargs) -> Optional[str]:
+        raise NotImplementedError
+
+    def pages(self, session, query_builder, path_params=None, **kwargs):
+        url = query_builder(path_params=path_params, **kwargs)
+        with ThreadPoolExecutor(1) as pool:
+            future: Optional[Future] = pool.submit(self.get, session, url)
+            try:
+                while future is not None:
+                    response = future.result()
+                    url = self.next_url(response, query_builder, path_params,
+                                        **kwargs)
+                    future = None if url is None \
+                        else pool.submit(self.get, session, url)
+                    yield response
+            finally:
+                if future is not None:
+                    future.cancel()
+
+
+class CursorStrategy(SequentialStrategy):
+    """
+    Pagination with an opaque cursor returned by each page.
+
+    Args:
+        cursor_param (str): query parameter that receives the cursor
+        next_cursor (Callable[[Response], Optional[Any]]): reads the cursor
+            of the next page, or returns None on the last one
+    """
+
+    def __init__(self, cursor_param: str,
+                 next_cursor: Callable[[Response], Optional[Any]], **kwargs):
+        SequentialStrategy.__init__(self, **kwargs)
+        self.cursor_param = cursor_param
+        self.next_cursor = next_cursor
+
+    def next_url(self, response, query_builder, path_params, **kwargs):
+        cursor = self.next_cursor(response)
+        if cursor is None or cursor == '':
+            return None
+        return query_builder(path_params=path_params,
+                             **{**kwargs, self.cursor_param: cursor})
+
+
+class KeysetStrategy(CursorStrategy):
+    """
+    Keyset pagination, e.g. since_id: the next page starts after the key of
+    the last item of the current one. Stops on an empty page.
+
+    Args:
+        key_param (str, optional): query parameter with the last key.
+            ["since_id"]
+        key_field (str, optional): key field of the items. ["id"]
+        items (Callable[[Response], list], optional): reads the items of a
+            page. [the JSON body]
+    """
+
+    def __init__(self, key_param: str = 'since_id', key_field: str = 'id',
+                 items: Callable[[Response], list] = Response.json,
+                 **kwargs):
+        CursorStrategy.__init__(self, key_param, self.last_key, **kwargs)
+        self.key_field = key_field
+        self.items = items
+
+    def last_key(self, response: Response) -> Optional[Any]:
+        items = self.items(response)
+        return items[-1][self.key_field] if items else None
+
+
+class LinkHeaderStrategy(SequentialStrategy):
+    """Follows the rel="next" url of the Link header (RFC 8288)"""
+
+    def next_url(self, response, query_builder, path_params, **kwargs):
+        return response.links.get('next', {}).get('url')
+
+
+def paginate(
+    session: Session,
+    query_builder: Callable[..., str],
+    strategy: PaginationStrategy,
+    path_params: Optional[str] = None,
+    **kwargs
+) -> Iterator[Response]:
+    """
+    Yields every page of an endpoint following the pagination strategy
+
+    Args:
+        session (Session): usually Authentication.session
+        query_builder (Callable[..., str]): builds the urls, e.g. a
+            RestAPIQuery
+        strategy (PaginationStrategy): how the pages are linked
+        path_params (Optional[str], optional): path after the base url. [None]
+        **kwargs: static query parameters
+    """
+    return strategy.pages(session, query_builder, path_params, **kwargs)
@@ -0,0 +1,219 @@
+import logging
+import math
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Condition, Lock
+from typing import Callable, Iterator, Optional
+
+from attrs import define, field
+from requests import Response, Session
+
+from .session import PooledHTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+@define
+class RateLimitStats:
+    requests: int = field(default=0)
+    throttled: int = field(default=0)
+    waited: float = field(default=0.0)
+    concurrency: float = field(default=0.0)
+    rate: float = field(default=0.0)
+
+
+class TokenBucket:
+    """
+    Token bucket that allows rate requests per second with bursts of up to
+    capacity requests.
+
+    Args:
+        rate (float): tokens added per second
+        capacity (Optional[float], optional): max tokens. [rate]
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.__tokens = self.capacity
+        self.__updated = time.monotonic()
+        self.__paused_until = 0.0
+        self.__lock = Lock()
+
+    def __refill(self, now: float):
+        elapsed = now - self.__updated
+        self.__tokens = min(self.capacity, self.__tokens + elapsed * self.rate)
+        self.__updated = now
+
+    def pause_until(self, until: float):
+        """Holds every token until the monotonic time until"""
+        with self.__lock:
+            self.__paused_until = max(self.__paused_until, until)
+            self.__tokens = min(self.__tokens, 0)
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Blocks until tokens are available and returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__refill(now)
+                if now < self.__paused_until:
+                    delay = self.__paused_until - now
+                elif self.__tokens >= tokens:
+                    self.__tokens -= tokens
+                    return waited
+                else:
+                    delay = (tokens - self.__tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def retry_after(response: Response) -> Optional[float]:
+    """
+    Seconds to wait before the next request according to the Retry-After
+    or X-RateLimit-Remaining/X-RateLimit-Reset headers of response, if any.
+    """
+    headers = response.headers
+    if (value := headers.get('Retry-After')) is not None:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                date = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            return max(0.0, (date - datetime.now(timezone.utc))
+                       .total_seconds())
+    remaining = headers.get('X-RateLimit-Remaining')
+    reset = headers.get('X-RateLimit-Reset')
+    if remaining is None or reset is None:
+        return None
+    try:
+        if float(remaining) > 0:
+            return None
+        reset = float(reset)
+    except ValueError:
+        return None
+    # Providers send either an epoch timestamp or the seconds left
+    return max(0.0, reset - time.time()) if reset > 1e9 else reset
+
+
+class RateLimiter:
+    """
+    Client side rate limiter with adaptive concurrency.
+
+    Every request takes a token from a TokenBucket and a concurrency slot.
+    The concurrency limit grows additively with every successful request
+    and is cut multiplicatively on every 429 (AIMD), so it settles just
+    under the provider limit. Retry-After and X-RateLimit-* headers pause
+    the bucket until the provider accepts requests again, and 429 responses
+    are retried up to max_retries times.
+
+    Args:
+        rate (float): max requests per second
+        capacity (Optional[float], optional): max burst. [rate]
+        max_concurrency (int, optional): upper bound of the concurrency. [16]
+        min_concurrency (int, optional): lower bound of the concurrency. [1]
+        increase (float, optional): concurrency added per window of
+            successful requests. [1]
+        decrease (float, optional): factor applied to the concurrency on a
+            429. [0.5]
+        max_retries (int, optional): retries of a throttled request. [3]
+        default_delay (float, optional): pause after a 429 without rate
+            limit headers. [1]
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 max_concurrency: int = 16, min_concurrency: int = 1,
+                 increase: float = 1, decrease: float = 0.5,
+                 max_retries: int = 3, default_delay: float = 1):
+        self.bucket = TokenBucket(rate, capacity)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.increase = increase
+        self.decrease = decrease
+        self.max_retries = max_retries
+        self.default_delay = default_delay
+        self.__concurrency = float(max_concurrency)
+        self.__in_flight = 0
+        self.__condition = Condition()
+        self.__stats = RateLimitStats()
+
+    @property
+    def concurrency(self) -> int:
+        return max(self.min_concurrency, math.floor(self.__concurrency))
+
+    @property
+    def stats(self) -> RateLimitStats:
+        with self.__condition:
+            return RateLimitStats(
+                requests=self.__stats.requests,
+                throttled=self.__stats.throttled,
+                waited=self.__stats.waited,
+                concurrency=self.__concurrency,
+                rate=self.bucket.rate,
+            )
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Waits for a concurrency slot and a token"""
+        tic = time.monotonic()
+        with self.__condition:
+            while self.__in_flight >= self.concurrency:
+                self.__condition.wait()
+            self.__in_flight += 1
+        try:
+            self.bucket.acquire()
+            with self.__condition:
+                self.__stats.requests += 1
+                self.__stats.waited += time.monotonic() - tic
+            yield
+        finally:
+            with self.__condition:
+                self.__in_flight -= 1
+                self.__condition.notify()
+
+    def update(self, response: Response):
+        """Adapts the limits to the status and headers of a response"""
+        delay = retry_after(response)
+        throttled = response.status_code == 429
+        if throttled and delay is None:
+            delay = self.default_delay
+        if delay:
+            self.bucket.pause_until(time.monotonic() + delay)
+        with self.__condition:
+            if throttled:
+                self.__stats.throttled += 1
+                self.__concurrency = max(
+                    self.min_concurrency, self.__concurrency * self.decrease)
+            else:
+                self.__concurrency = min(
+                    self.max_concurrency,
+                    self.__concurrency + self.increase / self.__concurrency)
+            self.__condition.notify_all()
+        if throttled:
+            logger.debug(f'Throttled, concurrency {self.concurrency}, '
+                         f'pausing {delay}s')
+
+    def send(self, request: Callable[[], Response]) -> Response:
+        """Runs request within the limits, retrying throttled responses"""
+        for attempt in range(self.max_retries + 1):
+            with self.slot():
+                response = request()
+            self.update(response)
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+            response.close()
+
+    def attach(self, session: Session) -> Session:
+        """Limits every request sent through the adapters of session"""
+        adapters = [a for a in session.adapters.values()
+                    if isinstance(a, PooledHTTPAdapter)]
+        if not adapters:
+            raise ValueError('The session has no PooledHTTPAdapter')
+        for adapter in adapters:
+            adapter.rate_limiter = self
+        return session
@@ -0,0 +1,118 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from attrs import define, field
+from requests import PreparedRequest, Response, Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+@define
+class SessionOptions:
+    """
+    Connection pool, retry and timeout settings of an Authentication
+    session.
+
+    Args:
+        pool_connections (int): amount of hosts with a connection pool
+        pool_maxsize (int): max connections kept per host, set it to the
+            amount of threads that share the session
+        pool_block (bool): wait for a free connection instead of opening a
+            connection that is discarded after the request
+        retries (int): retries of connection errors and retry statuses
+        backoff_factor (float): exponential backoff between retries
+        status_forcelist (Tuple[int, ...]): statuses that are retried
+        timeout (Optional[float]): default timeout of the requests
+        response_cache (Optional[ResponseCache]): caches the GET responses
+            of the session, see cache.ResponseCache
+    """
+    pool_connections: int = field(default=10)
+    pool_maxsize: int = field(default=10)
+    pool_block: bool = field(default=False)
+    retries: int = field(default=0)
+    backoff_factor: float = field(default=0.0)
+    status_forcelist: Tuple[int, ...] = field(
+        default=(429, 500, 502, 503, 504))
+    timeout: Optional[float] = field(default=None)
+    response_cache: Optional[Any] = field(default=None)
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with a default timeout, connection pool statistics, an
+    optional rate_limiter (see rate_limit.RateLimiter.attach) and an
+    optional response_cache (see cache.ResponseCache.attach).
+    """
+
+    def __init__(self, timeout: Optional[float] = None, **kwargs):
+        self.timeout = timeout
+        self.rate_limiter = None
+        self.response_cache = None
+        HTTPAdapter.__init__(self, **kwargs)
+
+    def send(self, request: PreparedRequest, timeout: Any = None,
+             **kwargs) -> Response:
+        if timeout is None:
+            timeout = self.timeout
+
+        def send(request: PreparedRequest) -> Response:
+            if self.rate_limiter is None:
+                return HTTPAdapter.send(
+                    self, request, timeout=timeout, **kwargs)
+            return self.rate_limiter.send(lambda: HTTPAdapter.send(
+                self, request, timeout=timeout, **kwargs))
+
+        if self.response_cache is None:
+            return send(request)
+        return self.response_cache.send(
+            request, send, stream=kwargs.get('stream', False))
+
+    def pool_stats(self) -> List[Dict[str, Any]]:
+        """
+        Usage of the connection pool of every host: connections opened,
+        requests sent, idle connections and max size.
+        """
+        stats = []
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            if (pool := pools.get(key)) is None:
+                continue
+            stats.append({
+                'host': f'{pool.scheme}://{pool.host}:{pool.port}',
+                'connections': pool.num_connections,
+                'requests': pool.num_requests,
+                'idle': sum(conn is not None for conn in list(
+                    pool.pool.queue)) if pool.pool else 0,
+                'maxsize': pool.pool.maxsize if pool.pool else 0,
+            })
+        return stats
+
+
+def build_session(options: Optional[SessionOptions] = None) -> Session:
+    """Creates a Session with a PooledHTTPAdapter configured by options"""
+    options = options or SessionOptions()
+    adapter = PooledHTTPAdapter(
+        timeout=options.timeout,
+        pool_connections=options.pool_connections,
+        pool_maxsize=options.pool_maxsize,
+        pool_block=options.pool_block,
+        max_retries=Retry(
+            total=options.retries,
+            backoff_factor=options.backoff_factor,
+            status_forcelist=options.status_forcelist,
+            allowed_methods=None,
+            raise_on_status=False,
+        ),
+    )
+    adapter.response_cache = options.response_cache
+    session = Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def session_pool_stats(session: Session) -> List[Dict[str, Any]]:
+    """Connection pool statistics of every PooledHTTPAdapter of session"""
+    adapters = {id(a): a for a in session.adapters.values()
+                if isinstance(a, PooledHTTPAdapter)}
+    return [stat for adapter in adapters.values()
+            for stat in adapter.pool_stats()]
@@ -0,0 +1,188 @@
+import codecs
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional
+
+from requests import Response
+
+from ..utils.writers import get_writer
+from .models.protocols import PSelect
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+CHUNK_SIZE = 64 * 1024
+# Characters that can follow the part of a number raw_decode accepted
+NUMBER_CHARS = frozenset('.eE+-0123456789')
+
+
+class _ChunkReader:
+    """File-like object over an iterable of bytes chunks, for ijson"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.__chunks = iter(chunks)
+        self.__buffer = b''
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.__buffer) < size:
+            chunk = next(self.__chunks, None)
+            if chunk is None:
+                break
+            self.__buffer += chunk
+        if size < 0:
+            size = len(self.__buffer)
+        data, self.__buffer = self.__buffer[:size], self.__buffer[size:]
+        return data
+
+
+class _JsonScanner:
+    """
+    Incremental reader of the items of one JSON array, keeping only the
+    unparsed part of the document in memory. Values are decoded with
+    json.JSONDecoder.raw_decode as soon as they are complete.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.__chunks = iter(chunks)
+        self.__decoder = codecs.getincrementaldecoder('utf-8')()
+        self.__json = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Appends the next chunk to the buffer, False at the end"""
+        if self.eof:
+            return False
+        chunk = next(self.__chunks, None)
+        if chunk is None:
+            self.eof = True
+            self.buffer += self.__decoder.decode(b'', final=True)
+            return False
+        if self.pos > CHUNK_SIZE:
+            self.buffer, self.pos = self.buffer[self.pos:], 0
+        self.buffer += self.__decoder.decode(chunk)
+        return True
+
+    def peek(self) -> str:
+        """Next non whitespace character, '' at the end"""
+        while True:
+            while (self.pos < len(self.buffer)
+                   and self.buffer[self.pos] in ' \t\n\r'):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str):
+        if (found := self.peek()) != char:
+            raise ValueError(f'Expected {char!r} at {self.pos}, '
+                             f'found {found!r}')
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.__json.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # raw_decode stops a number before an incomplete fraction or
+            # exponent, e.g. '1.' or '1e', which may continue in next chunk
+            if (isinstance(value, (int, float))
+                    and not isinstance(value, bool)
+                    and (end == len(self.buffer)
+                         or self.buffer[end] in NUMBER_CHARS)
+                    and self.fill()):
+                continue
+            self.pos = end
+            return value
+
+    def seek(self, keys: List[str]):
+        """Moves to the value of the nested object keys"""
+        for key in keys:
+            self.expect('{')
+            while True:
+                if self.peek() == '}':
+                    raise ValueError(f'Key {key!r} not found')
+                name = self.value()
+                self.expect(':')
+                if name == key:
+                    break
+                self.value()
+                if self.peek() == ',':
+                    self.pos += 1
+
+    def items(self) -> Iterator[Any]:
+        self.expect('[')
+        while self.peek() != ']':
+            if not self.peek():
+                raise ValueError('Unterminated JSON array')
+            yield self.value()
+            if self.peek() == ',':
+                self.pos += 1
+
+
+def iter_json_items(chunks: Iterable[bytes],
+                    prefix: str = 'item') -> Iterator[Any]:
+    """
+    Yields the items of a JSON array as the chunks arrive, without loading
+    the whole document.
+
+    Uses ijson when installed. Otherwise a raw_decode based fallback that
+    supports arrays nested in objects, e.g. prefix 'data.results.item'.
+
+    Args:
+        chunks (Iterable[bytes]): JSON document, e.g. Response.iter_content
+        prefix (str, optional): ijson prefix of the items. ['item']
+    """
+    if ijson is not None:
+        yield from ijson.items(_ChunkReader(chunks), prefix, use_float=True)
+        return
+    keys = prefix.split('.')
+    if keys[-1] != 'item' or 'item' in keys[:-1]:
+        raise ValueError(f'Unsupported prefix {prefix!r}, '
+                         'install ijson: pip install pynect[stream]')
+    scanner = _JsonScanner(chunks)
+    scanner.seek(keys[:-1])
+    yield from scanner.items()
+
+
+def iter_response_items(response: Response, prefix: str = 'item',
+                        chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yields the items of a response requested with stream=True and closes
+    it, see iter_json_items.
+
+    Raises:
+        HTTPError: if the response has an error status
+    """
+    with response:
+        response.raise_for_status()
+        yield from iter_json_items(response.iter_content(chunk_size), prefix)
+
+
+def stream_select(selector: PSelect,
+                  endpoint: Optional[str] = None,
+                  params: Optional[dict] = None,
+                  prefix: str = 'item',
+                  **kwargs) -> Iterator[Any]:
+    """Streaming counterpart of PSelect.select that yields the records"""
+    response = selector.select(endpoint, params, stream=True, **kwargs)
+    yield from iter_response_items(response, prefix)
+
+
+def dump_stream(records: Iterable[Any], path: Path,
+                file_format: str = 'ndjson', **kwargs) -> int:
+    """
+    Writes streamed records with the writer of file_format and returns the
+    amount written.
+    """
+    with get_writer(file_format, path, **kwargs) as writer:
+        writer.write_many(records)
+    return writer.count
@@ -0,0 +1,156 @@
+import logging
+import time
+from pathlib import Path
+from threading import Lock, Timer
+from typing import Callable, Dict, Optional
+
+from attrs import define, field
+
+from pynect.utils.file_management import read_json, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+@define
+class CachedToken:
+    access_token: str
+    expires_at: Optional[float] = field(default=None)
+
+    def is_valid(self, margin: float = 0) -> bool:
+        return self.expires_at is None \
+            or time.time() + margin < self.expires_at
+
+
+class TokenCache:
+    """
+    Thread safe cache of OAuth2 access tokens shared by every
+    Authentication of the process that uses the same key.
+
+    Tokens with an expires_in are refreshed in a background thread
+    refresh_margin seconds before they expire, or halfway through their
+    lifetime if it is shorter than twice the margin, so requests don't wait
+    for a token round trip. A token that wasn't used since its last refresh
+    isn't refreshed again until it is requested. Concurrent requests for a
+    missing token only trigger one fetch.
+
+    Args:
+        refresh_margin (float, optional): seconds before the expiration
+            when a token is refreshed. [60]
+        path (Optional[Path], optional): file where the tokens are also
+            stored, so short lived processes can reuse them. It is only
+            readable by the current user. [None]
+        background_refresh (bool, optional): refresh tokens before they
+            expire. [True]
+        min_refresh_delay (float, optional): min seconds between background
+            refreshes of a token. [1]
+    """
+
+    def __init__(self, refresh_margin: float = 60,
+                 path: Optional[Path] = None,
+                 background_refresh: bool = True,
+                 min_refresh_delay: float = 1):
+        self.refresh_margin = refresh_margin
+        self.path = path
+        self.background_refresh = background_refresh
+        self.min_refresh_delay = min_refresh_delay
+        self.__tokens: Dict[str, CachedToken] = {}
+        self.__fetchers: Dict[str, Callable[[], dict]] = {}
+        self.__timers: Dict[str, Timer] = {}
+        self.__used: Dict[str, bool] = {}
+        self.__key_locks: Dict[str, Lock] = {}
+        self.__lock = Lock()
+        if path is not None:
+            for key, token in (read_json(path) or {}).items():
+                self.__tokens[key] = CachedToken(**token)
+
+    def __key_lock(self, key: str) -> Lock:
+        with self.__lock:
+            return self.__key_locks.setdefault(key, Lock())
+
+    def get(self, key: str, fetch: Callable[[], dict]) -> str:
+        """
+        Returns the access token of key, calling fetch when there is no
+        valid one. fetch returns the token response of the OAuth2 server.
+        """
+        self.__used[key] = True
+        token = self.__tokens.get(key)
+        if token is not None and token.is_valid():
+            return token.access_token
+        with self.__key_lock(key):
+            token = self.__tokens.get(key)
+            if token is None or not token.is_valid():
+                token = self.__store(key, fetch)
+            return token.access_token
+
+    def __store(self, key: str, fetch: Callable[[], dict]) -> CachedToken:
+        response = fetch()
+        expires_in = response.get('expires_in')
+        token = CachedToken(
+            access_token=response['access_token'],
+            expires_at=None if expires_in is None
+            else time.time() + float(expires_in),
+        )
+        with self.__lock:
+            self.__tokens[key] = token
+            self.__fetchers[key] = fetch
+        self.__schedule_refresh(key, token)
+        self.__save()
+        return token
+
+    def __schedule_refresh(self, key: str, token: CachedToken):
+        if not self.background_refresh or token.expires_at is None:
+            return
+        lifetime = token.expires_at - time.time()
+        delay = max(lifetime - self.refresh_margin, lifetime / 2,
+                    self.min_refresh_delay)
+        timer = Timer(delay, self.__refresh, args=(key, ))
+        timer.daemon = True
+        with self.__lock:
+            if (previous := self.__timers.get(key)) is not None:
+                previous.cancel()
+            self.__timers[key] = timer
+        timer.start()
+
+    def __refresh(self, key: str):
+        with self.__lock:
+            fetch = self.__fetchers.get(key)
+            if not self.__used.pop(key, False):
+                # Not requested since the last refresh, stop refreshing
+                self.__timers.pop(key, None)
+                return
+        if fetch is None:
+            return
+        try:
+            with self.__key_lock(key):
+                self.__store(key, fetch)
+            logger.debug(f'Refreshed token {key}')
+        except Exception as e:
+            logger.warning(f'Could not refresh token {key}: {e}')
+
+    def __save(self):
+        if self.path is None:
+            return
+        with self.__lock:
+            data = {key: {'access_token': token.access_token,
+                          'expires_at': token.expires_at}
+                    for key, token in self.__tokens.items()}
+        # The temporary file, and so the cache, is only readable by the user
+        write_json_atomic(self.path, data)
+
+    def invalidate(self, key: str):
+        """Drops the token of key, e.g. after the server rejected it"""
+        with self.__lock:
+            self.__tokens.pop(key, None)
+            self.__used.pop(key, None)
+            if (timer := self.__timers.pop(key, None)) is not None:
+                timer.cancel()
+        self.__save()
+
+    def clear(self):
+        with self.__lock:
+            keys = list(self.__tokens)
+        for key in keys:
+            self.invalidate(key)
+
+
+default_token_cache = TokenCache()
@@ -1,8 +1,16 @@
+import hashlib
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from enum import Enum
 import logging
+from pathlib import Path
+from queue import Empty, Full, Queue
 from socket import gethostname
-from typing import Dict, List, Optional
+from threading import Event
+from typing import (Any, Callable, Deque, Dict, Iterator, List, Optional,
+                    Tuple)
 
 import pandas as pd
 import pyodbc as dbdriver
@@ -12,7 +20,17 @@ from pyodbc import Connection as dbconnection
 from pyodbc import Cursor
 from pynect.api.connector.cli import ConnectorOptions
 from pynect.api.connector.models import Connector, ConnectorManager
-from pynect.utils import map_dataframe_columns, utils
+from pynect.utils import (Pipeline, RotatingFileSink, StageMetrics,
+                          build_record_class, get_connector_folder,
+                          map_dataframe_columns, record_to_dict,
+                          rows_to_record_batch, schema_from_description,
+                          timeit, utils, write_columnar)
+from pynect.utils.file_management import (Checkpoint, dump_watermark,
+                                          get_timestamp_name, load_watermark,
+                                          make_folder, read_json,
+                                          write_json_atomic)
+from pynect.utils.pool import ConnectionPool, get_pool, pool_key
+from pynect.utils.query_helpers import partition_queries
 
 
 class DBEnum(str, Enum):
@@ -29,21 +47,119 @@ class DB:
 
 
 class DenodoConnectionOptions(BaseModel):
+    checkpoint: bool = False
+    checkpoint_key: Optional[str] = None
+    columnar: bool = False
+    connection_timeout: int = 600
     driver: str
     field_mappings: Dict[str, str]
     boolean_mappings: Dict[str, bool]
+    output_format: str = 'json'
     page_size: int = 1000
+    parallelism: int = 1
+    partition_column: Optional[str] = None
+    partition_ranges: Optional[List[Tuple[Any, Any]]] = None
     password: Optional[str] = None
+    pipeline: bool = False
+    pipeline_processes: bool = False
+    pipeline_queue_size: int = 4
+    pipeline_workers: int = 2
+    pool_health_check_query: str = 'SELECT 1'
+    pool_idle_timeout: float = 300
+    pool_max_size: int = 4
     query: str
     server_database: str
     server_name: str
     server_port: int
+    slotted_records: bool = False
+    streaming: bool = False
     user: Optional[str] = None
+    watermark_column: Optional[str] = None
 
     def __str__(self) -> str:
         return f'Server: {self.server_name}\tDataBase: {self.server_database}'\
             f'\tPort: {self.server_port}'
 
+    @property
+    def connection_kwargs(self) -> Dict[str, Any]:
+        """Arguments of the driver connect call"""
+        return dict(
+            driver=self.driver,
+            server=self.server_name,
+            port=self.server_port,
+            database=self.server_database,
+            uid=self.user,
+            pwd=self.password,
+            useragent=f'{dbdriver.__name__}-{gethostname()}',
+            timeout=self.connection_timeout
+        )
+
+    @property
+    def pool_key(self) -> str:
+        """Key of the pool, every option the pool is created with"""
+        return pool_key(health_check=self.pool_health_check_query,
+                        idle_timeout=self.pool_idle_timeout,
+                        **self.connection_kwargs)
+
+    @property
+    def is_partitioned(self) -> bool:
+        return self.partition_column is not None and (
+            self.parallelism > 1 or bool(self.partition_ranges))
+
+
+def connect(connection_kwargs: Dict[str, Any]) -> dbconnection:
+    return dbdriver.connect(**connection_kwargs)
+
+
+def check_connection(connection: dbconnection, query: str) -> bool:
+    """Runs query to find out if a pooled connection still works"""
+    if connection.closed:
+        return False
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query)
+        cursor.fetchall()
+    finally:
+        cursor.close()
+    return True
+
+
+def prepare_frame(
+    df: DataFrame,
+    field_mappings: Dict[str, str],
+    boolean_mappings: Dict[str, bool],
+) -> DataFrame:
+    # Parse date columns to string
+    df = map_dataframe_columns(df, field_mappings)
+    date_columns = df.select_dtypes(include=['datetime64']).columns
+    df[date_columns] = df[date_columns].astype(str)
+    ind_cols = df.filter(regex=(".*_ind")).columns
+    df[ind_cols] = df[ind_cols].apply(lambda x: x.astype(
+        str).str.lower()).replace(boolean_mappings)
+    condition_cols = df.filter(regex=("is_.*")).columns
+    df[condition_cols] = df[condition_cols].apply(lambda x: x.astype(
+        str).str.lower()).replace(boolean_mappings)
+    return df
+
+
+def frame_page_data(
+    df: DataFrame,
+    field_mappings: Dict[str, str],
+    boolean_mappings: Dict[str, bool],
+    frame_filter: Optional['FrameFilter'] = None,
+    frame_parse: Optional['FrameParse'] = None,
+) -> list:
+    """
+    Prepares a page, applies the frame hooks and converts the result to
+    dicts. Module level so it can run in a process pool.
+    """
+    df = prepare_frame(df, field_mappings, boolean_mappings)
+    if frame_filter is not None:
+        df = df[frame_filter(df)]
+    if frame_parse is not None:
+        df = frame_parse(df)
+    return df.to_dict(orient='records')
+
 
 class DenodoEnvironment(str, Enum):
     DEV = 'dev'
@@ -51,6 +167,10 @@ class DenodoEnvironment(str, Enum):
     PROD = 'prod'
 
 
+FrameFilter = Callable[[DataFrame], pd.Series]
+FrameParse = Callable[[DataFrame], DataFrame]
+
+
 class DenodoDBConnector(Connector):
     """
     Protocols:
@@ -63,18 +183,33 @@ class DenodoDBConnector(Connector):
         denodo_options: DenodoConnectionOptions,
         options: ConnectorOptions,
         parse,
-        filter
+        filter,
+        frame_parse: Optional[FrameParse] = None,
+        frame_filter: Optional[FrameFilter] = None,
     ):
         """Initialize a DenodoDB object
 
         Args:
-            connection (Optional[dbconnection], optional): Connection object.
-            [None]
+            parse: Per-document hook, called as a method of each record.
+            filter: Per-document hook, returns True for the records to keep.
+            frame_parse (Optional[FrameParse], optional): Receives the whole
+                page DataFrame and returns the transformed one. [None]
+            frame_filter (Optional[FrameFilter], optional): Receives the whole
+                page DataFrame and returns a boolean mask of the rows to
+                keep. [None]
+
+        When any of the frame hooks is provided, pages are filtered and
+        parsed as DataFrames and the per-document hooks are not used.
         """
         self.__denodo_opts = denodo_options
         self.__custom_class = None
         self.__parse = parse
         self.__filter = filter
+        self.__frame_parse = frame_parse
+        self.__frame_filter = frame_filter
+        self.__high_water = None
+        self.__checkpoint: Optional[Checkpoint] = None
+        self.__pipeline: Optional[Pipeline] = None
         Connector.__init__(self, name, options)
 
     @property
@@ -94,81 +229,278 @@ class DenodoDBConnector(Connector):
         return self.__custom_class
 
     def __get_class(self, df: DataFrame) -> type:
-        def constructor(self, **kwargs):
-            for k in kwargs.keys():
-                if hasattr(self, k):
-                    self.__setattr__(k, kwargs[k])
-
-        def repr(self) -> str:
-            return json.dumps(self.__dict__, indent=4)
-
-        df = df.reindex(sorted(df.columns), axis=1)
-        attrs = {name: '' for name in df.columns}
         dynamic_class_name = f'{self.name}_class'
-
-        dynamic_class = type(dynamic_class_name, (object, ), {
-            "__init__": constructor,
-            "__repr__": repr,
-            "logger": logging.getLogger(dynamic_class_name),
-            "parse": self.__parse,
-            "filter": self.__filter,
-            **attrs
-        })
+        dynamic_class = build_record_class(
+            dynamic_class_name,
+            sorted(df.columns),
+            attrs={
+                "logger": logging.getLogger(dynamic_class_name),
+                "parse": self.__parse,
+                "filter": self.__filter,
+            },
+            slots=self.__denodo_opts.slotted_records,
+        )
         self.logger.debug(f'Created a class named "{dynamic_class.__name__}"')
         self.logger.debug(dir(dynamic_class))
         return dynamic_class
 
-    def __execute(self, query: str, **params) -> Cursor:
-        self.__cursor = self.__connection.cursor().execute(query, **params)
-        self.__columns = [utils.camel_to_snake(
-            i[0]) for i in self.cursor.description]
+    @property
+    def state_folder(self) -> Path:
+        """
+        Folder of the run state files, apart from the data files so globs
+        over the output don't read them
+        """
+        return get_connector_folder(self.name, 'state')
+
+    @property
+    def watermark_path(self) -> Path:
+        return self.state_folder / 'watermark.json'
+
+    @property
+    def watermark(self) -> Any:
+        """
+        High-water mark saved by the last successful incremental run, or None
+        if there is none for the current watermark column.
+        """
+        state = read_json(self.watermark_path)
+        if not state or state['column'] != self.__denodo_opts.watermark_column:
+            return None
+        return load_watermark(state)
+
+    def build_query(self) -> Tuple[str, tuple]:
+        """
+        Returns the query to run with its parameters. Incremental runs only
+        select the rows past the saved high-water mark.
+        """
+        query = self.__denodo_opts.query
+        column = self.__denodo_opts.watermark_column
+        if column is None or (watermark := self.watermark) is None:
+            return query, ()
+        self.logger.info(f'Incremental run from {column} > {watermark}')
+        return (f'SELECT * FROM ({query}) AS incremental WHERE {column} > ?',
+                (watermark, ))
+
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.state_folder / 'checkpoint.json'
+
+    def __load_checkpoint(self, query: str, params: tuple):
+        opts = self.__denodo_opts
+        self.__checkpoint = None
+        if not opts.checkpoint:
+            return
+        if opts.checkpoint_key is None:
+            # Without an order the rows skipped on resume are arbitrary
+            raise ValueError('Checkpoints need a unique checkpoint_key '
+                             'to order and resume the query by')
+        if opts.is_partitioned:
+            self.logger.warning(
+                'Checkpoints are not supported for partitioned queries')
+            return
+        query_id = hashlib.sha256(json.dumps(
+            [query, params, opts.page_size, opts.checkpoint_key],
+            default=str).encode()).hexdigest()
+        self.__checkpoint = Checkpoint.load(self.checkpoint_path, query_id)
+        if self.__checkpoint.resumed:
+            self.logger.info(
+                f'Resuming after {self.__checkpoint.rows} rows and '
+                f'{len(self.__checkpoint.paths)} files')
+        # The committed rows are not read again, start from their maximum
+        state = self.__checkpoint.watermark
+        if state is not None and state['column'] == opts.watermark_column:
+            self.__high_water = load_watermark(state)
+
+    def __resumable_query(self, query: str, params: tuple
+                          ) -> Tuple[str, tuple]:
+        """
+        Orders the query by checkpoint_key, which must be unique, and
+        continues after the last key of the committed pages.
+        """
+        if (checkpoint := self.__checkpoint) is None:
+            return query, params
+        key = self.__denodo_opts.checkpoint_key
+        base = f'SELECT * FROM ({query}) AS resumed'
+        if checkpoint.key is not None:
+            return (f'{base} WHERE {key} > ? ORDER BY {key}',
+                    (*params, load_watermark(checkpoint.key)))
+        return f'{base} ORDER BY {key}', params
+
+    def __page_position(self, df: pd.DataFrame) -> Tuple[int, Any, Any]:
+        """Rows, last key and high-water mark of a page for the checkpoint"""
+        opts = self.__denodo_opts
+        key = high_water = None
+        if self.__checkpoint is None or df.empty:
+            return len(df.index), key, high_water
+        key = dump_watermark(opts.checkpoint_key, df[utils.camel_to_snake(
+            opts.checkpoint_key)].iloc[-1])
+        if (value := self.__page_high_water(df)) is not None:
+            high_water = dump_watermark(opts.watermark_column, value)
+        return len(df.index), key, high_water
+
+    def __checkpoint_page(self, position: Tuple[int, Any, Any],
+                          data: list) -> list:
+        if (checkpoint := self.__checkpoint) is None:
+            return data
+        rows, key, high_water = position
+        return checkpoint.add_page(rows, key, data, high_water)
+
+    def __page_high_water(self, df: pd.DataFrame) -> Any:
+        column = self.__denodo_opts.watermark_column
+        if column is None or df.empty:
+            return None
+        value = df[utils.camel_to_snake(column)].max()
+        return value if pd.notna(value) else None
+
+    def __track_watermark(self, df: pd.DataFrame):
+        value = self.__page_high_water(df)
+        if value is not None and (
+                self.__high_water is None or value > self.__high_water):
+            self.__high_water = value
+
+    def __save_watermark(self):
+        column = self.__denodo_opts.watermark_column
+        if column is None or self.__high_water is None:
+            return
+        write_json_atomic(self.watermark_path,
+                          dump_watermark(column, self.__high_water))
+        self.logger.info(f'Saved high-water mark {column} = '
+                         f'{self.__high_water}')
+
+    def __execute(self, query: str, *params) -> Cursor:
+        self.__cursor = self.__connection.cursor().execute(query, *params)
+        self.__columns = utils.camel_to_snake_keys(
+            i[0] for i in self.cursor.description)
         return self.cursor
 
+    @property
+    def pool(self) -> ConnectionPool:
+        """
+        Process wide connection pool shared by every connector with the same
+        connection, health check and idle timeout options, see
+        DenodoConnectionOptions.pool_key. Its factory and health check only
+        depend on those options, never on the connector that created it.
+        The pool grows to the largest max size requested.
+        """
+        opts = self.__denodo_opts
+        # The main connection is held while the partition workers run
+        max_size = max(opts.pool_max_size, opts.parallelism + 1) \
+            if opts.is_partitioned else opts.pool_max_size
+        return get_pool(
+            opts.pool_key,
+            partial(connect, opts.connection_kwargs),
+            max_size=max_size,
+            idle_timeout=opts.pool_idle_timeout,
+            health_check=partial(check_connection,
+                                 query=opts.pool_health_check_query),
+        )
+
     def execute(self):
-        client_hostname = gethostname()
-        useragent = "%s-%s" % (dbdriver.__name__, client_hostname)
-        with dbdriver.connect(
-            driver=self.__denodo_opts.driver,
-            server=self.__denodo_opts.server_name,
-            port=self.__denodo_opts.server_port,
-            database=self.__denodo_opts.server_database,
-            uid=self.__denodo_opts.user,
-            pwd=self.__denodo_opts.password,
-            useragent=useragent,
-            timeout=600
-        ) as connection:
+        with self.pool.connection() as connection:
             self.__connection = connection
-            self.__execute(self.__denodo_opts.query)
+            self.__high_water = None
+            query, params = self.build_query()
+            self.__load_checkpoint(query, params)
+            query, params = self.__resumable_query(query, params)
+            if self.__denodo_opts.is_partitioned:
+                # Only the column description is needed, the rows are
+                # fetched by the partition workers
+                self.__execute(f'SELECT * FROM ({query})'
+                               ' AS partitioned WHERE 1 = 0', *params)
+            else:
+                self.__execute(query, *params)
             df = map_dataframe_columns(self.select(
                 0), self.__denodo_opts.field_mappings)
             self.__custom_class = self.__get_class(df)
-            ConnectorManager(self)()
+            try:
+                ConnectorManager(self)()
+            finally:
+                self.cursor.close()
+        self.logger.debug(f'Connection pool: {self.pool.stats}')
+
+    @property
+    def is_vectorized(self) -> bool:
+        return self.__frame_parse is not None \
+            or self.__frame_filter is not None
 
+    def prepare_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        return prepare_frame(df, self.__denodo_opts.field_mappings,
+                             self.__denodo_opts.boolean_mappings)
+
+    @timeit()
     def get_objects(self, df: pd.DataFrame) -> list:
-        # Parse date columns to string
-        df = map_dataframe_columns(df, self.__denodo_opts.field_mappings)
-        date_columns = df.select_dtypes(include=['datetime64']).columns
-        df[date_columns] = df[date_columns].astype(str)
-        ind_cols = df.filter(regex=(".*_ind")).columns
-        df[ind_cols] = df[ind_cols].apply(lambda x: x.astype(
-            str).str.lower()).replace(self.__denodo_opts.boolean_mappings)
-        condition_cols = df.filter(regex=("is_.*")).columns
-        df[condition_cols] = df[condition_cols].apply(lambda x: x.astype(
-            str).str.lower()).replace(self.__denodo_opts.boolean_mappings)
-        records = df.to_dict(orient='records')
+        records = self.prepare_frame(df).to_dict(orient='records')
         return [self.custom_class(**document)
                 for document in records]
 
+    def get_frame_data(self, df: pd.DataFrame) -> list:
+        """
+        Applies the frame hooks to a whole page and converts the result to
+        dicts only once, skipping the per-document objects.
+        """
+        data = frame_page_data(
+            df, self.__denodo_opts.field_mappings,
+            self.__denodo_opts.boolean_mappings,
+            self.__frame_filter, self.__frame_parse)
+        self.logger.info(
+            'Documents from page\t=\t'
+            f'{len(df.index)}\tAfter filtering\t=\t{len(data)}')
+        return data
+
+    @property
+    def schema(self):
+        """Arrow schema of the current query, built from the cursor"""
+        return schema_from_description(self.cursor.description, self.columns)
+
     def select_all(self) -> pd.DataFrame:
         """Returns a DataFrame containing all the remaining rows in the query.
 
         Args:
             df: DataFrame. Pydantic DataFrame with all the remaining records.
         """
+        if self.__denodo_opts.columnar:
+            return rows_to_record_batch(
+                self.cursor.fetchall(), self.schema
+            ).to_pandas(types_mapper=pd.ArrowDtype)
         # Output results as pandas dataframe
         return pd.DataFrame.from_records(
             self.cursor.fetchall(), columns=self.columns)
 
+    def select_arrow(self, size: int):
+        """
+        Returns the next page of the query as an arrow RecordBatch, filling
+        one array per column straight from the cursor rows.
+
+        Args:
+            size: int. The number of records to fetch from the DB.
+        """
+        batch = rows_to_record_batch(self.cursor.fetchmany(size), self.schema)
+        self.logger.info(
+            'Queried database with a page size of '
+            f'{size} and got {batch.num_rows} records')
+        return batch
+
+    def iter_batches(self, page_size: int):
+        """Generator that yields arrow RecordBatches until the query ends"""
+        while (batch := self.select_arrow(page_size)).num_rows:
+            yield batch
+
+    def dump_columnar(self, file_format: str = 'parquet') -> str:
+        """
+        Writes the remaining rows of the query to a Parquet or Feather file
+        in the connector folder, one page at a time and without building
+        row dicts. The filter/parse hooks are not applied.
+
+        Args:
+            file_format: str. "parquet" or "feather". ["parquet"]
+        """
+        path = Path(make_folder(get_connector_folder(self.name)),
+                    get_timestamp_name(self.name, file_format))
+        self.logger.debug(f'Writing columnar data to {path}')
+        return str(write_columnar(
+            self.iter_batches(self.__denodo_opts.page_size), path,
+            file_format, self.schema))
+
+    @timeit()
     def select(self, size: int) -> pd.DataFrame:
         """
         Returns a DataFrame containing the remaining rows, containing no more
@@ -179,6 +511,9 @@ class DenodoDBConnector(Connector):
             df: DataFrame. Pydantic DataFrame with the remaining records.
             size: int. The number of records to fetch from the DB.
         """
+        if self.__denodo_opts.columnar:
+            return self.select_arrow(size).to_pandas(
+                types_mapper=pd.ArrowDtype)
         # Output results as pandas dataframe
         df = pd.DataFrame.from_records(
             self.cursor.fetchmany(size), columns=self.columns)
@@ -187,45 +522,248 @@ class DenodoDBConnector(Connector):
             f'{size} and got {len(df.index)} records')
         return df
 
+    def iter_frames(self, page_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Generator that yields the query results one page at a time. When the
+        options define a partition column, the pages of every partition are
+        fetched in parallel and yielded in arrival order.
+
+        Args:
+            page_size: int. The number of records to fetch per page.
+        """
+        if self.__denodo_opts.is_partitioned:
+            yield from self.__iter_partitioned_frames(page_size)
+        else:
+            while not (df := self.select(page_size)).empty:
+                yield df
+
+    def __iter_partitioned_frames(
+        self, page_size: int
+    ) -> Iterator[pd.DataFrame]:
+        opts = self.__denodo_opts
+        query, params = self.build_query()
+        partitions = partition_queries(
+            query, opts.partition_column, opts.parallelism,
+            opts.partition_ranges, params)
+        workers = min(opts.parallelism, len(partitions))
+        self.logger.info(
+            f'Fetching {len(partitions)} partitions of '
+            f'{opts.partition_column} with {workers} connections')
+        pages: Queue = Queue(maxsize=2 * workers)
+        stop = Event()
+        with ThreadPoolExecutor(
+            workers, thread_name_prefix=f'{self.name}_partition'
+        ) as pool:
+            futures = [
+                pool.submit(self.__fetch_partition, query, params,
+                            page_size, pages, stop)
+                for query, params in partitions
+            ]
+            try:
+                pending = len(futures)
+                while pending and not stop.is_set():
+                    try:
+                        df = pages.get(timeout=0.1)
+                    except Empty:
+                        continue
+                    if df is None:
+                        pending -= 1
+                    else:
+                        yield df
+            finally:
+                stop.set()
+        for future in futures:
+            # Raises the first error found in the partition workers
+            future.result()
+
+    def __fetch_partition(
+        self,
+        query: str,
+        params: tuple,
+        page_size: int,
+        pages: Queue,
+        stop: Event,
+    ):
+        def put(item: Optional[pd.DataFrame]):
+            while not stop.is_set():
+                try:
+                    return pages.put(item, timeout=0.1)
+                except Full:
+                    continue
+
+        try:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor().execute(query, *params)
+                columns = utils.camel_to_snake_keys(
+                    i[0] for i in cursor.description)
+                if self.__denodo_opts.columnar:
+                    schema = schema_from_description(
+                        cursor.description, columns)
+                while not stop.is_set() and (
+                        rows := cursor.fetchmany(page_size)):
+                    self.logger.debug(
+                        f'Partition {params} returned {len(rows)} records')
+                    put(rows_to_record_batch(rows, schema).to_pandas(
+                        types_mapper=pd.ArrowDtype
+                    ) if self.__denodo_opts.columnar
+                        else pd.DataFrame.from_records(rows, columns=columns))
+                cursor.close()
+        except Exception:
+            stop.set()
+            raise
+        finally:
+            put(None)
+
     def configure(self):
         super().configure()
 
+    @timeit()
+    def _persist_data(self, *args, **kwargs) -> str:
+        return super()._persist_data(*args, **kwargs)
+
+    def iter_data(self, page_size: int) -> Iterator[list]:
+        """
+        Generator that yields the filtered and parsed documents of each page
+        until the query has no more rows. Only one page is held in memory at
+        a time.
+
+        Args:
+            page_size: int. The number of records to fetch per page.
+        """
+        if self.__denodo_opts.pipeline:
+            yield from self.__iter_pipelined_data(page_size)
+            return
+        for df in self.iter_frames(page_size):
+            self.__track_watermark(df)
+            yield self.__checkpoint_page(
+                self.__page_position(df), self.get_page_data(df))
+
+    @property
+    def pipeline_metrics(self) -> Dict[str, StageMetrics]:
+        """Per stage timing of the last pipelined run"""
+        return self.__pipeline.metrics if self.__pipeline else {}
+
+    def __page_transform(self) -> Tuple[Callable[[DataFrame], list], bool]:
+        opts = self.__denodo_opts
+        if not opts.pipeline_processes:
+            return self.get_page_data, False
+        if not self.is_vectorized:
+            self.logger.warning(
+                'Process workers need frame hooks, using threads instead')
+            return self.get_page_data, False
+        return partial(
+            frame_page_data,
+            field_mappings=opts.field_mappings,
+            boolean_mappings=opts.boolean_mappings,
+            frame_filter=self.__frame_filter,
+            frame_parse=self.__frame_parse,
+        ), True
+
+    def __iter_pipelined_data(self, page_size: int) -> Iterator[list]:
+        """
+        Fetches the next pages in a background thread and transforms them
+        in a worker pool while the caller persists the current one.
+        """
+        opts = self.__denodo_opts
+        positions: Deque[Tuple[int, Any, Any]] = deque()
+
+        def frames() -> Iterator[DataFrame]:
+            for df in self.iter_frames(page_size):
+                self.__track_watermark(df)
+                positions.append(self.__page_position(df))
+                yield df
+
+        transform, processes = self.__page_transform()
+        self.__pipeline = Pipeline(
+            frames(), transform, workers=opts.pipeline_workers,
+            queue_size=opts.pipeline_queue_size, processes=processes)
+        for data in self.__pipeline:
+            yield self.__checkpoint_page(positions.popleft(), data)
+        for metrics in self.__pipeline.metrics.values():
+            self.logger.info(
+                f'Stage {metrics.name}: {metrics.items} pages, '
+                f'{metrics.busy:.3f}s busy, {metrics.waiting:.3f}s waiting')
+
     def gather_all_data(self) -> List[str]:
-        paths = []
-        gathered_documents = 0
+        if self.dnd_opts.streaming:
+            return self.stream_all_data()
+        checkpoint = self.__checkpoint
+        paths = list(checkpoint.paths) if checkpoint else []
+        gathered_documents = checkpoint.documents if checkpoint else 0
+
+        def persist(documents: list):
+            paths.append(path := self._persist_data(documents))
+            if checkpoint is not None:
+                checkpoint.commit(str(path), len(documents))
+
         try:
             documents: list = []
             size = int(self.opts.max_size)
-            while len((data := self.get_data(self.dnd_opts.page_size))) != 0:
-                if len(documents) > size:
-                    self.logger.info(format(
-                        'Data quantity reached the max size of %d',
-                        self.opts.max_size
-                    ))
-                    documents += data
-                    gathered_documents += len(data)
-                    paths.append(self._persist_data(documents[:size]))
+            for data in self.iter_data(self.dnd_opts.page_size):
+                documents += data
+                gathered_documents += len(data)
+                while len(documents) >= size:
+                    self.logger.info(
+                        'Data quantity reached the max size of %d', size)
+                    persist(documents[:size])
                     del documents[:size]
-                else:
-                    documents += data
-                    gathered_documents += len(data)
-            paths.append(self._persist_data(documents))
+            if documents or not paths:
+                persist(documents)
             self.logger.info(
                 f'Final amount of documents gathered: {gathered_documents}')
             self.logger.info(f'Files created: {paths}')
+            self.__save_watermark()
+            if checkpoint is not None:
+                checkpoint.clear()
         except KeyError as e:
             self.logger.error(f'There was an error getting data:\n{e}')
         return paths
 
+    def stream_all_data(self) -> List[str]:
+        """
+        Writes every page to disk as soon as it is processed, rotating the
+        output file every opts.max_size records. Peak memory is one page plus
+        the file buffer, no matter how big the result set is.
+        """
+        checkpoint = self.__checkpoint
+        previous_paths = list(checkpoint.paths) if checkpoint else []
+        gathered_documents = checkpoint.documents if checkpoint else 0
+        sink = RotatingFileSink(
+            self.name,
+            get_connector_folder(self.name),
+            int(self.opts.max_size),
+            on_close=checkpoint.commit if checkpoint else None,
+            file_format=self.dnd_opts.output_format,
+        )
+        try:
+            with sink:
+                for data in self.iter_data(self.dnd_opts.page_size):
+                    sink.write(data)
+                    gathered_documents += len(data)
+            self.logger.info(
+                f'Final amount of documents gathered: {gathered_documents}')
+            self.logger.info(f'Files created: {previous_paths + sink.paths}')
+            self.__save_watermark()
+            if checkpoint is not None:
+                checkpoint.clear()
+        except KeyError as e:
+            self.logger.error(f'There was an error getting data:\n{e}')
+        return previous_paths + sink.paths
+
     def get_data(self, page_size: int) -> Optional[list]:
-        df = self.select(page_size)
+        return self.get_page_data(self.select(page_size))
+
+    def get_page_data(self, df: pd.DataFrame) -> list:
+        if self.is_vectorized:
+            return self.get_frame_data(df)
         documents = self.get_objects(df)
         valid_documents = []
         for doc in documents:
             if doc.filter():
                 doc.parse()
                 valid_documents.append(doc)
-        data = [doc.__dict__ for doc in valid_documents if doc is not None]
+        data = [record_to_dict(doc)
+                for doc in valid_documents if doc is not None]
         self.logger.info(
             'Documents from page\t=\t'
             f'{len(documents)}\tAfter filtering\t=\t{len(data)}')
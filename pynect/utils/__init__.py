@@ -1,11 +1,20 @@
 from .cli import CLI, CLIArgument
+from .columnar import (rows_to_record_batch, schema_from_description,
+                       write_columnar)
 from .decorators import timeit
-from .file_management import (create_reports_folder, dump_connector_data,
-                              dump_data_to_file, get_connector_folder,
-                              get_dir_from_home, get_log_folder)
+from .file_management import (RotatingFileSink, create_reports_folder,
+                              dump_connector_data, dump_data_to_file,
+                              get_connector_folder, get_dir_from_home,
+                              get_log_folder, read_json, write_json_atomic)
+from .metrics import LatencyHistogram, MetricsRegistry, default_registry
+from .pipeline import Pipeline, StageMetrics
+from .pool import ConnectionPool, PoolStats, get_pool, pool_key, pool_stats
+from .records import build_record_class, record_to_dict
 from .utils import (add_lists, calc_iterations, camel_to_snake,
-                    configure_logger, create_logs_folder,
+                    camel_to_snake_keys, configure_logger, create_logs_folder,
                     is_date_older_than_delta, is_valid_email,
                     is_valid_email_list, map_dataframe_columns,
-                    output_format_date, solr_format_date, split_list,
-                    str_to_date)
+                    output_format_date, snake_case_records,
+                    solr_format_date, split_list, str_to_date)
+from .writers import (JsonWriter, NdjsonWriter, RecordWriter, WRITERS,
+                      get_writer)
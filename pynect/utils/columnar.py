@@ -0,0 +1,103 @@
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError(
+            'pyarrow is required for columnar fetches, install it with '
+            '"pip install pynect[arrow]"')
+
+
+def arrow_type(type_code: Any, precision: Optional[int] = None,
+               scale: Optional[int] = None) -> Optional['pa.DataType']:
+    """
+    Maps the python type of a DB-API cursor description to an arrow type.
+    Returns None for unknown types so arrow infers them from the values.
+    """
+    require_pyarrow()
+    if type_code is bool:
+        return pa.bool_()
+    if type_code is int:
+        return pa.int64()
+    if type_code is float:
+        return pa.float64()
+    if type_code is str:
+        return pa.string()
+    if type_code is datetime:
+        return pa.timestamp('us')
+    if type_code is date:
+        return pa.date32()
+    if type_code is bytes or type_code is bytearray:
+        return pa.binary()
+    if type_code is Decimal and precision and 0 < precision <= 38:
+        return pa.decimal128(precision, scale or 0)
+    return None
+
+
+def schema_from_description(
+    description: Sequence[tuple], names: Sequence[str]
+) -> 'pa.Schema':
+    """Builds an arrow schema from a DB-API cursor description"""
+    require_pyarrow()
+    fields = []
+    for name, column in zip(names, description):
+        field_type = arrow_type(column[1], column[4], column[5])
+        fields.append(pa.field(name, field_type or pa.null()))
+    return pa.schema(fields)
+
+
+def rows_to_record_batch(rows: Sequence[tuple],
+                         schema: 'pa.Schema') -> 'pa.RecordBatch':
+    """
+    Transposes the rows returned by a cursor into one arrow array per
+    column. Columns with a null type in the schema are inferred.
+    """
+    require_pyarrow()
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    arrays = [
+        pa.array(values, type=None if pa.types.is_null(f.type) else f.type)
+        for f, values in zip(schema, columns)
+    ]
+    return pa.RecordBatch.from_arrays(arrays, names=schema.names)
+
+
+def write_columnar(
+    batches: Iterable['pa.RecordBatch'],
+    path: Path,
+    file_format: str = 'parquet',
+    schema: Optional['pa.Schema'] = None,
+) -> Path:
+    """
+    Writes record batches to a Parquet or Feather file one batch at a time,
+    so only the current batch is held in memory. Every batch is cast to
+    schema, which defaults to the schema of the first batch.
+    """
+    require_pyarrow()
+    writer = None
+    try:
+        for batch in batches:
+            if writer is None:
+                schema = schema or batch.schema
+                if file_format == 'parquet':
+                    import pyarrow.parquet as pq
+                    writer = pq.ParquetWriter(str(path), schema)
+                elif file_format == 'feather':
+                    writer = pa.ipc.new_file(str(path), schema)
+                else:
+                    raise ValueError(
+                        f'Columnar format ({file_format}) invalid')
+            elif batch.schema != schema:
+                batch = batch.cast(schema)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
@@ -1,30 +1,57 @@
+import inspect
 import logging
 import time
 from functools import wraps
 from typing import Optional
 
-from .utils import configure_logger
+from .metrics import MetricsRegistry, default_registry
 
 
 def timeit(
     logger: Optional[logging.Logger] = None,
     level: int = logging.DEBUG,  # Default to DEBUG level
+    registry: Optional[MetricsRegistry] = None,
+    name: Optional[str] = None,
 ):
+    """
+    Measures every call of the decorated function or coroutine function
+    with perf_counter_ns. The duration is recorded in the latency histogram
+    name of registry and logged at level.
+
+    Args:
+        logger (Optional[logging.Logger], optional): [module logger]
+        level (int, optional): log level of the durations. [DEBUG]
+        registry (Optional[MetricsRegistry], optional): [default_registry]
+        name (Optional[str], optional): histogram name. [module.qualname]
+    """
     def decorator(func):
-        if (lgr := logger) is None:
-            lgr = configure_logger(func.__module__)
+        lgr = logger or logging.getLogger(func.__module__)
+        registry_ = registry or default_registry
         func_name = func.__name__
+        histogram = registry_.histogram(
+            name or f'{func.__module__}.{func.__qualname__}')
+
+        def record(elapsed: int):
+            histogram.record(elapsed)
+            if lgr.isEnabledFor(level):
+                lgr.log(level, f"{func_name} took {elapsed/1e6:.4f}ms")
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start_time = time.perf_counter_ns()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record(time.perf_counter_ns() - start_time)
+            return async_wrapper
 
         @wraps(func)
         def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            start_time = time.time()
-            end_time = time.time()
-            elapsed_time = end_time - start_time
-            message = f"{func_name} took {elapsed_time*1000:.4f}ms"
-            lgr.log(level, message)  # Use the specified log level
-            return result
-        wrapper.__name__ = func_name
-        wrapper.__doc__ = func.__doc__
+            start_time = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(time.perf_counter_ns() - start_time)
         return wrapper
     return decorator
@@ -1,14 +1,22 @@
 import json
-from datetime import datetime
+import os
+import tempfile
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
 from functools import partial
 from os.path import join
 from pathlib import Path
+from typing import Any, Callable, Deque, Iterable, List, Optional
+
+from .writers import WRITERS, JsonWriter, RecordWriter, get_writer
 
 
 def get_dir_from_home(*args) -> Path:
     return Path(join(str(Path.home()), *args))
 
 
+get_cache_folder = partial(get_dir_from_home, 'cache')
 get_connector_folder = partial(get_dir_from_home, 'connectors')
 get_log_folder = partial(get_dir_from_home, 'logs')
 get_report_folder = partial(get_dir_from_home, 'reports')
@@ -36,21 +44,272 @@ def get_timestamp_name(name: str, extension: str) -> str:
     return f'{name}_{stamp}.{extension}'
 
 
-def dump_data_to_file(name: str, path: Path, data: dict) -> str:
+def dump_data_to_file(
+    name: str, path: Path, data: dict, file_format: str = 'json'
+) -> str:
+    """
+    Writes data to a new timestamped file in path. Lists are written record
+    by record with the writer of file_format, see writers.WRITERS. Any
+    other JSON document is streamed with json.dump. The file is written
+    atomically.
+    """
     try:
         folder_path = str(path) if path.exists() else make_folder(path)
-        name = get_timestamp_name(name, 'json')
+        writer_class = WRITERS.get(file_format, JsonWriter)
+        name = get_timestamp_name(name, writer_class.extension)
         file_path = Path(join(folder_path, name))
-        with file_path.open('w') as file:
-            file.write(json.dumps(data, indent=4))
+        if file_format == 'json' and not isinstance(data, list):
+            return write_json_atomic(file_path, data)
+        with get_writer(file_format, file_path) as writer:
+            writer.write_many(data)
         return file_path
     except Exception as e:
         print(e)
 
 
+def write_json_atomic(path: Path, data: Any) -> Path:
+    """
+    Writes data as JSON to a temporary file in the same folder and renames it
+    over path, so readers never see a partially written file.
+    """
+    folder = path.parent if path.parent.exists() else Path(
+        make_folder(path.parent))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=folder, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as file:
+            json.dump(data, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    """Returns the JSON content of path or default if it doesn't exist"""
+    if not path.exists():
+        return default
+    with path.open() as file:
+        return json.load(file)
+
+
+def dump_watermark(column: str, value: Any) -> dict:
+    """Serializes a high-water mark so it can be stored as JSON"""
+    if hasattr(value, 'to_pydatetime'):
+        value = value.to_pydatetime()
+    elif hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, datetime):
+        return {'column': column, 'type': 'datetime',
+                'value': value.isoformat()}
+    if isinstance(value, date):
+        return {'column': column, 'type': 'date', 'value': value.isoformat()}
+    if isinstance(value, Decimal):
+        # NUMERIC/DECIMAL columns, kept as text so no digit is lost
+        return {'column': column, 'type': 'decimal', 'value': str(value)}
+    return {'column': column, 'type': 'value', 'value': value}
+
+
+def load_watermark(state: dict) -> Any:
+    """Restores a high-water mark serialized by dump_watermark"""
+    if state['type'] == 'datetime':
+        return datetime.fromisoformat(state['value'])
+    if state['type'] == 'date':
+        return date.fromisoformat(state['value'])
+    if state['type'] == 'decimal':
+        return Decimal(state['value'])
+    return state['value']
+
+
+class Checkpoint:
+    """
+    Progress of a paginated run, saved atomically after every file.
+
+    The source rows of a page are only committed once every document they
+    produced has been persisted. skip is the amount of documents of the
+    first uncommitted page that are already in a file, so a resumed run
+    reads again from that page and drops them. key and watermark are the
+    last key and the high-water mark (see dump_watermark) of the committed
+    pages.
+
+    Args:
+        path (Path): checkpoint file
+        query_id (str): identifies the query the progress belongs to
+        state (Optional[dict], optional): state saved by a previous run.
+            [None]
+    """
+
+    def __init__(self, path: Path, query_id: str,
+                 state: Optional[dict] = None):
+        state = state or {}
+        self.path = path
+        self.query_id = query_id
+        self.rows: int = state.get('rows', 0)
+        self.key: Optional[dict] = state.get('key')
+        self.watermark: Optional[dict] = state.get('watermark')
+        self.skip: int = state.get('skip', 0)
+        self.documents: int = state.get('documents', 0)
+        self.paths: List[str] = state.get('paths', [])
+        self.__resume_skip = self.skip
+        self.__pending: Deque[list] = deque()
+
+    @classmethod
+    def load(cls, path: Path, query_id: str) -> 'Checkpoint':
+        """Returns the saved checkpoint of query_id or a new one"""
+        state = read_json(path)
+        if state and state['query_id'] == query_id:
+            return cls(path, query_id, state)
+        return cls(path, query_id)
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.rows or self.paths)
+
+    def add_page(self, rows: int, key: Optional[dict], data: list,
+                 watermark: Optional[dict] = None) -> list:
+        """
+        Registers a page read from the source and returns its documents,
+        without the ones a previous run already persisted.
+        """
+        if self.__resume_skip:
+            data = data[self.__resume_skip:]
+            self.__resume_skip = 0
+        self.__pending.append([rows, key, len(data), watermark])
+        return data
+
+    def __update_watermark(self, watermark: Optional[dict]):
+        if watermark is not None and (
+                self.watermark is None
+                or load_watermark(watermark) > load_watermark(self.watermark)):
+            self.watermark = watermark
+
+    def commit(self, path: str, documents: int):
+        """Registers a file with the next documents of the pending pages"""
+        self.paths.append(path)
+        self.documents += documents
+        while self.__pending and documents >= self.__pending[0][2]:
+            rows, key, remaining, watermark = self.__pending.popleft()
+            documents -= remaining
+            self.rows += rows
+            self.key = key if key is not None else self.key
+            self.__update_watermark(watermark)
+            self.skip = 0
+        if self.__pending and documents:
+            self.__pending[0][2] -= documents
+            self.skip += documents
+        self.save()
+
+    def save(self):
+        write_json_atomic(self.path, {
+            'query_id': self.query_id,
+            'rows': self.rows,
+            'key': self.key,
+            'watermark': self.watermark,
+            'skip': self.skip,
+            'documents': self.documents,
+            'paths': self.paths,
+        })
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
 def dump_connector_data(name: str, data: dict) -> str:
     return dump_data_to_file(
         name=name,
         data=data,
         path=get_connector_folder(name)
     )
+
+
+class RotatingFileSink:
+    """
+    Writes records incrementally to timestamped files, starting a new file
+    every max_size records. Only the record being serialized is held in
+    memory, regardless of how many records go through the sink.
+
+    Args:
+        name (str): prefix for the generated file names
+        path (Path): folder where the files are created
+        max_size (int): maximum number of records per file
+        on_close (Optional[Callable[[str, int], None]], optional): called
+            with the path and amount of records of every completed file. [None]
+        file_format (str, optional): format of the files, see
+            writers.WRITERS. ["json"]
+
+    Files only get their final name once complete, so an interrupted run
+    never leaves a truncated file behind.
+
+    Raises:
+        ValueError: If an invalid file format is provided
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: Path,
+        max_size: int,
+        on_close: Optional[Callable[[str, int], None]] = None,
+        file_format: str = 'json',
+    ):
+        if file_format not in WRITERS:
+            raise ValueError(f'File format ({file_format}) invalid')
+        self.name = name
+        self.path = path
+        self.max_size = max_size
+        self.on_close = on_close
+        self.file_format = file_format
+        self.paths: List[str] = []
+        self.__writer: Optional[RecordWriter] = None
+
+    def __open(self):
+        folder_path = str(self.path) if self.path.exists() \
+            else make_folder(self.path)
+        extension = WRITERS[self.file_format].extension
+        file_path = Path(join(folder_path, get_timestamp_name(
+            self.name, extension)))
+        if file_path.exists():
+            # Files rotated within the same millisecond share the timestamp
+            stem = file_path.name.removesuffix(f'.{extension}')
+            file_path = file_path.with_name(
+                f'{stem}_{len(self.paths) + 1}.{extension}')
+        self.__writer = get_writer(self.file_format, file_path)
+
+    def __close_file(self):
+        if self.__writer is not None:
+            path = str(self.__writer.close())
+            count = self.__writer.count
+            self.__writer = None
+            self.paths.append(path)
+            if self.on_close is not None:
+                self.on_close(path, count)
+
+    def write(self, records: Iterable[dict]):
+        for record in records:
+            if self.__writer is None or \
+                    self.__writer.count >= self.max_size:
+                self.__close_file()
+                self.__open()
+            self.__writer.write(record)
+
+    def close(self) -> List[str]:
+        """Closes the current file, creating an empty one if no records were
+        written, and returns the paths of every file created."""
+        if not self.paths and self.__writer is None:
+            self.__open()
+        self.__close_file()
+        return self.paths
+
+    def __enter__(self) -> 'RotatingFileSink':
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+        elif self.__writer is not None:
+            # Keep the completed files only
+            self.__writer.abort()
+            self.__writer = None
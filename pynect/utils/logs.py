@@ -0,0 +1,176 @@
+import atexit
+import copy
+import json
+import logging
+import time
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from threading import Lock
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'function': record.funcName,
+            'message': record.getMessage(),
+        }
+        if suppressed := getattr(record, 'suppressed', 0):
+            data['suppressed'] = suppressed
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Limits repetitive messages, e.g. one per page, by call site. Keeps one
+    of every sample records and at most rate records per second of each
+    line that logs. Warnings and errors always pass. The next record that
+    passes carries the amount dropped in its suppressed attribute.
+
+    Args:
+        sample (int, optional): keep one of every sample records. [1]
+        rate (Optional[float], optional): max records per second. [None]
+    """
+
+    def __init__(self, sample: int = 1, rate: Optional[float] = None):
+        super().__init__()
+        self.sample = max(1, sample)
+        self.rate = rate
+        # call site: (records seen, dropped, allowance, last check)
+        self.__sites: Dict[Tuple[str, int], list] = {}
+        self.__lock = Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        with self.__lock:
+            site = self.__sites.setdefault(
+                (record.pathname, record.lineno),
+                [0, 0, self.rate or 0.0, now])
+            site[0] += 1
+            keep = (site[0] - 1) % self.sample == 0
+            if keep and self.rate is not None:
+                site[2] = min(self.rate,
+                              site[2] + (now - site[3]) * self.rate)
+                site[3] = now
+                keep = site[2] >= 1
+                if keep:
+                    site[2] -= 1
+            if not keep:
+                site[1] += 1
+                return False
+            record.suppressed, site[1] = site[1], 0
+        return True
+
+
+class _SinkQueueHandler(QueueHandler):
+    """QueueHandler that tags records with the key of their sink"""
+
+    def __init__(self, queue: SimpleQueue, key: Hashable):
+        super().__init__(queue)
+        self.key = key
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only the message is rendered here, the sink formats the record,
+        # so JSON sinks still get the exception in its own field
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        record.sink = self.key
+        return record
+
+
+class _SinkDispatcher(logging.Handler):
+    """Hands every record to the handler of its sink"""
+
+    def __init__(self, sinks: Dict[Hashable, logging.Handler]):
+        super().__init__()
+        self.sinks = sinks
+
+    def handle(self, record: logging.LogRecord):
+        if (sink := self.sinks.get(record.sink)) is not None:
+            sink.handle(record)
+
+
+class LogQueue:
+    """
+    One QueueListener thread that writes the records of every configured
+    logger, so the threads that log never wait for the disk or terminal.
+    Each sink, e.g. a file, gets a single handler however many loggers or
+    calls use it.
+    """
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__queue: SimpleQueue = SimpleQueue()
+        self.__sinks: Dict[Hashable, logging.Handler] = {}
+        self.__listener: Optional[QueueListener] = None
+
+    def __start(self):
+        if self.__listener is None:
+            self.__listener = QueueListener(
+                self.__queue, _SinkDispatcher(self.__sinks))
+            self.__listener.start()
+
+    def attach(self, logger: logging.Logger, key: Hashable,
+               factory: Callable[[], logging.Handler],
+               log_filter: Optional[logging.Filter] = None,
+               formatter: Optional[logging.Formatter] = None
+               ) -> QueueHandler:
+        """
+        Routes the records of logger to the sink key, created with factory
+        the first time. Calling it again for the same logger and key
+        returns the existing handler. A formatter replaces the one of the
+        sink, for every logger that writes to it.
+        """
+        with self.__lock:
+            for handler in logger.handlers:
+                if (isinstance(handler, _SinkQueueHandler)
+                        and handler.key == key):
+                    break
+            else:
+                handler = _SinkQueueHandler(self.__queue, key)
+                logger.addHandler(handler)
+            for previous in list(handler.filters):
+                handler.removeFilter(previous)
+            if log_filter is not None:
+                handler.addFilter(log_filter)
+            if key not in self.__sinks:
+                self.__sinks[key] = factory()
+            if formatter is not None:
+                self.__sinks[key].setFormatter(formatter)
+            self.__start()
+            return handler
+
+    def flush(self):
+        """Waits until every queued record is written"""
+        with self.__lock:
+            if self.__listener is not None:
+                self.__listener.stop()
+                self.__listener = None
+                self.__start()
+            for sink in self.__sinks.values():
+                sink.flush()
+
+    def close(self):
+        """Stops the listener thread and closes every sink"""
+        with self.__lock:
+            if self.__listener is not None:
+                self.__listener.stop()
+                self.__listener = None
+            for sink in self.__sinks.values():
+                sink.close()
+            self.__sinks.clear()
+
+
+log_queue = LogQueue()
+atexit.register(log_queue.close)
@@ -1,22 +1,107 @@
 import logging
 import smtplib
 import ssl
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
 from email.mime.text import MIMEText
-from typing import Any, Optional
+from pathlib import Path
+from queue import Empty, SimpleQueue
+from threading import Condition, Lock, Thread
+from typing import Any, Dict, Iterable, List, Optional, Union
 from os.path import basename
 
+from attrs import asdict, define, evolve, field
+
+from .file_management import read_json, write_json_atomic
+
 
 class SMTPServer:
-    """ Stores the SMTP Server configuration information """
+    """
+    Stores the SMTP Server configuration information. The connection is
+    opened the first time server is used.
+
+    Args:
+        port (int): SMTP port
+        sender_email (str): from address and login user
+        password (str): login password, no login if empty
+        name (Any): SMTP host
+        starttls (bool, optional): upgrades the connection to TLS. [True]
+        timeout (float, optional): socket timeout in seconds. [30]
+    """
 
-    def __init__(self, port: int, sender_email: str, password: str, name: Any):
+    def __init__(self, port: int, sender_email: str, password: str, name: Any,
+                 starttls: bool = True, timeout: float = 30):
         self.port = port
         self.sender_email = sender_email
         self.password = password
         self.name = name
-        self.server = smtplib.SMTP(name, self.port)
+        self.starttls = starttls
+        self.timeout = timeout
+        self.__server: Optional[smtplib.SMTP] = None
+
+    @property
+    def server(self) -> smtplib.SMTP:
+        if self.__server is None:
+            self.__server = self.connect()
+        return self.__server
+
+    def connect(self) -> smtplib.SMTP:
+        """Opens a new connection to the server"""
+        return smtplib.SMTP(self.name, self.port, timeout=self.timeout)
+
+
+@define
+class Email:
+    """An HTML email, to may hold several comma separated addresses"""
+    to: Union[str, List[str]]
+    subject: str
+    plain_msg: str
+    html_msg: str
+    file_paths: Optional[List[str]] = field(default=None)
+
+    @property
+    def recipients(self) -> List[str]:
+        addresses = (self.to.split(',') if isinstance(self.to, str)
+                     else self.to)
+        return [address.strip() for address in addresses if address.strip()]
+
+
+@define
+class DeliveryResult:
+    """
+    Outcome of the delivery of an email to one recipient. Permanent
+    failures, like 5xx rejections, fail again if retried.
+    """
+    recipient: str
+    ok: bool
+    error: Optional[str] = field(default=None)
+    attempts: int = field(default=1)
+    permanent: bool = field(default=False)
+
+
+class _Attachments:
+    """Attachments read once and shared by every message that uses them"""
+
+    def __init__(self):
+        self.__parts: Dict[str, MIMEApplication] = {}
+        self.__lock = Lock()
+
+    def get(self, path: str) -> MIMEApplication:
+        with self.__lock:
+            if (part := self.__parts.get(path)) is None:
+                with open(path, "rb") as fil:
+                    ext = path.split('.')[-1:][0]
+                    part = MIMEApplication(fil.read(), _subtype=ext)
+                part.add_header(
+                    'content-disposition',
+                    'attachment',
+                    filename=basename(path)
+                )
+                self.__parts[path] = part
+            return part
 
 
 class EmailSender:
@@ -29,15 +114,18 @@ class EmailSender:
         self.smtp_server = server
         self.__logger = logging.getLogger(f'Email Sender {server.name}')
 
+    def __authenticate(self, server: smtplib.SMTP):
+        server.ehlo()
+        if self.smtp_server.starttls:
+            server.starttls(context=ssl.create_default_context())
+            server.ehlo()
+        if self.smtp_server.password:
+            server.login(self.smtp_server.sender_email,
+                         self.smtp_server.password)
+
     def login(self):
         # Performs akthentication based on the provided SMTP Server configs
-        context = ssl.create_default_context()
-        server = self.smtp_server.server
-        server.ehlo()
-        server.starttls(context=context)
-        server.ehlo()
-        server.login(self.smtp_server.sender_email,
-                     self.smtp_server.password)
+        self.__authenticate(self.smtp_server.server)
         self.__logger.debug(
             'Logged in to smtp server' +
             f'{self.smtp_server.name}:{self.smtp_server.port}'
@@ -50,6 +138,33 @@ class EmailSender:
             f'{self.smtp_server.name}:{self.smtp_server.port}'
         )
 
+    def connect(self) -> smtplib.SMTP:
+        """Opens and authenticates a new connection"""
+        server = self.smtp_server.connect()
+        try:
+            self.__authenticate(server)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def build_message(self, email: Email,
+                      attachments: Optional[_Attachments] = None
+                      ) -> MIMEMultipart:
+        attachments = attachments or _Attachments()
+        message = MIMEMultipart("alternative")
+        message["Subject"] = email.subject
+        message["From"] = self.smtp_server.sender_email
+        message["To"] = ', '.join(email.recipients)
+        part1 = MIMEText(email.plain_msg, "plain")
+        part2 = MIMEText(email.html_msg, "html")
+        message.attach(part1)
+        message.attach(part2)
+        for f in email.file_paths or []:
+            self.__logger.info(f'Adding attachment: {f}')
+            message.attach(attachments.get(f))
+        return message
+
     def send_html_email(
         self,
         to: str,
@@ -68,27 +183,8 @@ class EmailSender:
         """
         try:
             self.__logger.info('Creating email')
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = self.smtp_server.sender_email
-            message["To"] = to
-            part1 = MIMEText(plain_msg, "plain")
-            part2 = MIMEText(html_msg, "html")
-            message.attach(part1)
-            message.attach(part2)
-
-            for f in file_paths or []:
-                self.__logger.info(f'Adding attachment: {f}')
-                with open(f, "rb") as fil:
-                    ext = f.split('.')[-1:][0]
-                    attached_file = MIMEApplication(fil.read(), _subtype=ext)
-                    attached_file.add_header(
-                        'content-disposition',
-                        'attachment',
-                        filename=basename(f)
-                    )
-                    message.attach(attached_file)
-
+            message = self.build_message(
+                Email(to, subject, plain_msg, html_msg, file_paths))
             self.__logger.debug(f'Sending email to:\t{to}')
             self.__logger.debug(f'{subject} | {plain_msg}')
             self.smtp_server.server.sendmail(
@@ -96,3 +192,305 @@ class EmailSender:
             )
         except Exception as e:
             self.__logger.error(e)
+
+    def send_many(self, emails: Iterable[Email], connections: int = 2,
+                  retries: int = 2) -> List[DeliveryResult]:
+        """
+        Sends the emails through a pool of up to connections authenticated
+        connections, each one reused for many messages. A dropped
+        connection is reopened and its message retried up to retries times,
+        as are temporary (4xx) rejections.
+
+        Args:
+            emails (Iterable[Email]): emails to send
+            connections (int, optional): parallel connections. [2]
+            retries (int, optional): extra attempts per email. [2]
+
+        Returns:
+            List[DeliveryResult]: result per recipient, in the order of the
+            emails
+        """
+        emails = list(emails)
+        pending: SimpleQueue = SimpleQueue()
+        for index, email in enumerate(emails):
+            pending.put((index, email))
+        results: List[List[DeliveryResult]] = [[] for _ in emails]
+        attachments = _Attachments()
+
+        def deliver():
+            server = None
+            try:
+                while True:
+                    try:
+                        index, email = pending.get_nowait()
+                    except Empty:
+                        return
+                    results[index], server = self.__deliver(
+                        server, email, attachments, retries)
+            finally:
+                if server is not None:
+                    self.__quit(server)
+
+        workers = max(1, min(connections, len(emails)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(deliver)
+                           for _ in range(workers)]:
+                future.result()
+        return [result for email_results in results
+                for result in email_results]
+
+    def __deliver(self, server: Optional[smtplib.SMTP], email: Email,
+                  attachments: _Attachments, retries: int):
+        recipients = email.recipients
+        try:
+            message = self.build_message(email, attachments).as_string()
+        except Exception as e:
+            # Nothing was sent, the connection is still usable
+            self.__logger.error(f'Email to {email.to} not built: {e}')
+            return [DeliveryResult(r, False, str(e), permanent=True)
+                    for r in recipients], server
+        error = None
+        for attempt in range(1, retries + 2):
+            try:
+                if server is None:
+                    server = self.connect()
+                refused = server.sendmail(
+                    self.smtp_server.sender_email, recipients, message)
+                return [DeliveryResult(
+                    r, r not in refused,
+                    str(refused[r]) if r in refused else None, attempt,
+                    r in refused and refused[r][0] >= 500)
+                    for r in recipients], server
+            except smtplib.SMTPRecipientsRefused as e:
+                return [DeliveryResult(
+                    r, False, str(e.recipients.get(r)), attempt,
+                    e.recipients.get(r, (0,))[0] >= 500)
+                    for r in recipients], server
+            except smtplib.SMTPResponseException as e:
+                error = e
+                if not 400 <= e.smtp_code < 500:
+                    break
+                if server is None:
+                    # Raised while connecting, e.g. a temporary AUTH failure
+                    continue
+                try:
+                    server.rset()
+                except (smtplib.SMTPException, OSError):
+                    server.close()
+                    server = None
+            except (smtplib.SMTPServerDisconnected, OSError) as e:
+                error = e
+                self.__logger.warning(f'SMTP connection lost: {e}')
+                if server is not None:
+                    server.close()
+                server = None
+        self.__logger.error(f'Email to {email.to} failed: {error}')
+        permanent = isinstance(error, smtplib.SMTPResponseException) \
+            and error.smtp_code >= 500
+        return [DeliveryResult(r, False, str(error), attempt, permanent)
+                for r in recipients], server
+
+    def __quit(self, server: smtplib.SMTP):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+
+@define
+class OutboxItem:
+    """An email waiting in the outbox"""
+    id: str
+    email: Email
+    attempts: int = field(default=0)
+    due: float = field(default=0.0)
+    error: Optional[str] = field(default=None)
+
+
+class Outbox:
+    """
+    Delivers emails in a background thread so jobs don't wait for the SMTP
+    server. Failed emails are retried with exponential backoff, only to the
+    recipients that failed, and moved to dead_letters after retries
+    attempts, or right away when the failure is permanent (5xx). With a
+    spool folder every queued email is also written to disk, so emails left
+    by a run that ended early are sent by the next Outbox on the same
+    folder; dead letters are kept in spool/dead.
+
+    Args:
+        sender (EmailSender): sends the emails, see EmailSender.send_many
+        spool (Optional[Union[Path, str]], optional): spool folder. [None]
+        retries (int, optional): attempts before dead-lettering. [5]
+        backoff (float, optional): seconds before the first retry, doubled
+            on every attempt. [1]
+        max_backoff (float, optional): max seconds between attempts. [300]
+        batch_size (int, optional): emails sent per batch. [50]
+        connections (int, optional): parallel SMTP connections. [1]
+    """
+
+    def __init__(self,
+                 sender: EmailSender,
+                 spool: Optional[Union[Path, str]] = None,
+                 retries: int = 5,
+                 backoff: float = 1,
+                 max_backoff: float = 300,
+                 batch_size: int = 50,
+                 connections: int = 1):
+        self.sender = sender
+        self.spool = Path(spool) if spool else None
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.batch_size = batch_size
+        self.connections = connections
+        self.dead_letters: List[OutboxItem] = []
+        self.__pending: List[OutboxItem] = []
+        self.__in_flight = 0
+        self.__closed = False
+        self.__condition = Condition()
+        self.__worker: Optional[Thread] = None
+        self.__logger = logging.getLogger(f'Outbox {sender.smtp_server.name}')
+        if self.spool is not None:
+            for path in sorted(self.spool.glob('*.json')):
+                data = read_json(path)
+                data['email'] = Email(**data['email'])
+                # Retried right away, the server may be reachable now
+                data['due'] = 0.0
+                self.__pending.append(OutboxItem(**data))
+            if self.__pending:
+                self.__logger.info(
+                    f'Recovered {len(self.__pending)} spooled emails')
+                self.__start()
+
+    def __len__(self) -> int:
+        with self.__condition:
+            return len(self.__pending) + self.__in_flight
+
+    def __start(self):
+        if self.__worker is None:
+            self.__worker = Thread(target=self.__run, daemon=True,
+                                   name='outbox')
+            self.__worker.start()
+
+    def __spool(self, item: OutboxItem, folder: Optional[str] = None):
+        if self.spool is not None:
+            path = self.spool / folder if folder else self.spool
+            write_json_atomic(path / f'{item.id}.json', asdict(item))
+
+    def __unspool(self, item: OutboxItem):
+        if self.spool is not None:
+            (self.spool / f'{item.id}.json').unlink(missing_ok=True)
+
+    def enqueue(self, email: Email) -> str:
+        """Queues email and returns its id"""
+        item = OutboxItem(uuid.uuid4().hex, email)
+        with self.__condition:
+            if self.__closed:
+                raise RuntimeError('The outbox is closed')
+            self.__spool(item)
+            self.__pending.append(item)
+            self.__start()
+            self.__condition.notify_all()
+        return item.id
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until every queued email is delivered or dead-lettered.
+        Returns False if timeout seconds passed first.
+        """
+        with self.__condition:
+            return self.__condition.wait_for(
+                lambda: not self.__pending and not self.__in_flight,
+                timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Flushes the outbox and stops the worker. Emails still queued stay
+        in the spool.
+        """
+        flushed = self.flush(timeout)
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+        if self.__worker is not None:
+            self.__worker.join(timeout)
+        return flushed
+
+    def __next_batch(self) -> List[OutboxItem]:
+        with self.__condition:
+            while not self.__closed:
+                now = time.time()
+                due = [item for item in self.__pending if item.due <= now]
+                if due:
+                    batch = due[:self.batch_size]
+                    for item in batch:
+                        self.__pending.remove(item)
+                    self.__in_flight += len(batch)
+                    return batch
+                wait = min((item.due for item in self.__pending),
+                           default=now + 60) - now
+                self.__condition.wait(wait)
+            return []
+
+    def __run(self):
+        while batch := self.__next_batch():
+            try:
+                results = self.sender.send_many(
+                    [item.email for item in batch], self.connections,
+                    retries=1)
+            except Exception as e:
+                self.__logger.error(f'Outbox delivery failed: {e}')
+                results = [DeliveryResult(r, False, str(e))
+                           for item in batch for r in item.email.recipients]
+            self.__settle(batch, results)
+
+    def __failed(self, item: OutboxItem, failed: List[DeliveryResult],
+                 **changes) -> OutboxItem:
+        """Copy of item addressed only to the failed recipients"""
+        return evolve(item, email=evolve(
+            item.email, to=[result.recipient for result in failed]),
+            attempts=item.attempts + 1, error=failed[0].error, **changes)
+
+    def __settle(self, batch: List[OutboxItem],
+                 results: List[DeliveryResult]):
+        results = iter(results)
+        retry, dead = [], []
+        try:
+            for item in batch:
+                failed = [result for result in (
+                    next(results) for _ in item.email.recipients)
+                    if not result.ok]
+                # Permanent failures are dead-lettered without retrying
+                temporary = [result for result in failed
+                             if not result.permanent]
+                permanent = [result for result in failed
+                             if result.permanent]
+                if temporary and item.attempts + 1 >= self.retries:
+                    permanent, temporary = failed, []
+                if permanent:
+                    dead.append(self.__failed(item, permanent))
+                    self.__logger.error(
+                        f'Dead-lettering email to {dead[-1].email.to}: '
+                        f'{dead[-1].error}')
+                if temporary:
+                    retry.append(self.__failed(
+                        item, temporary, due=time.time() + min(
+                            self.max_backoff,
+                            self.backoff * 2 ** item.attempts)))
+                try:
+                    if permanent:
+                        self.__spool(dead[-1], 'dead')
+                    if temporary:
+                        self.__spool(retry[-1])
+                    else:
+                        self.__unspool(item)
+                except OSError as e:
+                    # The email is still retried or dead-lettered in memory
+                    self.__logger.error(f'Could not spool email {item.id}: '
+                                        f'{e}')
+        finally:
+            with self.__condition:
+                self.dead_letters.extend(dead)
+                self.__pending.extend(retry)
+                self.__in_flight -= len(batch)
+                self.__condition.notify_all()
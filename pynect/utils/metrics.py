@@ -0,0 +1,149 @@
+from threading import Lock
+from typing import Dict, Iterable, Tuple
+
+from attrs import define
+
+QUANTILES = (0.5, 0.95, 0.99)
+# Sub-buckets per power of two, the relative error of a quantile is 1/8
+_SUB_BITS = 3
+
+
+def _bucket(value: int) -> int:
+    """Log-linear bucket of value: its power of two and top mantissa bits"""
+    bits = value.bit_length()
+    if bits <= _SUB_BITS:
+        return value
+    return ((bits - _SUB_BITS) << _SUB_BITS) | (
+        (value >> (bits - _SUB_BITS - 1)) & ((1 << _SUB_BITS) - 1))
+
+
+def _bucket_upper(bucket: int) -> int:
+    """Largest value of a bucket"""
+    if bucket < 1 << _SUB_BITS:
+        return bucket
+    shift = (bucket >> _SUB_BITS) - 1
+    mantissa = (1 << _SUB_BITS) | (bucket & ((1 << _SUB_BITS) - 1))
+    return ((mantissa + 1) << shift) - 1
+
+
+@define
+class LatencySnapshot:
+    count: int
+    total: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations in nanoseconds with log-linear buckets, so
+    recording is a dict increment and quantiles are within 12.5%.
+    """
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.__lock:
+            self.__buckets: Dict[int, int] = {}
+            self.count = 0
+            self.total = 0
+            self.max = 0
+
+    def record(self, ns: int):
+        bucket = _bucket(ns)
+        with self.__lock:
+            self.__buckets[bucket] = self.__buckets.get(bucket, 0) + 1
+            self.count += 1
+            self.total += ns
+            if ns > self.max:
+                self.max = ns
+
+    def quantiles(self, quantiles: Iterable[float] = QUANTILES
+                  ) -> Tuple[int, ...]:
+        """Upper bounds in nanoseconds of the quantiles"""
+        with self.__lock:
+            buckets = sorted(self.__buckets.items())
+            count, maximum = self.count, self.max
+        values = []
+        for quantile in quantiles:
+            rank, seen, value = quantile * count, 0, 0
+            for bucket, amount in buckets:
+                seen += amount
+                value = _bucket_upper(bucket)
+                if seen >= rank:
+                    break
+            values.append(min(value, maximum))
+        return tuple(values)
+
+    def snapshot(self) -> LatencySnapshot:
+        """Count, total and quantiles in seconds"""
+        p50, p95, p99 = self.quantiles()
+        return LatencySnapshot(self.count, self.total / 1e9, p50 / 1e9,
+                               p95 / 1e9, p99 / 1e9, self.max / 1e9)
+
+
+class MetricsRegistry:
+    """Latency histograms by name, e.g. of the functions wrapped by timeit"""
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__histograms: Dict[str, LatencyHistogram] = {}
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        if (histogram := self.__histograms.get(name)) is None:
+            with self.__lock:
+                histogram = self.__histograms.setdefault(
+                    name, LatencyHistogram())
+        return histogram
+
+    def record(self, name: str, ns: int):
+        self.histogram(name).record(ns)
+
+    def reset(self):
+        """
+        Empties every histogram, keeping the ones already held by the
+        functions wrapped by timeit registered.
+        """
+        with self.__lock:
+            histograms = list(self.__histograms.values())
+        for histogram in histograms:
+            histogram.reset()
+
+    def snapshot(self) -> Dict[str, LatencySnapshot]:
+        with self.__lock:
+            histograms = dict(self.__histograms)
+        return {name: histogram.snapshot()
+                for name, histogram in sorted(histograms.items())}
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Snapshot of every histogram in milliseconds"""
+        return {name: {'count': snap.count,
+                       'total_ms': snap.total * 1000,
+                       'p50_ms': snap.p50 * 1000,
+                       'p95_ms': snap.p95 * 1000,
+                       'p99_ms': snap.p99 * 1000,
+                       'max_ms': snap.max * 1000}
+                for name, snap in self.snapshot().items()}
+
+    def to_prometheus(self,
+                      metric: str = 'pynect_function_duration_seconds'
+                      ) -> str:
+        """Snapshot of every histogram in the Prometheus text format"""
+        lines = [f'# HELP {metric} Duration of the timed functions.',
+                 f'# TYPE {metric} summary']
+        for name, snap in self.snapshot().items():
+            label = f'function="{name}"'
+            for quantile, value in zip(QUANTILES,
+                                       (snap.p50, snap.p95, snap.p99)):
+                lines.append(
+                    f'{metric}{{{label},quantile="{quantile}"}} {value:.9f}')
+            lines.append(f'{metric}_sum{{{label}}} {snap.total:.9f}')
+            lines.append(f'{metric}_count{{{label}}} {snap.count}')
+        return '\n'.join(lines) + '\n'
+
+
+default_registry = MetricsRegistry()
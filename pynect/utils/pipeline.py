@@ -0,0 +1,159 @@
+import time
+from concurrent.futures import (Executor, Future, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, TypeVar
+
+from attrs import define, field
+
+T = TypeVar('T')
+U = TypeVar('U')
+
+
+@define
+class StageMetrics:
+    """
+    Timing of a pipeline stage. busy is the time spent doing the stage work
+    and waiting the time blocked on the neighbouring stages, both in seconds.
+    """
+    name: str
+    items: int = field(default=0)
+    busy: float = field(default=0.0)
+    waiting: float = field(default=0.0)
+
+    @property
+    def throughput(self) -> float:
+        """Items per second of busy time"""
+        return self.items / self.busy if self.busy else 0.0
+
+
+def _timed(transform: Callable[[T], U], item: T) -> tuple[U, float]:
+    tic = time.perf_counter()
+    result = transform(item)
+    return result, time.perf_counter() - tic
+
+
+class Pipeline(Generic[T, U]):
+    """
+    Runs the fetch, transform and write stages of an extraction at the same
+    time. A fetcher thread reads the source, a pool of workers transforms the
+    items and the results are yielded in the source order to the consumer,
+    which acts as the writer.
+
+    At most queue_size items wait between the fetcher and the writer, so
+    the memory used is bounded even when a stage is much slower than the
+    others.
+
+    Args:
+        source (Iterable[T]): items to process, e.g. pages of a query
+        transform (Callable[[T], U]): work applied to every item. It must be
+            picklable when processes is set.
+        workers (int, optional): transform workers. [2]
+        queue_size (int, optional): max items in flight. [4]
+        processes (bool, optional): transform in processes instead of
+            threads, for CPU heavy transforms. [False]
+    """
+
+    def __init__(
+        self,
+        source: Iterable[T],
+        transform: Callable[[T], U],
+        workers: int = 2,
+        queue_size: int = 4,
+        processes: bool = False,
+    ):
+        self.source = source
+        self.transform = transform
+        self.workers = workers
+        self.queue_size = max(queue_size, workers)
+        self.processes = processes
+        self.__lock = Lock()
+        self.metrics: Dict[str, StageMetrics] = {
+            name: StageMetrics(name) for name in ('fetch', 'transform',
+                                                  'write')
+        }
+
+    def __record(self, stage: str, busy: float = 0.0, waiting: float = 0.0,
+                 items: int = 0):
+        with self.__lock:
+            metrics = self.metrics[stage]
+            metrics.items += items
+            metrics.busy += busy
+            metrics.waiting += waiting
+
+    def __executor(self) -> Executor:
+        if self.processes:
+            return ProcessPoolExecutor(self.workers)
+        return ThreadPoolExecutor(self.workers,
+                                  thread_name_prefix='pipeline_transform')
+
+    def __fetch(self, executor: Executor, futures: Queue, stop: Event):
+        def put(item: Any):
+            tic = time.perf_counter()
+            while not stop.is_set():
+                try:
+                    futures.put(item, timeout=0.1)
+                    break
+                except Full:
+                    continue
+            self.__record('fetch', waiting=time.perf_counter() - tic)
+
+        try:
+            iterator = iter(self.source)
+            while not stop.is_set():
+                tic = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                self.__record('fetch', busy=time.perf_counter() - tic,
+                              items=1)
+                put(executor.submit(_timed, self.transform, item))
+        except BaseException as e:
+            put(e)
+        finally:
+            put(None)
+
+    def __iter__(self) -> Iterator[U]:
+        futures: Queue = Queue(maxsize=self.queue_size)
+        stop = Event()
+        with self.__executor() as executor:
+            fetcher = Thread(target=self.__fetch,
+                             args=(executor, futures, stop),
+                             name='pipeline_fetch', daemon=True)
+            fetcher.start()
+            try:
+                while True:
+                    tic = time.perf_counter()
+                    try:
+                        future = futures.get(timeout=0.1)
+                    except Empty:
+                        self.__record('write',
+                                      waiting=time.perf_counter() - tic)
+                        continue
+                    if future is None:
+                        break
+                    if isinstance(future, BaseException):
+                        raise future
+                    result, elapsed = future.result()
+                    self.__record('write', waiting=time.perf_counter() - tic)
+                    self.__record('transform', busy=elapsed, items=1)
+                    tic = time.perf_counter()
+                    yield result
+                    self.__record('write', busy=time.perf_counter() - tic,
+                                  items=1)
+            finally:
+                stop.set()
+                fetcher.join()
+                self.__cancel_pending(futures)
+
+    @staticmethod
+    def __cancel_pending(futures: Queue):
+        while True:
+            try:
+                future = futures.get_nowait()
+            except Empty:
+                return
+            if isinstance(future, Future):
+                future.cancel()
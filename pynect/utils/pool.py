@@ -0,0 +1,234 @@
+import atexit
+import hashlib
+import json
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from threading import Condition, Lock
+from typing import (Any, Callable, Deque, Dict, Hashable, Iterator, Optional,
+                    Tuple)
+
+from attrs import define, field
+
+logger = logging.getLogger(__name__)
+
+
+@define
+class PoolStats:
+    size: int = field(default=0)
+    idle: int = field(default=0)
+    in_use: int = field(default=0)
+    created: int = field(default=0)
+    closed: int = field(default=0)
+    checkouts: int = field(default=0)
+    waits: int = field(default=0)
+    evicted: int = field(default=0)
+    failed_checks: int = field(default=0)
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of database connections.
+
+    Idle connections are reused most recent first and closed once they have
+    been idle for more than idle_timeout seconds. Every checked out
+    connection goes through health_check first, and the ones that fail it
+    are replaced by a new connection.
+
+    Args:
+        factory (Callable[[], Any]): opens a new connection
+        max_size (int, optional): max amount of open connections. [4]
+        idle_timeout (float, optional): seconds before an idle connection
+            is closed. [300]
+        health_check (Optional[Callable[[Any], bool]], optional): returns
+            False when a connection can't be used anymore. [None]
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_size: int = 4,
+        idle_timeout: float = 300,
+        health_check: Optional[Callable[[Any], bool]] = None,
+    ):
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self.__idle: Deque[Tuple[Any, float]] = deque()
+        self.__size = 0
+        self.__condition = Condition()
+        self.__stats = PoolStats()
+
+    @property
+    def stats(self) -> PoolStats:
+        with self.__condition:
+            return PoolStats(
+                size=self.__size,
+                idle=len(self.__idle),
+                in_use=self.__size - len(self.__idle),
+                created=self.__stats.created,
+                closed=self.__stats.closed,
+                checkouts=self.__stats.checkouts,
+                waits=self.__stats.waits,
+                evicted=self.__stats.evicted,
+                failed_checks=self.__stats.failed_checks,
+            )
+
+    def __close(self, connection: Any):
+        try:
+            connection.close()
+        except Exception as e:
+            logger.debug(f'Error closing pooled connection: {e}')
+        with self.__condition:
+            self.__size -= 1
+            self.__stats.closed += 1
+            self.__condition.notify()
+
+    def __evict_expired(self) -> list:
+        now = time.monotonic()
+        expired = []
+        # The oldest connections are at the left of the deque
+        while self.__idle and now - self.__idle[0][1] > self.idle_timeout:
+            expired.append(self.__idle.popleft()[0])
+        self.__stats.evicted += len(expired)
+        return expired
+
+    def __is_healthy(self, connection: Any) -> bool:
+        if self.health_check is None:
+            return True
+        try:
+            return self.health_check(connection)
+        except Exception as e:
+            logger.debug(f'Pooled connection failed the health check: {e}')
+            return False
+
+    def __open(self) -> Any:
+        try:
+            connection = self.factory()
+        except Exception:
+            with self.__condition:
+                self.__size -= 1
+                self.__condition.notify()
+            raise
+        with self.__condition:
+            self.__stats.created += 1
+            self.__stats.checkouts += 1
+        return connection
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """
+        Checks out a connection, opening a new one if none is idle and the
+        pool is not full, or waiting for one to be released otherwise.
+
+        Raises:
+            TimeoutError: if no connection is available after timeout seconds
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            connection, reserved = None, False
+            with self.__condition:
+                expired = self.__evict_expired()
+                if self.__idle:
+                    connection = self.__idle.pop()[0]
+                elif self.__size < self.max_size:
+                    self.__size += 1
+                    reserved = True
+                elif not expired:
+                    remaining = None if deadline is None \
+                        else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(
+                            f'No connection available after {timeout}s')
+                    self.__stats.waits += 1
+                    self.__condition.wait(remaining)
+            for conn in expired:
+                self.__close(conn)
+            if reserved:
+                return self.__open()
+            if connection is None:
+                continue
+            if self.__is_healthy(connection):
+                with self.__condition:
+                    self.__stats.checkouts += 1
+                return connection
+            with self.__condition:
+                self.__stats.failed_checks += 1
+            self.__close(connection)
+
+    def release(self, connection: Any, discard: bool = False):
+        """Returns a connection to the pool, closing it when discard is set"""
+        if discard:
+            self.__close(connection)
+            return
+        with self.__condition:
+            self.__idle.append((connection, time.monotonic()))
+            self.__condition.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Context manager that checks out a connection and returns it to the
+        pool on exit. Connections that raised an error are closed instead.
+        """
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        except BaseException:
+            self.release(connection, discard=True)
+            raise
+        self.release(connection)
+
+    def close(self):
+        """Closes every idle connection"""
+        with self.__condition:
+            idle = [conn for conn, _ in self.__idle]
+            self.__idle.clear()
+        for conn in idle:
+            self.__close(conn)
+
+
+def pool_key(**options: Any) -> str:
+    """
+    Key of the pool for connections opened with options. Every option is
+    hashed, so connections that differ in credentials, timeouts or driver
+    settings never share a pool and secrets don't show up in pool_stats.
+    """
+    data = json.dumps(options, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+_pools: Dict[Hashable, ConnectionPool] = {}
+_pools_lock = Lock()
+
+
+def get_pool(
+    key: Hashable,
+    factory: Callable[[], Any],
+    max_size: int = 4,
+    **kwargs
+) -> ConnectionPool:
+    """
+    Returns the process wide pool for key, creating it with the provided
+    arguments the first time. An existing pool grows to max_size if needed.
+    """
+    with _pools_lock:
+        if (pool := _pools.get(key)) is None:
+            pool = _pools[key] = ConnectionPool(factory, max_size, **kwargs)
+        else:
+            pool.max_size = max(pool.max_size, max_size)
+        return pool
+
+
+def pool_stats() -> Dict[Hashable, PoolStats]:
+    with _pools_lock:
+        return {key: pool.stats for key, pool in _pools.items()}
+
+
+@atexit.register
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
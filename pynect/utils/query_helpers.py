@@ -1,7 +1,10 @@
 from __future__ import annotations
-from time import sleep
 
-from typing import Optional
+from typing import Any, Iterable, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+# Characters left as is in keys and values, used by Solr style filters
+SAFE_CHARS = '$:*,/'
 
 
 class RestAPIQuery:
@@ -16,12 +19,116 @@ class RestAPIQuery:
     def endpoint(self):
         return self.base_url
 
+    def url(self, path_params: Optional[str] = None) -> str:
+        return (f'{self.endpoint}/{path_params}' if path_params
+                else self.endpoint)
+
+    def encode(self, params: dict) -> str:
+        """URL encodes params, list values are repeated per item"""
+        return urlencode([
+            (f'{self.prefix}{k}', [f'{item}{self.suffix}' for item in v]
+             if isinstance(v, (list, tuple, set)) else f'{v}{self.suffix}')
+            for k, v in params.items()
+        ], doseq=True, safe=SAFE_CHARS, quote_via=quote)
+
     def __call__(self, path_params: Optional[str] = None, **kwargs) -> str:
+        """
+        Url of path_params with kwargs as the query string. Without kwargs
+        the endpoint is returned as is, ignoring path_params.
+        """
         if kwargs:
-            return (f'{self.endpoint}/{path_params}?'
-                    if path_params else f'{self.endpoint}?') + '&'.join([
-                        f'{self.prefix}{k}={v}{self.suffix}'
-                        for k, v in kwargs.items()
-                    ])
-        else:
-            return self.endpoint
+            return f'{self.url(path_params)}?{self.encode(kwargs)}'
+        return self.endpoint
+
+    def compile(self, path_params: Optional[str] = None,
+                **kwargs) -> QueryTemplate:
+        """
+        Precompiles the url and the static query parameters, so each call
+        of the template only encodes the parameters that vary.
+        """
+        return QueryTemplate(self, path_params, **kwargs)
+
+
+class QueryTemplate:
+    """
+    Url of a RestAPIQuery with its static parts encoded once.
+
+    Args:
+        query (RestAPIQuery): query that encodes the parameters
+        path_params (Optional[str], optional): path after the base url.
+            [None]
+        **kwargs: static query parameters
+    """
+
+    def __init__(self, query: RestAPIQuery,
+                 path_params: Optional[str] = None, **kwargs) -> None:
+        self.query = query
+        self.__url = query.url(path_params) + (
+            f'?{query.encode(kwargs)}' if kwargs else '')
+        self.__separator = '&' if kwargs else '?'
+
+    def __call__(self, **kwargs) -> str:
+        if not kwargs:
+            return self.__url
+        return f'{self.__url}{self.__separator}{self.query.encode(kwargs)}'
+
+    def urls(self, param: str, values: Iterable[Any]) -> List[str]:
+        """Urls with param set to each value"""
+        query = self.query
+        start = (f'{self.__url}{self.__separator}'
+                 f'{quote(query.prefix + param, safe=SAFE_CHARS)}=')
+        suffix = quote(query.suffix, safe=SAFE_CHARS)
+        # Integers, e.g. page numbers, never need to be quoted
+        return [f'{start}{value}{suffix}' if isinstance(value, int)
+                else f'{start}{quote(str(value), safe=SAFE_CHARS)}{suffix}'
+                for value in values]
+
+    def page_urls(self, param: str, start: int, stop: int) -> List[str]:
+        """Urls of the pages in range(start, stop)"""
+        return self.urls(param, range(start, stop))
+
+
+def partition_queries(
+    query: str,
+    column: str,
+    parallelism: int,
+    ranges: Optional[List[Tuple[Any, Any]]] = None,
+    params: tuple = (),
+) -> List[Tuple[str, tuple]]:
+    """
+    Splits a SQL query into sub-queries that together return the same rows.
+    The query params are passed before the ones of each partition.
+
+    With ranges, one sub-query is built per (low, high) pair selecting
+    low <= column < high, where None leaves that side unbounded. Otherwise
+    the rows are split by the non-negative remainder of column divided by
+    parallelism, so column can be any integer expression (e.g. a hash of a
+    text column), including negative ones. The rows where column is NULL
+    are selected by one more sub-query.
+
+    Returns:
+        List[Tuple[str, tuple]]: sub-queries with their parameters
+    """
+    base = f'SELECT * FROM ({query}) AS partitioned WHERE '
+    nulls = (f'{base}{column} IS NULL', tuple(params))
+    if not ranges:
+        # MOD keeps the sign of the dividend, shift it to 0..parallelism-1
+        bucket = (f'MOD(MOD({column}, {parallelism}) + {parallelism}, '
+                  f'{parallelism})')
+        return [(f'{base}{bucket} = ?', (*params, i))
+                for i in range(parallelism)] + [nulls]
+    queries = []
+    for low, high in ranges:
+        conditions, values = [], list(params)
+        if low is not None:
+            conditions.append(f'{column} >= ?')
+            values.append(low)
+        if high is not None:
+            conditions.append(f'{column} < ?')
+            values.append(high)
+        queries.append((base + (' AND '.join(conditions) or '1 = 1'),
+                        tuple(values)))
+    if any(low is None and high is None for low, high in ranges):
+        # An unbounded range already selects the NULL rows
+        return queries
+    return queries + [nulls]
@@ -0,0 +1,103 @@
+import json
+import keyword
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Names used by the compiled methods of slotted records
+RESERVED_NAMES = frozenset({'self', '_kwargs', '_asdict'})
+
+
+def _dict_constructor(self, /, **kwargs):
+    for k in kwargs.keys():
+        if hasattr(self, k):
+            self.__setattr__(k, kwargs[k])
+
+
+def _dict_asdict(self) -> dict:
+    return self.__dict__
+
+
+def _repr(self) -> str:
+    return json.dumps(type(self)._asdict(self), indent=4)
+
+
+def _compile(name: str, source: str) -> Callable:
+    namespace: Dict[str, Any] = {}
+    exec(source, namespace)
+    return namespace[name]
+
+
+def _compile_slots_methods(columns: list[str]) -> Dict[str, Callable]:
+    args = ''.join(f", {c}=''" for c in columns)
+    body = ''.join(f'\n    self.{c} = {c}' for c in columns) or '\n    pass'
+    items = ', '.join(f'{c!r}: self.{c}' for c in columns)
+    return {
+        '__init__': _compile(
+            '__init__', f'def __init__(self{args}, **_kwargs):{body}'),
+        '_asdict': _compile(
+            '_asdict', f'def _asdict(self):\n    return {{{items}}}'),
+    }
+
+
+def can_use_slots(columns: Iterable[str],
+                  reserved: Iterable[str] = ()) -> bool:
+    """
+    Whether columns can be slots: identifiers that are not keywords,
+    dunder names, the names of the compiled methods or arguments, or the
+    reserved names, such as the extra class attributes.
+    """
+    reserved = RESERVED_NAMES.union(reserved)
+    return all(c.isidentifier() and not keyword.iskeyword(c)
+               and not c.startswith('__') and c not in reserved
+               for c in columns)
+
+
+def build_record_class(
+    name: str,
+    columns: Iterable[str],
+    attrs: Optional[Dict[str, Any]] = None,
+    slots: bool = False,
+) -> type:
+    """
+    Creates a record class with one attribute per column.
+
+    The default class stores the values in the instance __dict__ and accepts
+    any keyword, ignoring the ones that are not columns. With slots, the
+    values are stored in __slots__ and __init__/_asdict are compiled for the
+    known column list, which avoids a dict per record and the per key
+    hasattr/setattr calls. Hooks of slotted records can only assign to the
+    columns. If a column is not a valid identifier or clashes with a method
+    or one of attrs the default class is built instead.
+
+    Args:
+        name (str): class name
+        columns (Iterable[str]): attribute names, one per column
+        attrs (Optional[Dict[str, Any]], optional): extra class attributes,
+            such as hooks or a logger. [None]
+        slots (bool, optional): build a slotted class. [False]
+
+    Returns:
+        type: the record class. Instances are serialized with _asdict.
+    """
+    columns = list(columns)
+    attrs = attrs or {}
+    if slots and not can_use_slots(columns, attrs):
+        logger.warning(
+            f'Columns of "{name}" are not valid attribute names, '
+            'building a class without slots')
+        slots = False
+    if slots:
+        methods = {'__slots__': tuple(columns),
+                   **_compile_slots_methods(columns)}
+    else:
+        methods = {**{c: '' for c in columns},
+                   '__init__': _dict_constructor, '_asdict': _dict_asdict}
+    return type(name, (object, ), {'__repr__': _repr, **attrs, **methods})
+
+
+def record_to_dict(record: Any) -> dict:
+    """Serializes a record built by build_record_class"""
+    # Looked up on the class, a column may shadow it in the instance
+    return type(record)._asdict(record)
@@ -5,40 +5,74 @@ import os
 import re
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Generator, Optional
+from typing import Dict, Generator, Iterable, Iterator, List, Optional
 
 import colorlog
 import numpy as np
 import pandas as pd
 
 from .file_management import create_logs_folder
+from .logs import JsonFormatter, SamplingFilter, log_queue
+from .metrics import default_registry
+
+_SPACES = re.compile(r'(\s+)')
+_WORDS = re.compile(r'([^_])([A-Z][a-z]+)')
+_CAMEL = re.compile(r'([a-z0-9])([A-Z])')
 
 LOG_PREFIX = "%(log_color)s%(levelname)-8s%(yellow)s%(module)s[%(funcName)s]%(reset)s\t"
 
 
+def colored_formatter() -> logging.Formatter:
+    return colorlog.ColoredFormatter(
+        LOG_PREFIX+"%(reset)s%(blue)s%(message)s",
+        log_colors={
+            'DEBUG': 'cyan',
+            'INFO': 'green',
+            'WARNING': 'yellow',
+            'ERROR': 'red',
+            'CRITICAL': 'red,bg_black',
+        }
+    )
+
+
 def configure_logger(
         logger_name: str,
         log_level: int = logging.INFO,
         filename: Optional[str] = None,
         project_name: str = 'pynect',
+        json_format: bool = False,
+        sample: int = 1,
+        rate: Optional[float] = None,
 ) -> logging.Logger:
-    handler = (logging.FileHandler(
-        os.path.join(create_logs_folder(project_name), filename)
-    ) if filename else logging.StreamHandler())
-    handler.setFormatter(
-        colorlog.ColoredFormatter(
-            LOG_PREFIX+"%(reset)s%(blue)s%(message)s",
-            log_colors={
-                'DEBUG': 'cyan',
-                'INFO': 'green',
-                'WARNING': 'yellow',
-                'ERROR': 'red',
-                'CRITICAL': 'red,bg_black',
-            }
-        )
-    )
+    """
+    Configures logger_name to write to filename, in the project logs
+    folder, or to the terminal. Records are written by a background thread,
+    see logs.LogQueue. Calling it again for the same logger and output
+    doesn't add another handler, the output takes the latest format.
+
+    Args:
+        logger_name (str): name of the logger
+        log_level (int, optional): [logging.INFO]
+        filename (Optional[str], optional): log file, stderr if None. [None]
+        project_name (str, optional): folder of the log file. ['pynect']
+        json_format (bool, optional): one JSON object per record. [False]
+        sample (int, optional): keep one of every sample records of the
+            same line. [1]
+        rate (Optional[float], optional): max records per second of the
+            same line, see logs.SamplingFilter. [None]
+    """
+    path = (os.path.join(create_logs_folder(project_name), filename)
+            if filename else None)
+
+    def sink() -> logging.Handler:
+        return (logging.FileHandler(path) if path
+                else logging.StreamHandler())
+
     logger = logging.getLogger(logger_name)
-    logger.addHandler(handler)
+    log_queue.attach(
+        logger, path, sink,
+        SamplingFilter(sample, rate) if sample > 1 or rate else None,
+        JsonFormatter() if json_format else colored_formatter())
     logger.setLevel(log_level)
     return logger
 
@@ -66,13 +100,40 @@ def split_list(data: list, size: int) -> Generator[list, None, None]:
         yield data[i: i+size]
 
 
+@functools.lru_cache(maxsize=4096)
 def camel_to_snake(name) -> str:
-    pattern1 = re.compile(r'(\s+)')
-    pattern2 = re.compile(r'([^_])([A-Z][a-z]+)')
-    pattern3 = re.compile(r'([a-z0-9])([A-Z])')
-    name = pattern1.sub('_', name.strip())
-    name = pattern2.sub(r'\1_\2', name)
-    return pattern3.sub(r'\1_\2', name).lower()
+    name = _SPACES.sub('_', name.strip())
+    name = _WORDS.sub(r'\1_\2', name)
+    return _CAMEL.sub(r'\1_\2', name).lower()
+
+
+def camel_to_snake_keys(keys: Iterable[str]) -> List[str]:
+    """Converts every key with camel_to_snake"""
+    return [camel_to_snake(key) for key in keys]
+
+
+def snake_case_records(records: Iterable[dict],
+                       max_layouts: int = 256) -> Iterator[dict]:
+    """
+    Yields each record with its keys converted with camel_to_snake. The
+    converted keys are computed once per distinct set of keys, so records
+    with the same layout only pay for a dict build. Only the last
+    max_layouts layouts are kept, records with varying keys don't grow
+    the memory use.
+
+    Args:
+        records (Iterable[dict]): records to convert
+        max_layouts (int, optional): max cached sets of keys. [256]
+    """
+    layouts: Dict[tuple, List[str]] = {}
+    for record in records:
+        keys = tuple(record)
+        if (converted := layouts.get(keys)) is None:
+            if len(layouts) >= max_layouts:
+                # Dicts keep the insertion order, the oldest goes first
+                del layouts[next(iter(layouts))]
+            converted = layouts[keys] = camel_to_snake_keys(keys)
+        yield dict(zip(converted, record.values()))
 
 
 def map_dataframe_columns(
@@ -96,14 +157,20 @@ def is_valid_email_list(email_list: str) -> bool:
 
 
 def timer(func):
+    """Logs the duration of func and records it in the default registry"""
+    histogram = default_registry.histogram(
+        f'{func.__module__}.{func.__qualname__}')
+    logger = logging.getLogger(func.__module__)
+
     @functools.wraps(func)
     def wrapper_timer(*args, **kwargs):
-        tic = time.perf_counter()
-        value = func(*args, **kwargs)
-        toc = time.perf_counter()
-        elapsed_time = toc - tic
-        print(f"Elapsed time: {elapsed_time:0.4f} seconds")
-        return value
+        tic = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed_time = time.perf_counter_ns() - tic
+            histogram.record(elapsed_time)
+            logger.info(f"Elapsed time: {elapsed_time/1e9:0.4f} seconds")
     return wrapper_timer
 
 
@@ -0,0 +1,233 @@
+import gzip
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+def dumps(record: Any) -> bytes:
+    """Serializes a record to compact JSON, with orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(
+            record, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(record, default=str, separators=(',', ':')).encode()
+
+
+class RecordWriter:
+    """
+    Base class of the record writers. Records are serialized one at a time
+    to a temporary file next to path, which is renamed to path on close so
+    that readers never see a partial file. Leaving the context manager with
+    an exception removes the temporary file.
+
+    Args:
+        path (Path): final file path
+    """
+    extension: str = ''
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.count = 0
+        fd, self.__tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f'.{self.path.name}.',
+            suffix='.part')
+        self.file: IO[bytes] = self._open(os.fdopen(fd, 'wb'))
+
+    def _open(self, file: IO[bytes]) -> IO[bytes]:
+        return file
+
+    def _write(self, record: Any):
+        raise NotImplementedError
+
+    def _finish(self):
+        pass
+
+    def write(self, record: Any):
+        self._write(record)
+        self.count += 1
+
+    def write_many(self, records: Iterable[Any]):
+        for record in records:
+            self.write(record)
+
+    def close(self) -> Path:
+        """Completes the file and moves it to its final path"""
+        self._finish()
+        self.file.close()
+        os.replace(self.__tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        """Discards the file"""
+        self.file.close()
+        os.unlink(self.__tmp_path)
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class JsonWriter(RecordWriter):
+    """Writes the records as an indented JSON array"""
+    extension = 'json'
+
+    def _open(self, file: IO[bytes]) -> IO[bytes]:
+        file.write(b'[')
+        return file
+
+    def _write(self, record: Any):
+        self.file.write(b',\n' if self.count else b'\n')
+        self.file.write(json.dumps(record, indent=4, default=str).encode())
+
+    def _finish(self):
+        self.file.write(b'\n]' if self.count else b']')
+
+
+class NdjsonWriter(RecordWriter):
+    """Writes one compact JSON record per line"""
+    extension = 'ndjson'
+
+    def _write(self, record: Any):
+        self.file.write(dumps(record))
+        self.file.write(b'\n')
+
+
+class GzipNdjsonWriter(NdjsonWriter):
+    extension = 'ndjson.gz'
+
+    def _open(self, file: IO[bytes]) -> IO[bytes]:
+        self.__raw = file
+        return gzip.GzipFile(fileobj=file, mode='wb', compresslevel=6)
+
+    def _finish(self):
+        self.file.close()
+        self.file = self.__raw
+
+
+class ZstdNdjsonWriter(NdjsonWriter):
+    extension = 'ndjson.zst'
+
+    def _open(self, file: IO[bytes]) -> IO[bytes]:
+        if zstandard is None:
+            file.close()
+            raise ImportError(
+                'zstandard is required for zstd output, install it with '
+                '"pip install zstandard"')
+        self.__raw = file
+        return zstandard.ZstdCompressor().stream_writer(
+            file, closefd=False)
+
+    def _finish(self):
+        self.file.close()
+        self.file = self.__raw
+
+
+class ParquetRecordWriter(RecordWriter):
+    """
+    Writes the records to a Parquet file, converting them to an arrow
+    record batch every batch_size records.
+
+    Without a schema it is inferred from the records. While a column only
+    holds None its type is unknown, so up to max_deferred batches are kept
+    in memory until the column gets a value. Columns that are still empty
+    after that get the null type, and a later value fails the write.
+
+    Args:
+        path (Path): final file path
+        batch_size (int, optional): records per record batch. [10000]
+        schema (Optional[pa.Schema], optional): schema of the file. [None]
+        max_deferred (int, optional): batches kept while the type of a
+            column is unknown. [10]
+    """
+    extension = 'parquet'
+
+    def __init__(self, path: Path, batch_size: int = 10000,
+                 schema: Optional[Any] = None, max_deferred: int = 10):
+        from .columnar import require_pyarrow
+        require_pyarrow()
+        self.batch_size = batch_size
+        self.schema = schema
+        self.max_deferred = max_deferred
+        self.__batch: List[Any] = []
+        self.__deferred: List[Any] = []
+        self.__writer = None
+        RecordWriter.__init__(self, path)
+
+    def __open(self, schema: Any):
+        import pyarrow.parquet as pq
+        self.__writer = pq.ParquetWriter(self.file, schema)
+        for batch in self.__deferred:
+            self.__writer.write_batch(batch.cast(schema))
+        self.__deferred.clear()
+
+    def __flush(self):
+        import pyarrow as pa
+        batch = pa.RecordBatch.from_pylist(self.__batch, schema=self.schema)
+        self.__batch.clear()
+        if self.__writer is not None:
+            self.__writer.write_batch(batch.cast(self.__writer.schema))
+            return
+        self.__deferred.append(batch)
+        # Null columns take the type of the first batch with a value
+        schema = pa.unify_schemas([batch.schema for batch in self.__deferred])
+        if (len(self.__deferred) >= self.max_deferred
+                or not any(pa.types.is_null(f.type) for f in schema)):
+            self.__open(schema)
+
+    def _write(self, record: Any):
+        self.__batch.append(record)
+        if len(self.__batch) >= self.batch_size:
+            self.__flush()
+
+    def _finish(self):
+        import pyarrow as pa
+        if self.__batch or (self.__writer is None and not self.__deferred):
+            self.__flush()
+        if self.__writer is None:
+            self.__open(pa.unify_schemas(
+                [batch.schema for batch in self.__deferred]))
+        self.__writer.close()
+
+
+WRITERS: Dict[str, type[RecordWriter]] = {
+    'json': JsonWriter,
+    'ndjson': NdjsonWriter,
+    'ndjson.gz': GzipNdjsonWriter,
+    'ndjson.zst': ZstdNdjsonWriter,
+    'parquet': ParquetRecordWriter,
+}
+
+
+def get_writer(file_format: str, path: Path,
+               **kwargs) -> RecordWriter:
+    """
+    Factory method that provides the record writer of a file format
+
+    Args:
+        file_format (str): one of the keys of WRITERS
+        path (Path): final file path
+
+    Raises:
+        ValueError: If an invalid file format is provided
+    """
+    try:
+        writer_class = WRITERS[file_format]
+    except KeyError:
+        raise ValueError(f'File format ({file_format}) invalid')
+    return writer_class(path, **kwargs)
@@ -24,5 +24,11 @@ setuptools.setup(
         "pandas>=1.2.0",
         "requests>=2.25.0"
     ],
+    extras_require={
+        "arrow": ["pyarrow>=10.0.0"],
+        "async": ["httpx>=0.23.0"],
+        "fast": ["orjson>=3.0.0", "zstandard>=0.18.0"],
+        "stream": ["ijson>=3.1.0"],
+    },
     zip_safe=False,
 )
@@ -1,3 +1,13 @@
+from .test_async_client import TestAsyncClient
 from .test_authentication import TestAuthentication
+from .test_bulk import TestBulk
+from .test_cache import TestResponseCache
+from .test_pagination import TestPagination
+from .test_paginator import TestApiPaginator
+from .test_rate_limit import TestRateLimit
+from .test_streaming import TestStreaming
+from .test_token_cache import TestTokenCache
 
-TESTS = {TestAuthentication}
+TESTS = {TestApiPaginator, TestAsyncClient, TestAuthentication, TestBulk,
+         TestPagination, TestRateLimit, TestResponseCache,
+         TestStreaming, TestTokenCache}
@@ -0,0 +1,106 @@
+import asyncio
+import random
+from unittest import IsolatedAsyncioTestCase, skipIf
+
+import responses
+
+from pynect.api.async_client import (AsyncApiClient, AsyncApiPaginator,
+                                     AsyncSessionAdapter, httpx)
+from pynect.api.authentication import (BasicAuthentication,
+                                       BearerAuthentication,
+                                       TokenAuthentication)
+from pynect.api.token_cache import TokenCache
+from pynect.utils.query_helpers import RestAPIQuery
+
+BASE_URL = 'https://api.pynect.com'
+TOKEN_URL = 'https://auth.pynect.com/oauth/token'
+
+
+@skipIf(httpx is None, 'httpx is not installed')
+class TestAsyncClient(IsolatedAsyncioTestCase):
+
+    def client(self, handler) -> 'httpx.AsyncClient':
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def test_session_adapter_token(self):
+        async with AsyncSessionAdapter(TokenAuthentication('abc')) as client:
+            self.assertEqual('Bearer abc', client.headers['Authorization'])
+
+    async def test_session_adapter_basic(self):
+        auth = BasicAuthentication('user', 'password')
+        async with AsyncSessionAdapter(auth) as client:
+            self.assertIsInstance(client.auth, httpx.BasicAuth)
+
+    @responses.activate
+    async def test_session_adapter_bearer_token_rotation(self):
+        for token in ('first', 'second'):
+            responses.add(responses.POST, TOKEN_URL, json={
+                'access_token': token, 'token_type': 'Bearer',
+                'expires_in': 3600})
+        valid = 'Bearer first'
+        seen = []
+
+        def handler(request: 'httpx.Request') -> 'httpx.Response':
+            seen.append(request.headers['Authorization'])
+            return httpx.Response(
+                200 if seen[-1] == valid else 401, json={})
+
+        auth = BearerAuthentication(
+            'client', 'secret', TOKEN_URL,
+            token_cache=TokenCache(background_refresh=False))
+        transport = httpx.MockTransport(handler)
+        async with AsyncSessionAdapter(auth, transport=transport) as client:
+            self.assertEqual(200, (await client.get(BASE_URL)).status_code)
+            # The server rotates the token, the next request gets a 401
+            valid = 'Bearer second'
+            self.assertEqual(200, (await client.get(BASE_URL)).status_code)
+            self.assertEqual(200, (await client.get(BASE_URL)).status_code)
+        self.assertEqual(['Bearer first', 'Bearer first', 'Bearer second',
+                          'Bearer second'], seen)
+        self.assertEqual('second', auth.token)
+
+    async def test_paginator_in_order(self):
+        in_flight, max_in_flight = 0, 0
+
+        async def handler(request: 'httpx.Request') -> 'httpx.Response':
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(random.random() / 100)
+            in_flight -= 1
+            return httpx.Response(
+                200, json={'page': int(request.url.params['page'])})
+
+        async with self.client(handler) as client:
+            paginator = AsyncApiPaginator(
+                100, 'page', RestAPIQuery(BASE_URL), client,
+                path_params='items', max_concurrency=10)
+            pages = [r.json()['page'] async for r in paginator]
+        self.assertEqual(list(range(1, 101)), pages)
+        self.assertLessEqual(max_in_flight, 10)
+
+    async def test_paginator_retries(self):
+        attempts = []
+
+        def handler(request: 'httpx.Request') -> 'httpx.Response':
+            attempts.append(request)
+            return httpx.Response(503 if len(attempts) == 1 else 200,
+                                  json={})
+
+        async with self.client(handler) as client:
+            paginator = AsyncApiPaginator(
+                1, 'page', RestAPIQuery(BASE_URL), client, backoff=0)
+            responses = await paginator.fetch_all(ordered=False)
+        self.assertEqual([200], [r.status_code for r in responses])
+        self.assertEqual(2, len(attempts))
+
+    async def test_api_client(self):
+        def handler(request: 'httpx.Request') -> 'httpx.Response':
+            return httpx.Response(200, json={'method': request.method,
+                                             'path': request.url.path})
+
+        async with self.client(handler) as client:
+            api = AsyncApiClient(client, BASE_URL)
+            response = await api.update({'id': 1}, 'items/1')
+        self.assertEqual({'method': 'PUT', 'path': '/items/1'},
+                         response.json())
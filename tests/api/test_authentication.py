@@ -9,7 +9,9 @@ import responses
 from pynect.api.authentication import (AuthenticationEnum,
                                        AuthenticationFactory,
                                        BasicAuthentication,
-                                       BearerAuthentication)
+                                       BearerAuthentication,
+                                       TokenAuthentication)
+from pynect.api.session import SessionOptions
 from pynect.utils import configure_logger, timeit
 
 
@@ -57,7 +59,8 @@ class TestAuthentication(TestCase):
             'Accept': 'application/json',
             'Content-Type': 'application/json',
         }
-        current_headers = auth.session.headers
+        current_headers = {
+            k: auth.session.headers[k] for k in expected_headers}
         self.assertDictEqual(current_headers, expected_headers)
 
     def test_authentication_factory_invalid_type(self):
@@ -65,3 +68,24 @@ class TestAuthentication(TestCase):
             ValueError,
             AuthenticationFactory.get, 'test', {}
         )
+
+    def test_authentication_factory_shared(self):
+        credentials = {'user': 'isearch', 'password': 'basic_auth_pw'}
+        auth = AuthenticationFactory.get(
+            AuthenticationEnum.BASIC, credentials, shared=True)
+        self.assertIs(auth, AuthenticationFactory.get(
+            AuthenticationEnum.BASIC, dict(credentials), shared=True))
+        self.assertIsNot(auth, AuthenticationFactory.get(
+            AuthenticationEnum.BASIC, credentials))
+
+    @responses.activate
+    def test_session_options(self):
+        url = 'https://api.pynect.com/items'
+        responses.add(responses.GET, url, json=[])
+        auth = TokenAuthentication(
+            'token', SessionOptions(pool_maxsize=4, timeout=5))
+        auth()
+        auth.session.get(url)
+        self.assertEqual(5, responses.calls[0].request.req_kwargs['timeout'])
+        self.assertIn('User-Agent', auth.session.headers)
+        self.assertEqual(4, auth.session.get_adapter(url)._pool_maxsize)
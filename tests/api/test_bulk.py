@@ -0,0 +1,59 @@
+from typing import Optional
+from unittest import TestCase
+
+import responses
+from requests import Response, Session
+
+from pynect.api.bulk import BulkOperationsMixin, send_many
+
+API_URL = 'https://api.pynect.com/items'
+
+
+class ItemsClient(BulkOperationsMixin):
+
+    def __init__(self):
+        self.session = Session()
+
+    def update(self, data: dict, endpoint: Optional[str] = None,
+               params: Optional[dict] = None, **kwargs) -> Response:
+        return self.session.put(f'{API_URL}/{data["id"]}', json=data,
+                                params=params, **kwargs)
+
+    def delete(self, endpoint: str, **kwargs) -> Response:
+        return self.session.delete(f'{API_URL}/{endpoint}', **kwargs)
+
+
+class TestBulk(TestCase):
+
+    @responses.activate
+    def test_update_many(self):
+        for item in range(25):
+            responses.add(responses.PUT, f'{API_URL}/{item}', json={})
+        result = ItemsClient().update_many(
+            [{'id': item} for item in range(25)], batch_size=4,
+            max_workers=3)
+        self.assertTrue(result.ok)
+        self.assertEqual(list(range(25)),
+                         [r.item['id'] for r in result.results])
+        self.assertEqual(25, len(responses.calls))
+
+    @responses.activate
+    def test_retry_failed_items_only(self):
+        responses.add(responses.DELETE, f'{API_URL}/1', json={})
+        responses.add(responses.DELETE, f'{API_URL}/2', status=503)
+        responses.add(responses.DELETE, f'{API_URL}/2', json={})
+        responses.add(responses.DELETE, f'{API_URL}/3', status=404)
+        result = ItemsClient().delete_many(['1', '2', '3'], backoff=0)
+        self.assertEqual(['1', '2'], [r.item for r in result.succeeded])
+        self.assertEqual([1, 2, 1], [r.attempts for r in result.results])
+        self.assertEqual(404, result.failed[0].response.status_code)
+        self.assertEqual(4, len(responses.calls))
+
+    def test_errors_are_collected(self):
+        def send(item: int) -> Response:
+            raise ValueError(item)
+
+        result = send_many(range(3), send, retries=5, backoff=0)
+        self.assertFalse(result.ok)
+        self.assertEqual([1, 1, 1], [r.attempts for r in result.failed])
+        self.assertIsInstance(result.failed[0].error, ValueError)
@@ -0,0 +1,120 @@
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import responses
+from requests import Session
+from responses import matchers
+
+from pynect.api.cache import ResponseCache
+from pynect.api.session import SessionOptions, build_session
+
+API_URL = 'https://api.pynect.com/items'
+
+
+def cached_session(cache: ResponseCache) -> Session:
+    return build_session(SessionOptions(response_cache=cache))
+
+
+class TestResponseCache(TestCase):
+
+    @responses.activate
+    def test_fresh_response_is_reused(self):
+        responses.add(responses.GET, API_URL, json={'items': [1, 2]})
+        cache = ResponseCache()
+        session = cached_session(cache)
+        first = session.get(API_URL)
+        second = session.get(API_URL)
+        self.assertEqual(first.json(), second.json())
+        self.assertTrue(second.from_cache)
+        self.assertEqual(1, len(responses.calls))
+        stats = cache.stats
+        self.assertEqual((1, 1), (stats.hits, stats.misses))
+        self.assertEqual(len(first.content), stats.bytes_saved)
+
+    @responses.activate
+    def test_stale_response_is_revalidated(self):
+        responses.add(responses.GET, API_URL, json={'items': [1]},
+                      headers={'ETag': '"v1"'})
+        responses.add(responses.GET, API_URL, status=304, match=[
+            matchers.header_matcher({'If-None-Match': '"v1"'})])
+        session = cached_session(ResponseCache(ttls={'/items$': 0.01}))
+        session.get(API_URL)
+        time.sleep(0.02)
+        response = session.get(API_URL)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'items': [1]}, response.json())
+        self.assertEqual(2, len(responses.calls))
+        self.assertEqual(1, session.adapters['https://']
+                         .response_cache.stats.revalidated)
+
+    @responses.activate
+    def test_revalidation_updates_lowercase_validators(self):
+        responses.add(responses.GET, API_URL, json={'items': [1]},
+                      headers={'ETag': '"v1"'})
+        for old, new in (('"v1"', '"v2"'), ('"v2"', '"v3"')):
+            responses.add(responses.GET, API_URL, status=304,
+                          headers={'etag': new}, match=[
+                              matchers.header_matcher({'If-None-Match': old})])
+        cache = ResponseCache(ttls={'/items$': 0.01})
+        session = cached_session(cache)
+        for _ in range(3):
+            session.get(API_URL)
+            time.sleep(0.02)
+        self.assertEqual(2, cache.stats.revalidated)
+        entry = cache.get(API_URL)
+        self.assertEqual('"v3"', entry.headers['ETag'])
+        self.assertEqual(1, sum(k.lower() == 'etag' for k in entry.headers))
+
+    @responses.activate
+    def test_disk_store(self):
+        responses.add(responses.GET, API_URL, json={'items': [1]})
+        with TemporaryDirectory() as folder:
+            cached_session(ResponseCache(disk=True, path=folder)).get(API_URL)
+            self.assertEqual(1, len(list(Path(folder).glob('*.json'))))
+            cache = ResponseCache(disk=True, path=folder)
+            response = cached_session(cache).get(API_URL)
+            self.assertEqual({'items': [1]}, response.json())
+            self.assertEqual(1, cache.stats.hits)
+        self.assertEqual(1, len(responses.calls))
+
+    @responses.activate
+    def test_lru_eviction_and_uncached_methods(self):
+        for path in ('a', 'b'):
+            responses.add(responses.GET, f'{API_URL}/{path}', json=path)
+        responses.add(responses.POST, API_URL, json={})
+        session = cached_session(ResponseCache(max_entries=1))
+        for path in ('a', 'b', 'a'):
+            session.get(f'{API_URL}/{path}')
+        session.post(API_URL)
+        session.post(API_URL)
+        self.assertEqual(5, len(responses.calls))
+
+    @responses.activate
+    def test_credentials_are_part_of_the_key(self):
+        for token in ('a', 'b'):
+            responses.add(responses.GET, API_URL, json={'user': token}, match=[
+                matchers.header_matcher({'Authorization': f'Bearer {token}'})])
+        cache = ResponseCache()
+        for _ in range(2):
+            for token in ('a', 'b'):
+                session = cached_session(cache)
+                session.headers['Authorization'] = f'Bearer {token}'
+                self.assertEqual({'user': token}, session.get(API_URL).json())
+        self.assertEqual(2, len(responses.calls))
+        self.assertEqual(2, cache.stats.hits)
+
+    @responses.activate
+    def test_cache_control_and_vary(self):
+        responses.add(responses.GET, f'{API_URL}/private', json={},
+                      headers={'Cache-Control': 'private, max-age=60'})
+        responses.add(responses.GET, f'{API_URL}/vary', json={},
+                      headers={'Vary': 'Accept-Language'})
+        session = cached_session(ResponseCache())
+        for _ in range(2):
+            session.get(f'{API_URL}/private')
+        for language in ('en', 'fr'):
+            session.get(f'{API_URL}/vary',
+                        headers={'Accept-Language': language})
+        self.assertEqual(4, len(responses.calls))
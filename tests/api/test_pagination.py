@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+import responses
+from requests import Session
+
+from pynect.api.pagination import (CursorStrategy, KeysetStrategy,
+                                   LinkHeaderStrategy, PageNumberStrategy,
+                                   paginate)
+from pynect.utils.query_helpers import RestAPIQuery
+
+BASE_URL = 'https://api.pynect.com'
+QUERY = RestAPIQuery(f'{BASE_URL}/items')
+
+
+class TestPagination(TestCase):
+
+    @responses.activate
+    def test_page_number_strategy(self):
+        for page in range(1, 6):
+            responses.add(responses.GET,
+                          f'{BASE_URL}/items?size=2&page={page}',
+                          json={'page': page, 'total_pages': 5})
+        strategy = PageNumberStrategy(
+            'page', lambda r: r.json()['total_pages'], max_workers=2,
+            backoff=0)
+        pages = [r.json()['page']
+                 for r in paginate(Session(), QUERY, strategy, size=2)]
+        self.assertEqual([1, 2, 3, 4, 5], pages)
+
+    @responses.activate
+    def test_cursor_strategy(self):
+        responses.add(responses.GET, f'{BASE_URL}/items?size=2',
+                      json={'next': 'b'})
+        responses.add(responses.GET, f'{BASE_URL}/items?size=2&cursor=b',
+                      json={'next': None})
+        strategy = CursorStrategy('cursor', lambda r: r.json()['next'],
+                                  backoff=0)
+        pages = list(paginate(Session(), QUERY, strategy, size=2))
+        self.assertEqual(2, len(pages))
+
+    @responses.activate
+    def test_keyset_strategy(self):
+        responses.add(responses.GET, f'{BASE_URL}/items',
+                      json=[{'id': 1}, {'id': 2}])
+        responses.add(responses.GET, f'{BASE_URL}/items?since_id=2',
+                      json=[{'id': 3}])
+        responses.add(responses.GET, f'{BASE_URL}/items?since_id=3', json=[])
+        pages = paginate(Session(), QUERY, KeysetStrategy(backoff=0))
+        items = [item['id'] for page in pages for item in page.json()]
+        self.assertEqual([1, 2, 3], items)
+
+    @responses.activate
+    def test_link_header_strategy(self):
+        second = f'{BASE_URL}/items?page=2'
+        responses.add(responses.GET, f'{BASE_URL}/items', json=[1],
+                      headers={'Link': f'<{second}>; rel="next"'})
+        responses.add(responses.GET, second, json=[2])
+        pages = paginate(Session(), QUERY, LinkHeaderStrategy(backoff=0))
+        self.assertEqual([[1], [2]], [page.json() for page in pages])
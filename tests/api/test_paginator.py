@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+import responses
+from requests import HTTPError, Session
+
+from pynect.api._paginator import ApiPaginator
+from pynect.api.rate_limit import RateLimiter
+from pynect.utils.query_helpers import RestAPIQuery
+
+BASE_URL = 'https://api.pynect.com'
+
+
+def add_pages(total: int):
+    for page in range(1, total + 1):
+        responses.add(responses.GET, f'{BASE_URL}/items?page={page}',
+                      json={'page': page})
+
+
+class TestApiPaginator(TestCase):
+
+    def paginator(self, total_pages: int, **kwargs) -> ApiPaginator:
+        return ApiPaginator(total_pages, 'page', RestAPIQuery(BASE_URL),
+                            path_params='items', session=Session(),
+                            backoff=0, **kwargs)
+
+    @responses.activate
+    def test_iter_pages_in_order(self):
+        add_pages(50)
+        pages = [r.json()['page'] for r in self.paginator(50, max_workers=4)]
+        self.assertEqual(list(range(1, 51)), pages)
+
+    @responses.activate
+    def test_iter_pages_as_completed(self):
+        add_pages(20)
+        responses_ = self.paginator(20).iter_pages(ordered=False)
+        pages = sorted(r.json()['page'] for r in responses_)
+        self.assertEqual(list(range(1, 21)), pages)
+
+    @responses.activate
+    def test_retry_failed_page(self):
+        url = f'{BASE_URL}/items?page=1'
+        responses.add(responses.GET, url, status=503)
+        responses.add(responses.GET, url, json={'page': 1})
+        self.assertEqual([{'page': 1}],
+                         [r.json() for r in self.paginator(1).fetch_all()])
+
+    @responses.activate
+    def test_page_fails_after_retries(self):
+        responses.add(responses.GET, f'{BASE_URL}/items?page=1', status=500)
+        with self.assertRaises(HTTPError):
+            self.paginator(1, retries=2).fetch_all()
+        self.assertEqual(3, len(responses.calls))
+
+    @responses.activate
+    def test_rate_limiter(self):
+        add_pages(3)
+        limiter = RateLimiter(rate=100)
+        pages = [r.json()['page']
+                 for r in self.paginator(3, rate_limiter=limiter)]
+        self.assertEqual([1, 2, 3], pages)
+        self.assertEqual(3, limiter.stats.requests)
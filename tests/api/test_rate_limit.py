@@ -0,0 +1,60 @@
+import time
+from unittest import TestCase
+
+import responses
+from requests import Response
+
+from pynect.api.rate_limit import RateLimiter, TokenBucket, retry_after
+from pynect.api.session import SessionOptions, build_session
+
+API_URL = 'https://api.pynect.com/items'
+
+
+def response(status: int = 200, **headers) -> Response:
+    resp = Response()
+    resp.status_code = status
+    resp.headers.update(headers)
+    return resp
+
+
+class TestRateLimit(TestCase):
+
+    def test_token_bucket_rate(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        tic = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - tic, 0.09)
+
+    def test_retry_after_headers(self):
+        self.assertEqual(3, retry_after(response(429, **{'Retry-After': '3'})))
+        self.assertIsNone(retry_after(response(200)))
+        self.assertIsNone(retry_after(response(200, **{
+            'X-RateLimit-Remaining': '5', 'X-RateLimit-Reset': '10'})))
+        self.assertEqual(10, retry_after(response(200, **{
+            'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '10'})))
+        reset = str(int(time.time()) + 30)
+        delay = retry_after(response(200, **{
+            'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset}))
+        self.assertTrue(28 <= delay <= 30)
+
+    def test_aimd(self):
+        limiter = RateLimiter(rate=100, max_concurrency=8)
+        limiter.update(response(429, **{'Retry-After': '0'}))
+        limiter.update(response(429, **{'Retry-After': '0'}))
+        self.assertEqual(2, limiter.concurrency)
+        for _ in range(10):
+            limiter.update(response(200))
+        self.assertGreater(limiter.concurrency, 2)
+        self.assertEqual(2, limiter.stats.throttled)
+
+    @responses.activate
+    def test_session_retries_throttled(self):
+        responses.add(responses.GET, API_URL, status=429,
+                      headers={'Retry-After': '0'})
+        responses.add(responses.GET, API_URL, json={'ok': True})
+        limiter = RateLimiter(rate=100)
+        session = limiter.attach(build_session(SessionOptions()))
+        self.assertTrue(session.get(API_URL).json()['ok'])
+        self.assertEqual(2, len(responses.calls))
+        self.assertEqual(2, limiter.stats.requests)
@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Iterator, Optional
+from unittest import TestCase
+
+import responses
+from requests import Response, Session
+
+from pynect.api.streaming import dump_stream, iter_json_items, stream_select
+
+API_URL = 'https://api.pynect.com/items'
+
+
+def chunked(data: bytes, size: int) -> Iterator[bytes]:
+    for i in range(0, len(data), size):
+        yield data[i: i + size]
+
+
+class ItemsClient:
+
+    def select(self, endpoint: Optional[str] = None,
+               params: Optional[dict] = None, **kwargs) -> Response:
+        return Session().get(f'{API_URL}/{endpoint}', params=params,
+                             **kwargs)
+
+
+class TestStreaming(TestCase):
+
+    def test_items_split_across_chunks(self):
+        records = [{'id': i, 'name': f'ñandú {i}', 'score': i * 1.5}
+                   for i in range(500)] + [12345678, 'last']
+        data = json.dumps(records).encode()
+        self.assertEqual(records, list(iter_json_items(chunked(data, 7))))
+
+    def test_every_split_offset(self):
+        data = json.dumps([1.5, -2e-3, 10, 0.25E+2, 'ñ', True, None,
+                           {'a': [3.0, 4]}, 1234567.125]).encode()
+        expected = json.loads(data)
+        for offset in range(1, len(data)):
+            chunks = [data[:offset], data[offset:]]
+            self.assertEqual(expected, list(iter_json_items(chunks)),
+                             f'split at {offset}')
+        self.assertEqual(expected, list(iter_json_items(chunked(data, 1))))
+
+    def test_nested_prefix(self):
+        data = json.dumps({
+            'count': 3, 'meta': {'items': [0]}, 'data': {'results': [
+                {'id': 1}, {'id': 2}, {'id': 3}]}}).encode()
+        items = iter_json_items(chunked(data, 5), 'data.results.item')
+        self.assertEqual([1, 2, 3], [item['id'] for item in items])
+        self.assertEqual([], list(iter_json_items([b' [ ] '])))
+
+    def test_invalid_document(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_items([b'{"data": [1, 2'], 'data.item'))
+
+    @responses.activate
+    def test_stream_select_to_writer(self):
+        records = [{'id': i} for i in range(20000)]
+        responses.add(responses.GET, f'{API_URL}/all',
+                      json={'results': records})
+        with TemporaryDirectory() as folder:
+            path = Path(folder) / 'items.ndjson'
+            count = dump_stream(
+                stream_select(ItemsClient(), 'all', prefix='results.item'),
+                path)
+            self.assertEqual(len(records), count)
+            with path.open() as file:
+                self.assertEqual(records, [json.loads(line)
+                                           for line in file])
@@ -0,0 +1,86 @@
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import responses
+
+from pynect.api.authentication import BearerAuthentication
+from pynect.api.token_cache import TokenCache
+
+AUTH_URL = 'https://auth.pynect.com/oauth/token'
+API_URL = 'https://api.pynect.com/items'
+
+
+def add_token(token: str, expires_in: int = 7200):
+    responses.add(responses.POST, AUTH_URL, json={
+        'access_token': token,
+        'token_type': 'Bearer',
+        'expires_in': expires_in,
+    })
+
+
+class TestTokenCache(TestCase):
+
+    def bearer(self, cache: TokenCache) -> BearerAuthentication:
+        auth = BearerAuthentication('client', 'secret', AUTH_URL, cache)
+        auth()
+        return auth
+
+    @responses.activate
+    def test_token_shared_between_instances(self):
+        add_token('first')
+        cache = TokenCache()
+        self.bearer(cache)
+        auth = self.bearer(cache)
+        self.assertEqual('Bearer first', auth.session.headers['Authorization'])
+        self.assertEqual(1, len(responses.calls))
+
+    @responses.activate
+    def test_retry_unauthorized(self):
+        add_token('expired')
+        add_token('renewed')
+        responses.add(responses.GET, API_URL, status=401)
+        responses.add(responses.GET, API_URL, json=[])
+        auth = self.bearer(TokenCache())
+        response = auth.session.get(API_URL)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('Bearer renewed',
+                         response.request.headers['Authorization'])
+
+    @responses.activate
+    def test_background_refresh(self):
+        add_token('first', expires_in=1)
+        add_token('second')
+        cache = TokenCache(refresh_margin=0.95, min_refresh_delay=0.1)
+        auth = self.bearer(cache)
+        time.sleep(0.7)
+        self.assertEqual('second', auth.token)
+        self.assertEqual(2, len(responses.calls))
+        cache.clear()
+
+    def test_short_lived_tokens_are_not_refreshed_in_a_loop(self):
+        fetches = []
+
+        def fetch() -> dict:
+            fetches.append(time.time())
+            return {'access_token': f'token{len(fetches)}',
+                    'expires_in': 0.2}
+
+        cache = TokenCache(min_refresh_delay=0.05)
+        cache.get('key', fetch)
+        time.sleep(0.6)
+        # One refresh halfway through the lifetime, then the unused token
+        # is left to expire
+        self.assertEqual(2, len(fetches))
+        self.assertEqual('token3', cache.get('key', fetch))
+        cache.clear()
+
+    def test_disk_cache(self):
+        with TemporaryDirectory() as folder:
+            path = Path(folder, 'tokens.json')
+            TokenCache(path=path, background_refresh=False).get(
+                'key', lambda: {'access_token': 'a', 'expires_in': 60})
+            token = TokenCache(path=path).get('key', self.fail)
+            self.assertEqual(0o600, path.stat().st_mode & 0o777)
+        self.assertEqual('a', token)
@@ -0,0 +1,3 @@
+from .test_denodo import TestDenodoConnector
+
+TESTS = {TestDenodoConnector}
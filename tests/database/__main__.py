@@ -0,0 +1,6 @@
+from tests.database import TESTS
+from tests import run
+
+
+if __name__ == '__main__':
+    run(TESTS)
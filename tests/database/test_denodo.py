@@ -0,0 +1,325 @@
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict, List, Optional
+from unittest import TestCase, mock, skipIf
+
+try:
+    from pynect.database import denodo
+except ImportError:  # pyodbc or the connector package are not installed
+    denodo = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+ROWS = [(i, f'item {i}', i * 1.5) for i in range(1, 11)]
+DOCUMENTS = [{'id': i, 'item_name': name, 'score': score}
+             for i, name, score in ROWS]
+
+
+class FakeCursor:
+    """pyodbc style cursor over a sqlite3 cursor"""
+
+    def __init__(self, cursor: sqlite3.Cursor, types: Dict[str, type]):
+        self.__cursor = cursor
+        self.types = types
+
+    def execute(self, query: str, *params) -> 'FakeCursor':
+        self.__cursor.execute(query, params)
+        return self
+
+    @property
+    def description(self) -> List[tuple]:
+        # pyodbc reports the python type of every column
+        return [(column[0], self.types.get(column[0], str), None, None,
+                 None, None, True) for column in self.__cursor.description]
+
+    def fetchmany(self, size: int) -> List[tuple]:
+        # Unlike sqlite3, pyodbc returns no rows for a size of 0
+        return self.__cursor.fetchmany(size) if size > 0 else []
+
+    def fetchall(self) -> List[tuple]:
+        return self.__cursor.fetchall()
+
+    def close(self):
+        self.__cursor.close()
+
+
+class FakeConnection:
+
+    def __init__(self, database: str, types: Dict[str, type]):
+        self.__connection = sqlite3.connect(database,
+                                            check_same_thread=False)
+        self.types = types
+        self.closed = False
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self.__connection.cursor(), self.types)
+
+    def close(self):
+        self.closed = True
+        self.__connection.close()
+
+
+class FakeDriver:
+    """Stands in for pyodbc.connect, opening the sqlite database"""
+
+    def __init__(self, types: Dict[str, type]):
+        self.types = types
+        self.connections: List[FakeConnection] = []
+
+    def __call__(self, database: str, **kwargs) -> FakeConnection:
+        connection = FakeConnection(database, self.types)
+        self.connections.append(connection)
+        return connection
+
+
+def read_records(paths: List[str]) -> List[List[dict]]:
+    """Records of each ndjson file"""
+    return [[json.loads(line) for line in Path(path).read_text().splitlines()]
+            for path in paths]
+
+
+@skipIf(denodo is None, 'pyodbc or the connector package are not installed')
+class TestDenodoConnector(TestCase):
+
+    def setUp(self):
+        folder = TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.folder = Path(folder.name)
+        # The connector folders are created under the home directory
+        home = mock.patch.dict(os.environ, {'HOME': folder.name})
+        home.start()
+        self.addCleanup(home.stop)
+        self.database = str(self.folder / 'denodo.db')
+        self.execute_sql('CREATE TABLE items '
+                         '(id INTEGER, itemName TEXT, score REAL)')
+        self.insert(ROWS)
+        self.driver = FakeDriver({'id': int, 'itemName': str,
+                                  'score': float})
+        driver = mock.patch.object(denodo.dbdriver, 'connect', self.driver)
+        driver.start()
+        self.addCleanup(driver.stop)
+
+    def execute_sql(self, query: str, *params):
+        with sqlite3.connect(self.database) as connection:
+            connection.execute(query, params)
+
+    def insert(self, rows: List[tuple]):
+        with sqlite3.connect(self.database) as connection:
+            connection.executemany('INSERT INTO items VALUES (?, ?, ?)',
+                                   rows)
+
+    def connector(
+        self,
+        name: str = 'items',
+        max_size: int = 1000,
+        parse: Optional[Callable[[Any], None]] = None,
+        filter: Optional[Callable[[Any], bool]] = None,
+        frame_parse: Optional['denodo.FrameParse'] = None,
+        frame_filter: Optional['denodo.FrameFilter'] = None,
+        **options
+    ) -> 'denodo.DenodoDBConnector':
+        options = denodo.DenodoConnectionOptions(**{
+            'driver': 'sqlite',
+            'field_mappings': {},
+            'boolean_mappings': {},
+            'query': 'SELECT * FROM items',
+            # Every test gets its own database, and so its own pool
+            'server_database': self.database,
+            'server_name': 'localhost',
+            'server_port': 0,
+            'streaming': True,
+            'output_format': 'ndjson',
+            **options,
+        })
+        connector = denodo.DenodoDBConnector(
+            name, options, mock.Mock(max_size=max_size),
+            parse or (lambda record: None),
+            filter or (lambda record: True),
+            frame_parse, frame_filter)
+        self.addCleanup(connector.pool.close)
+        return connector
+
+    def run_connector(
+        self,
+        connector: 'denodo.DenodoDBConnector',
+        job: Optional[Callable[['denodo.DenodoDBConnector'], Any]] = None,
+    ) -> Any:
+        """
+        Executes connector, running job in place of the connector manager,
+        and returns its result. job defaults to gather_all_data, which
+        returns the paths of the files created.
+        """
+        results = []
+        job = job or denodo.DenodoDBConnector.gather_all_data
+
+        def manager(connector: 'denodo.DenodoDBConnector'):
+            return lambda: results.append(job(connector))
+
+        with mock.patch.object(denodo, 'ConnectorManager', manager):
+            connector.execute()
+        return results[0]
+
+    def test_streaming_rotates_ndjson_files(self):
+        paths = self.run_connector(self.connector(max_size=4, page_size=3))
+        self.assertEqual([DOCUMENTS[:4], DOCUMENTS[4:8], DOCUMENTS[8:]],
+                         read_records(paths))
+        self.assertTrue(all(path.endswith('.ndjson') for path in paths))
+        folder = denodo.get_connector_folder('items')
+        self.assertEqual(sorted(paths),
+                         sorted(str(p) for p in folder.glob('*.ndjson')))
+
+    def test_streaming_empty_result(self):
+        self.execute_sql('DELETE FROM items')
+        paths = self.run_connector(self.connector(page_size=3))
+        self.assertEqual([[]], read_records(paths))
+
+    def test_frame_hooks(self):
+        frames = []
+
+        def frame_parse(df):
+            frames.append(len(df.index))
+            return df.assign(label=df['item_name'].str.upper())
+
+        connector = self.connector(
+            page_size=4, frame_parse=frame_parse,
+            frame_filter=lambda df: df['score'] > 5)
+        self.assertTrue(connector.is_vectorized)
+        [records] = read_records(self.run_connector(connector))
+        self.assertEqual([{**document, 'label': document['item_name'].upper()}
+                          for document in DOCUMENTS[3:]], records)
+        # One call per page with the rows that passed the filter
+        self.assertEqual([1, 4, 2], frames)
+
+    def test_partitions_cover_every_row(self):
+        extra = [(key, f'item {key}', 0.5) for key in (-7, -3, -1, 0)]
+        extra += [(None, 'no key', 0.5), (None, 'no key', 1.5)]
+        self.insert(extra)
+        expected = sorted(DOCUMENTS + [
+            {'id': key, 'item_name': name, 'score': score}
+            for key, name, score in extra], key=json.dumps)
+        for ranges in (None, [(None, 0), (0, 5), (5, None)]):
+            connector = self.connector(
+                f'partitioned_{bool(ranges)}', page_size=2,
+                partition_column='id', parallelism=3,
+                partition_ranges=ranges)
+            records = [record for page in read_records(
+                self.run_connector(connector)) for record in page]
+            self.assertEqual(expected, sorted(records, key=json.dumps))
+        # The partitions were fetched on their own connections
+        self.assertGreater(len(self.driver.connections), 2)
+
+    def test_connections_are_pooled(self):
+        first = self.connector(page_size=4)
+        self.run_connector(first)
+        stats = first.pool.stats
+        self.assertEqual((1, 1, 0), (stats.size, stats.idle, stats.in_use))
+        # Same options, same pool: the idle connection is borrowed again
+        second = self.connector('other', page_size=4)
+        self.assertIs(first.pool, second.pool)
+        self.assertEqual(1, len(read_records(self.run_connector(second))))
+        stats = second.pool.stats
+        self.assertEqual((1, 2, 0), (stats.created, stats.checkouts,
+                                     stats.in_use))
+        self.assertEqual(1, len(self.driver.connections))
+        # Other connection options get their own pool
+        third = self.connector(page_size=4, connection_timeout=5)
+        self.assertIsNot(first.pool, third.pool)
+        with third.pool.connection() as connection:
+            self.assertEqual([(10, )], connection.cursor().execute(
+                'SELECT COUNT(*) FROM items').fetchall())
+        self.assertEqual(1, third.pool.stats.idle)
+
+    @skipIf(pa is None, 'pyarrow is not installed')
+    def test_columnar_fetch(self):
+        import pyarrow.parquet as pq
+        connector = self.connector(page_size=3, columnar=True)
+        table = pq.read_table(self.run_connector(
+            connector, denodo.DenodoDBConnector.dump_columnar))
+        self.assertEqual(pa.schema([('id', pa.int64()),
+                                    ('item_name', pa.string()),
+                                    ('score', pa.float64())]),
+                         table.schema.remove_metadata())
+        self.assertEqual(len(ROWS), table.num_rows)
+        self.assertEqual(DOCUMENTS, table.to_pylist())
+        # The pages of the regular output are also fetched as arrow batches
+        connector = self.connector(page_size=3, columnar=True)
+        [records] = read_records(self.run_connector(connector))
+        self.assertEqual(DOCUMENTS, records)
+
+    def test_incremental_runs(self):
+        connector = self.connector(watermark_column='id',
+                                   output_format='json')
+        [first] = [json.loads(Path(path).read_text())
+                   for path in self.run_connector(connector)]
+        self.assertEqual(DOCUMENTS, first)
+        self.assertEqual(10, connector.watermark)
+        self.insert([(11, 'item 11', 16.5), (12, 'item 12', 18.0)])
+        [second] = [json.loads(Path(path).read_text())
+                    for path in self.run_connector(connector)]
+        self.assertEqual([11, 12], [record['id'] for record in second])
+        self.assertEqual(12, connector.watermark)
+        # The state is kept apart from the data files
+        folder = denodo.get_connector_folder('items')
+        self.assertEqual([first, second], [
+            json.loads(path.read_text())
+            for path in sorted(folder.glob('*.json'))])
+        self.assertTrue(connector.watermark_path.is_relative_to(
+            connector.state_folder))
+
+    def test_pipeline_keeps_the_page_order(self):
+        def parse(record):
+            # The first pages finish last
+            if record.id <= 4:
+                time.sleep(0.05)
+            record.item_name = record.item_name.upper()
+
+        sequential = read_records(self.run_connector(self.connector(
+            name='sequential', max_size=3, parse=parse, page_size=2)))
+        connector = self.connector(
+            name='pipelined', max_size=3, parse=parse, page_size=2,
+            pipeline=True, pipeline_workers=3)
+        pipelined = read_records(self.run_connector(connector))
+        self.assertEqual(sequential, pipelined)
+        self.assertEqual(
+            [{**document, 'item_name': document['item_name'].upper()}
+             for document in DOCUMENTS],
+            [record for records in pipelined for record in records])
+        # Every page went through the transform workers
+        self.assertEqual(5, connector.pipeline_metrics['transform'].items)
+
+    def test_checkpoint_resumes_after_a_failure(self):
+        failures = [7]
+
+        def parse(record):
+            if record.id in failures:
+                failures.remove(record.id)
+                raise RuntimeError('Connection lost')
+
+        connector = self.connector(max_size=4, parse=parse, page_size=3,
+                                   checkpoint=True, checkpoint_key='id')
+        with self.assertRaises(RuntimeError):
+            self.run_connector(connector)
+        # Only the completed file is kept and its rows are committed
+        self.assertTrue(connector.checkpoint_path.is_relative_to(
+            connector.state_folder))
+        state = json.loads(connector.checkpoint_path.read_text())
+        self.assertEqual((3, 1), (state['rows'], state['skip']))
+        [first] = state['paths']
+        self.assertEqual([DOCUMENTS[:4]], read_records([first]))
+        paths = self.run_connector(connector)
+        self.assertEqual(first, paths[0])
+        self.assertEqual([DOCUMENTS[:4], DOCUMENTS[4:8], DOCUMENTS[8:]],
+                         read_records(paths))
+        self.assertFalse(connector.checkpoint_path.exists())
+
+    def test_checkpoint_needs_a_key(self):
+        connector = self.connector(checkpoint=True)
+        with self.assertRaises(ValueError):
+            self.run_connector(connector)
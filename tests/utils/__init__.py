@@ -1,7 +1,18 @@
 from tests.utils.test_query_helpers import TestQueryHelpers
 
 from .test_cli import TestCLI
+from .test_columnar import TestColumnar
 from .test_decorators import TestTimeitDecorator
+from .test_file_management import TestFileManagement
+from .test_logs import TestLogs
+from .test_mail import TestMail
+from .test_outbox import TestOutbox
+from .test_pipeline import TestPipeline
+from .test_pool import TestConnectionPool
+from .test_records import TestRecords
 from .test_utils import TestUtils
+from .test_writers import TestWriters
 
-TESTS = {TestCLI, TestQueryHelpers, TestTimeitDecorator, TestUtils}
+TESTS = {TestCLI, TestColumnar, TestConnectionPool, TestFileManagement,
+         TestLogs, TestMail, TestOutbox, TestPipeline, TestQueryHelpers,
+         TestRecords, TestTimeitDecorator, TestUtils, TestWriters}
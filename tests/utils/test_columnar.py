@@ -0,0 +1,48 @@
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, skipIf
+
+from pynect.utils import (rows_to_record_batch, schema_from_description,
+                          write_columnar)
+from pynect.utils.columnar import pa
+
+DESCRIPTION = [
+    ('Id', int, None, 10, 10, 0, False),
+    ('Name', str, None, 50, 50, 0, True),
+    ('Amount', Decimal, None, 10, 10, 2, True),
+    ('Created', datetime, None, 23, 23, 3, True),
+]
+NAMES = ['id', 'name', 'amount', 'created']
+ROWS = [
+    (1, 'a', Decimal('1.50'), datetime(2023, 1, 1)),
+    (2, None, None, None),
+]
+
+
+@skipIf(pa is None, 'pyarrow is not installed')
+class TestColumnar(TestCase):
+
+    def test_schema_from_description(self):
+        schema = schema_from_description(DESCRIPTION, NAMES)
+        self.assertEqual(NAMES, schema.names)
+        self.assertEqual(pa.decimal128(10, 2), schema.field('amount').type)
+
+    def test_rows_to_record_batch(self):
+        schema = schema_from_description(DESCRIPTION, NAMES)
+        batch = rows_to_record_batch(ROWS, schema)
+        self.assertEqual(2, batch.num_rows)
+        self.assertEqual([1, 2], batch.column(0).to_pylist())
+        self.assertEqual(0, rows_to_record_batch([], schema).num_rows)
+
+    def test_write_columnar(self):
+        schema = schema_from_description(DESCRIPTION, NAMES)
+        batches = [rows_to_record_batch(ROWS, schema)] * 2
+        with TemporaryDirectory() as folder:
+            path = write_columnar(batches, Path(folder, 'test.feather'),
+                                  'feather')
+            with pa.memory_map(str(path)) as source:
+                table = pa.ipc.open_file(source).read_all()
+        self.assertEqual(4, table.num_rows)
+        self.assertEqual(schema, table.schema)
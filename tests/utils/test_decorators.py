@@ -1,8 +1,9 @@
+import asyncio
 import logging
 import time
 import unittest
 
-from pynect.utils import timeit
+from pynect.utils import MetricsRegistry, timeit
 from tests import configure_logger
 
 
@@ -23,12 +24,44 @@ class TestTimeitDecorator(unittest.TestCase):
             test_function()
         # Assert that the log output contains the expected message
         self.assertIn('test_function took', logs.output[0])
-    #
-    # def test_decorator_without_logging(self):
-    #     # Define a test function
-    #     @timeit()
-    #     def test_function():
-    #         time.sleep(0.1)
-    #
-    #     # Call the decorated function and ensure it runs without errors
-    #     test_function()
+        elapsed = float(logs.output[0].split('took ')[1].rstrip('ms'))
+        self.assertGreaterEqual(elapsed, 100)
+
+    def test_histogram_registry(self):
+        registry = MetricsRegistry()
+
+        @timeit(registry=registry, name='sleep')
+        def sleep(seconds: float):
+            time.sleep(seconds)
+
+        @timeit(registry=registry, name='async_sleep')
+        async def async_sleep(seconds: float):
+            await asyncio.sleep(seconds)
+
+        for seconds in (0.001,) * 9 + (0.05,):
+            sleep(seconds)
+        asyncio.run(async_sleep(0.01))
+        stats = registry.to_dict()
+        self.assertEqual(10, stats['sleep']['count'])
+        self.assertLess(stats['sleep']['p50_ms'], 50)
+        self.assertGreaterEqual(stats['sleep']['max_ms'], 50)
+        self.assertEqual(stats['sleep']['max_ms'], stats['sleep']['p99_ms'])
+        self.assertGreaterEqual(stats['async_sleep']['p50_ms'], 10)
+        text = registry.to_prometheus()
+        self.assertIn('# TYPE pynect_function_duration_seconds summary',
+                      text)
+        self.assertIn('pynect_function_duration_seconds_count'
+                      '{function="sleep"} 10', text)
+
+    def test_reset_keeps_decorated_functions_recording(self):
+        registry = MetricsRegistry()
+
+        @timeit(registry=registry, name='noop')
+        def noop():
+            pass
+
+        noop()
+        registry.reset()
+        self.assertEqual(0, registry.to_dict()['noop']['count'])
+        noop()
+        self.assertEqual(1, registry.to_dict()['noop']['count'])
@@ -0,0 +1,108 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from pynect.utils import RotatingFileSink, read_json, write_json_atomic
+from pynect.utils.file_management import (Checkpoint, dump_watermark,
+                                          load_watermark)
+
+
+class TestFileManagement(TestCase):
+
+    def test_rotating_json_sink(self):
+        records = [{'id': i} for i in range(5)]
+        with TemporaryDirectory() as folder:
+            with RotatingFileSink('test', Path(folder), 2) as sink:
+                sink.write(records[:3])
+                sink.write(records[3:])
+            self.assertEqual(3, len(sink.paths))
+            written = [json.loads(Path(p).read_text()) for p in sink.paths]
+        self.assertEqual([records[:2], records[2:4], records[4:]], written)
+
+    def test_rotating_json_sink_on_close(self):
+        closed = []
+        with TemporaryDirectory() as folder:
+            sink = RotatingFileSink('test', Path(folder), 2,
+                                    lambda *args: closed.append(args))
+            with self.assertRaises(RuntimeError):
+                with sink:
+                    sink.write([{'id': i} for i in range(3)])
+                    raise RuntimeError
+            files = [str(p) for p in Path(folder).iterdir()]
+        self.assertEqual([(sink.paths[0], 2)], closed)
+        self.assertEqual(sink.paths, files)
+
+    def test_rotating_json_sink_empty(self):
+        with TemporaryDirectory() as folder:
+            with RotatingFileSink('test', Path(folder), 2) as sink:
+                sink.write([])
+            self.assertEqual(1, len(sink.paths))
+            self.assertEqual([], json.loads(Path(sink.paths[0]).read_text()))
+
+    def test_rotating_sink_invalid_format(self):
+        with TemporaryDirectory() as folder:
+            with self.assertRaises(ValueError):
+                RotatingFileSink('test', Path(folder), 2, file_format='jsn')
+            self.assertEqual([], list(Path(folder).iterdir()))
+
+    def test_write_json_atomic(self):
+        with TemporaryDirectory() as folder:
+            path = Path(folder, 'state', 'state.json')
+            self.assertIsNone(read_json(path))
+            write_json_atomic(path, {'rows': 1})
+            write_json_atomic(path, {'rows': 2})
+            self.assertEqual({'rows': 2}, read_json(path))
+            self.assertEqual(
+                ['state.json'], [p.name for p in path.parent.iterdir()])
+
+    def test_watermark_round_trip(self):
+        values = [Decimal('12345678901234567890'), Decimal('1.50'),
+                  pd.Timestamp('2024-01-02 03:04:05'), date(2024, 1, 2),
+                  np.int64(7), 'abc']
+        with TemporaryDirectory() as folder:
+            path = Path(folder) / 'watermark.json'
+            for value in values:
+                write_json_atomic(path, dump_watermark('id', value))
+                self.assertEqual(value, load_watermark(read_json(path)))
+        self.assertIsInstance(load_watermark(dump_watermark(
+            'id', pd.Timestamp('2024-01-02'))), datetime)
+
+    def test_checkpoint_resume_after_partial_page(self):
+        def page(index: int) -> tuple:
+            return (3, dump_watermark('id', index * 3 + 2),
+                    [f'doc{index}_{i}' for i in range(3)],
+                    dump_watermark('updated', 10 - index))
+
+        with TemporaryDirectory() as folder:
+            path = Path(folder) / 'checkpoint.json'
+            checkpoint = Checkpoint.load(path, 'query')
+            self.assertEqual(3, len(checkpoint.add_page(*page(0))))
+            checkpoint.add_page(*page(1))
+            # Only the first page and one document of the second persisted
+            checkpoint.commit('file0', 4)
+            resumed = Checkpoint.load(path, 'query')
+            self.assertTrue(resumed.resumed)
+            self.assertEqual((3, 1, 4), (resumed.rows, resumed.skip,
+                                         resumed.documents))
+            self.assertEqual(2, load_watermark(resumed.key))
+            self.assertEqual(10, load_watermark(resumed.watermark))
+            # The resumed run reads the second page again
+            data = resumed.add_page(*page(1))
+            self.assertEqual(['doc1_1', 'doc1_2'], data)
+            resumed.add_page(*page(2))
+            resumed.commit('file1', 3)
+            self.assertEqual((6, 1, 7), (resumed.rows, resumed.skip,
+                                         resumed.documents))
+            resumed.commit('file2', 2)
+            self.assertEqual((9, 0, 9), (resumed.rows, resumed.skip,
+                                         resumed.documents))
+            self.assertEqual(8, load_watermark(resumed.key))
+            self.assertEqual(10, load_watermark(resumed.watermark))
+            self.assertEqual(['file0', 'file1', 'file2'], resumed.paths)
+            self.assertEqual([], Checkpoint.load(path, 'other').paths)
@@ -0,0 +1,63 @@
+import json
+import logging
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from pynect.utils import configure_logger
+from pynect.utils.logs import JsonFormatter, LogQueue, SamplingFilter
+
+
+class TestLogs(TestCase):
+
+    def test_idempotent_handlers(self):
+        logger = configure_logger('test_logs.idempotent')
+        configure_logger('test_logs.idempotent')
+        configure_logger('test_logs.idempotent', json_format=True)
+        self.assertEqual(1, len(logger.handlers))
+
+    def test_json_file_through_queue(self):
+        queue = LogQueue()
+        logger = logging.getLogger('test_logs.json')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        with TemporaryDirectory() as folder:
+            path = Path(folder) / 'test.log'
+
+            def sink() -> logging.Handler:
+                handler = logging.FileHandler(path)
+                handler.setFormatter(JsonFormatter())
+                return handler
+
+            handler = queue.attach(logger, path, sink)
+            try:
+                for page in range(3):
+                    logger.info(f'page {page}')
+                try:
+                    raise ValueError('broken page')
+                except ValueError:
+                    logger.exception('page %d failed', 3)
+                queue.flush()
+                with path.open() as file:
+                    lines = [json.loads(line) for line in file]
+            finally:
+                queue.close()
+                logger.removeHandler(handler)
+        self.assertEqual(['page 0', 'page 1', 'page 2', 'page 3 failed'],
+                         [line['message'] for line in lines])
+        self.assertIn('ValueError: broken page', lines[3]['exception'])
+        self.assertEqual('test_logs.json', lines[0]['logger'])
+
+    def test_sampling_filter(self):
+        def record(level: int = logging.INFO) -> logging.LogRecord:
+            return logging.LogRecord('test', level, 'test.py', 1, 'page',
+                                     None, None)
+
+        sampling = SamplingFilter(sample=3)
+        kept = [r for r in (record() for _ in range(9)) if sampling.filter(r)]
+        self.assertEqual(3, len(kept))
+        self.assertEqual([0, 2, 2], [r.suppressed for r in kept])
+        limited = SamplingFilter(rate=2)
+        self.assertEqual(2, sum(limited.filter(record())
+                                for _ in range(100)))
+        self.assertTrue(limited.filter(record(logging.WARNING)))
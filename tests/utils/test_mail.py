@@ -0,0 +1,140 @@
+import socketserver
+from tempfile import NamedTemporaryFile
+from threading import Lock, Thread
+from unittest import TestCase
+
+from pynect.utils.mail import Email, EmailSender, SMTPServer
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialog, like an aiosmtpd stand-in"""
+
+    def reply(self, line: str):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        sent = 0
+        self.reply('220 localhost stand-in')
+        while line := self.rfile.readline().decode().strip():
+            command = line[:4].upper()
+            if command == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 AUTH PLAIN')
+            elif command == 'AUTH':
+                with server.lock:
+                    failed = server.auth_failures > 0
+                    server.auth_failures -= failed
+                self.reply('454 Temporary authentication failure' if failed
+                           else '235 Authenticated')
+            elif command == 'MAIL':
+                if sent == server.drop_after:
+                    return
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                self.reply('550 Unknown user' if 'unknown' in line
+                           else '250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                while (row := self.rfile.readline()) != b'.\r\n':
+                    data.append(row)
+                with server.lock:
+                    server.messages.append(b''.join(data).decode())
+                sent += 1
+                self.reply('250 Queued')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class StandInSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, drop_after: int = -1, auth_failures: int = 0):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.lock = Lock()
+        self.drop_after = drop_after
+        self.auth_failures = auth_failures
+        self.connections = 0
+        self.messages = []
+
+
+class TestMail(TestCase):
+
+    def start_server(self, **kwargs) -> StandInSMTPServer:
+        server = StandInSMTPServer(**kwargs)
+        Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def sender(self, server: StandInSMTPServer) -> EmailSender:
+        return EmailSender(SMTPServer(
+            server.server_address[1], 'reports@pynect.com', 'secret',
+            '127.0.0.1', starttls=False, timeout=5))
+
+    def test_send_many_reuses_connections(self):
+        server = self.start_server()
+        with NamedTemporaryFile(suffix='.csv') as file:
+            file.write(b'a,b\n1,2\n')
+            file.flush()
+            emails = [Email(f'user{i}@pynect.com', 'Report', 'plain',
+                            '<p>html</p>', [file.name]) for i in range(20)]
+            results = self.sender(server).send_many(emails, connections=3)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual([f'user{i}@pynect.com' for i in range(20)],
+                         [result.recipient for result in results])
+        self.assertEqual(20, len(server.messages))
+        self.assertLessEqual(server.connections, 3)
+        self.assertTrue(all('YSxiCjEsMgo=' in message
+                            for message in server.messages))
+
+    def test_reconnect_and_refused_recipients(self):
+        server = self.start_server(drop_after=2)
+        emails = [Email(f'user{i}@pynect.com', 'Report', 'plain', 'html')
+                  for i in range(5)]
+        emails.append(Email('unknown@pynect.com, user@pynect.com',
+                            'Report', 'plain', 'html'))
+        results = self.sender(server).send_many(emails, connections=1)
+        self.assertEqual(7, len(results))
+        self.assertEqual(['unknown@pynect.com'],
+                         [r.recipient for r in results if not r.ok])
+        self.assertEqual(6, len(server.messages))
+        self.assertEqual(3, server.connections)
+        self.assertEqual(2, results[2].attempts)
+
+    def test_unbuildable_email_fails_alone(self):
+        server = self.start_server()
+        emails = [Email('user0@pynect.com', 'Report', 'plain', 'html'),
+                  Email('user1@pynect.com', 'Report', 'plain', 'html',
+                        ['/missing/report.csv']),
+                  Email('user2@pynect.com', 'Report', 'plain', 'html')]
+        results = self.sender(server).send_many(emails, connections=1)
+        self.assertEqual([True, False, True], [r.ok for r in results])
+        self.assertIn('report.csv', results[1].error)
+        self.assertEqual(2, len(server.messages))
+        self.assertEqual(1, server.connections)
+
+    def test_temporary_auth_failure_is_retried(self):
+        server = self.start_server(auth_failures=1)
+        emails = [Email(f'user{i}@pynect.com', 'Report', 'plain', 'html')
+                  for i in range(2)]
+        results = self.sender(server).send_many(emails, connections=1)
+        self.assertEqual([True, True], [r.ok for r in results])
+        self.assertEqual([2, 1], [r.attempts for r in results])
+        self.assertEqual(2, len(server.messages))
+        self.assertEqual(2, server.connections)
+
+    def test_auth_failures_exhaust_the_retries(self):
+        server = self.start_server(auth_failures=10)
+        email = Email('user@pynect.com', 'Report', 'plain', 'html')
+        [result] = self.sender(server).send_many([email], retries=1)
+        self.assertFalse(result.ok)
+        self.assertFalse(result.permanent)
+        self.assertIn('454', result.error)
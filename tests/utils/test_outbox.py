@@ -0,0 +1,98 @@
+import socket
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from unittest import TestCase
+
+from pynect.utils.mail import Email, EmailSender, Outbox, SMTPServer
+from tests.utils.test_mail import StandInSMTPServer
+
+
+def closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def sender(port: int) -> EmailSender:
+    return EmailSender(SMTPServer(port, 'reports@pynect.com', 'secret',
+                                  '127.0.0.1', starttls=False, timeout=5))
+
+
+def email(index: int) -> Email:
+    return Email(f'user{index}@pynect.com', 'Report', 'plain', 'html')
+
+
+class TestOutbox(TestCase):
+
+    def start_server(self) -> StandInSMTPServer:
+        server = StandInSMTPServer()
+        Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def test_flush_delivers_in_background(self):
+        server = self.start_server()
+        outbox = Outbox(sender(server.server_address[1]), batch_size=3)
+        for index in range(7):
+            outbox.enqueue(email(index))
+        self.assertTrue(outbox.close(timeout=10))
+        self.assertEqual(7, len(server.messages))
+        self.assertEqual(0, len(outbox))
+
+    def test_dead_letters(self):
+        with TemporaryDirectory() as folder:
+            outbox = Outbox(sender(closed_port()), spool=folder, retries=3,
+                            backoff=0.01)
+            outbox.enqueue(email(0))
+            self.assertTrue(outbox.close(timeout=10))
+            self.assertEqual(1, len(outbox.dead_letters))
+            self.assertEqual(3, outbox.dead_letters[0].attempts)
+            self.assertEqual([], list(Path(folder).glob('*.json')))
+            self.assertEqual(1, len(list(Path(folder, 'dead').glob('*'))))
+
+    def test_spool_is_recovered(self):
+        with TemporaryDirectory() as folder:
+            outbox = Outbox(sender(closed_port()), spool=folder, backoff=60)
+            outbox.enqueue(email(0))
+            outbox.enqueue(email(1))
+            self.assertFalse(outbox.close(timeout=0.5))
+            self.assertEqual(2, len(list(Path(folder).glob('*.json'))))
+            server = self.start_server()
+            outbox = Outbox(sender(server.server_address[1]), spool=folder)
+            self.assertTrue(outbox.close(timeout=10))
+            self.assertEqual(2, len(server.messages))
+            self.assertEqual([], list(Path(folder).glob('*.json')))
+
+    def test_permanent_failures_are_not_retried(self):
+        server = self.start_server()
+        with TemporaryDirectory() as folder:
+            outbox = Outbox(sender(server.server_address[1]), spool=folder,
+                            backoff=60)
+            original = Email('unknown@pynect.com, user@pynect.com',
+                             'Report', 'plain', 'html')
+            outbox.enqueue(original)
+            self.assertTrue(outbox.close(timeout=10))
+            self.assertEqual(1, len(server.messages))
+            [dead] = outbox.dead_letters
+            self.assertEqual(['unknown@pynect.com'], dead.email.to)
+            self.assertEqual(1, dead.attempts)
+            self.assertIn('550', dead.error)
+            self.assertEqual('unknown@pynect.com, user@pynect.com',
+                             original.to)
+            self.assertEqual([], list(Path(folder).glob('*.json')))
+            with self.assertRaises(RuntimeError):
+                outbox.enqueue(email(0))
+            self.assertEqual([], list(Path(folder).glob('*.json')))
+
+    def test_spool_errors_do_not_stop_the_worker(self):
+        with TemporaryDirectory() as folder:
+            outbox = Outbox(sender(closed_port()), spool=folder, retries=2,
+                            backoff=0.01)
+            outbox.enqueue(email(0))
+            # The dead letter folder can't be created
+            Path(folder, 'dead').write_text('')
+            self.assertTrue(outbox.close(timeout=10))
+            self.assertEqual(1, len(outbox.dead_letters))
+            self.assertEqual(0, len(outbox))
@@ -0,0 +1,55 @@
+import random
+import time
+from unittest import TestCase
+
+from pynect.utils import Pipeline
+
+
+def square(value: int) -> int:
+    time.sleep(random.random() / 1000)
+    return value * value
+
+
+def fail(value: int) -> int:
+    if value == 3:
+        raise ValueError(value)
+    return value
+
+
+class TestPipeline(TestCase):
+
+    def test_results_keep_source_order(self):
+        pipeline = Pipeline(range(50), square, workers=4)
+        self.assertEqual([i * i for i in range(50)], list(pipeline))
+        for stage in ('fetch', 'transform', 'write'):
+            self.assertEqual(50, pipeline.metrics[stage].items)
+
+    def test_process_workers(self):
+        pipeline = Pipeline(range(10), square, workers=2, processes=True)
+        self.assertEqual([i * i for i in range(10)], list(pipeline))
+
+    def test_transform_error(self):
+        with self.assertRaises(ValueError):
+            list(Pipeline(range(10), fail))
+
+    def test_source_error(self):
+        def source():
+            yield 1
+            raise KeyError('source')
+
+        with self.assertRaises(KeyError):
+            list(Pipeline(source(), square))
+
+    def test_bounded_in_flight_items(self):
+        fetched = []
+
+        def source():
+            for i in range(100):
+                fetched.append(i)
+                yield i
+
+        pipeline = iter(Pipeline(source(), square, workers=2, queue_size=2))
+        next(pipeline)
+        time.sleep(0.05)
+        self.assertLessEqual(len(fetched), 5)
+        pipeline.close()
@@ -0,0 +1,102 @@
+import time
+from threading import Thread
+from unittest import TestCase
+
+from pynect.utils.pool import ConnectionPool, get_pool, pool_key
+
+
+class FakeConnection:
+
+    def __init__(self, number: int):
+        self.number = number
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeFactory:
+
+    def __init__(self):
+        self.connections = []
+
+    def __call__(self) -> FakeConnection:
+        connection = FakeConnection(len(self.connections))
+        self.connections.append(connection)
+        return connection
+
+
+class TestConnectionPool(TestCase):
+
+    def test_checkout_and_return(self):
+        factory = FakeFactory()
+        pool = ConnectionPool(factory, max_size=2)
+        with pool.connection() as first:
+            with pool.connection() as second:
+                self.assertIsNot(first, second)
+                self.assertEqual(2, pool.stats.in_use)
+        with pool.connection() as connection:
+            # The most recently returned connection is reused
+            self.assertIs(first, connection)
+        stats = pool.stats
+        self.assertEqual((2, 2, 0, 2, 3),
+                         (stats.size, stats.idle, stats.in_use,
+                          stats.created, stats.checkouts))
+
+    def test_failed_connections_are_closed(self):
+        factory = FakeFactory()
+        pool = ConnectionPool(factory, max_size=1)
+        with self.assertRaises(ValueError):
+            with pool.connection():
+                raise ValueError('broken')
+        self.assertTrue(factory.connections[0].closed)
+        self.assertEqual(0, pool.stats.size)
+
+    def test_full_pool_waits_and_times_out(self):
+        pool = ConnectionPool(FakeFactory(), max_size=1)
+        connection = pool.acquire()
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.05)
+        Thread(target=lambda: (time.sleep(0.05),
+                               pool.release(connection))).start()
+        self.assertIs(connection, pool.acquire(timeout=1))
+        self.assertEqual(2, pool.stats.waits)
+
+    def test_eviction_and_health_check(self):
+        factory = FakeFactory()
+        pool = ConnectionPool(factory, idle_timeout=0.05,
+                              health_check=lambda conn: conn.number != 1)
+        pool.release(pool.acquire())
+        time.sleep(0.1)
+        # The idle connection expired, so a new one is opened
+        pool.release(pool.acquire())
+        # The reused connection fails the check and is replaced
+        connection = pool.acquire()
+        self.assertEqual(2, connection.number)
+        self.assertTrue(all(conn.closed for conn in factory.connections[:2]))
+        stats = pool.stats
+        self.assertEqual((1, 1, 1), (stats.size, stats.evicted,
+                                     stats.failed_checks))
+
+    def test_close(self):
+        factory = FakeFactory()
+        pool = ConnectionPool(factory)
+        connections = [pool.acquire() for _ in range(3)]
+        for connection in connections:
+            pool.release(connection)
+        pool.close()
+        self.assertTrue(all(conn.closed for conn in factory.connections))
+        self.assertEqual(0, pool.stats.size)
+
+    def test_pool_key(self):
+        options = dict(server='denodo', uid='user', pwd='secret', timeout=600)
+        key = pool_key(**options)
+        self.assertEqual(key, pool_key(**dict(reversed(options.items()))))
+        self.assertNotIn('secret', key)
+        for change in ({'pwd': 'other'}, {'timeout': 30}):
+            self.assertNotEqual(key, pool_key(**{**options, **change}))
+        pool = get_pool(key, FakeFactory())
+        self.assertIs(pool, get_pool(key, FakeFactory(), max_size=8))
+        self.assertEqual(8, pool.max_size)
+        other = pool_key(**options, driver='other')
+        self.assertIsNot(pool, get_pool(other, FakeFactory()))
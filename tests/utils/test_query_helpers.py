@@ -1,6 +1,13 @@
+import sqlite3
 from unittest import TestCase
 
-from pynect.utils.query_helpers import RestAPIQuery
+from pynect.utils.query_helpers import RestAPIQuery, partition_queries
+
+
+def concat_query(base_url: str, path_params: str, **kwargs) -> str:
+    """Url as RestAPIQuery built it before the templates, by concatenation"""
+    return f'{base_url}/{path_params}?' + '&'.join(
+        [f'{k}={v}' for k, v in kwargs.items()])
 
 
 class TestQueryHelpers(TestCase):
@@ -24,3 +31,50 @@ class TestQueryHelpers(TestCase):
         host = 'google.com'
         query = RestAPIQuery(host)()
         self.assertEqual(host, query)
+        # path_params are only added along with query parameters
+        self.assertEqual(host, RestAPIQuery(host)('api'))
+
+    def test_encoded_and_list_values(self):
+        raq = RestAPIQuery('google.com')
+        url = raq('api', q='a b&c=d', id=[1, 2])
+        self.assertEqual(url, 'google.com/api?q=a%20b%26c%3Dd&id=1&id=2')
+
+    def test_compiled_template(self):
+        raq = RestAPIQuery('google.com', prefix='$')
+        template = raq.compile('api', q='demo')
+        self.assertEqual(raq('api', q='demo', page=2), template(page=2))
+        self.assertEqual(['google.com/api?$q=demo&$page=1',
+                          'google.com/api?$q=demo&$page=2'],
+                         template.page_urls('page', 1, 3))
+        self.assertEqual('google.com?page=1',
+                         RestAPIQuery('google.com').compile().urls(
+                             'page', [1])[0])
+        self.assertEqual('google.com/api?page=1',
+                         RestAPIQuery('google.com').compile('api').urls(
+                             'page', [1])[0])
+
+    def test_compiled_template_matches_concatenation(self):
+        raq = RestAPIQuery('google.com')
+        template = raq.compile('api', q='demo')
+        pages = range(-5, 5000)
+        expected = [concat_query('google.com', 'api', q='demo', page=page)
+                    for page in pages]
+        self.assertEqual(expected, template.page_urls('page', -5, 5000))
+        self.assertEqual(expected, [template(page=page) for page in pages])
+        self.assertEqual(expected, [raq('api', q='demo', page=page)
+                                    for page in pages])
+
+    def test_partition_queries_cover_every_row(self):
+        connection = sqlite3.connect(':memory:')
+        connection.execute('CREATE TABLE items (id INTEGER, tag TEXT)')
+        ids = [-7, -3, -1, 0, 1, 2, 5, 8, None, None]
+        connection.executemany('INSERT INTO items VALUES (?, ?)',
+                               [(i, 'a') for i in ids])
+        query = 'SELECT * FROM items WHERE tag = ?'
+        for ranges in (None, [(None, 0), (0, 5), (5, None)]):
+            partitions = partition_queries(query, 'id', 3, ranges, ('a', ))
+            rows = [row[0] for sql, params in partitions
+                    for row in connection.execute(sql, params)]
+            self.assertEqual(sorted(ids, key=str), sorted(rows, key=str))
+        self.assertEqual(1, len(partition_queries(
+            query, 'id', 3, [(None, None)])))
@@ -0,0 +1,58 @@
+import time
+import tracemalloc
+from unittest import TestCase
+
+from pynect.utils import build_record_class, record_to_dict
+from tests import configure_logger
+
+COLUMNS = [f'column_{i}' for i in range(20)]
+ROWS = [{c: i for c in COLUMNS} for i in range(20000)]
+
+
+class TestRecords(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.logger = configure_logger(cls.__name__)
+
+    def _measure(self, record_class: type) -> tuple[float, int]:
+        tracemalloc.start()
+        records = [record_class(**row) for row in ROWS]
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del records
+        tic = time.perf_counter()
+        data = [record_to_dict(record_class(**row)) for row in ROWS]
+        elapsed = time.perf_counter() - tic
+        self.assertEqual(ROWS, data)
+        return elapsed, peak
+
+    def test_slotted_record(self):
+        record_class = build_record_class('test', ['b', 'a'], slots=True)
+        record = record_class(a=1, b=2, c=3)
+        self.assertEqual({'b': 2, 'a': 1}, record_to_dict(record))
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertEqual({'a': '', 'b': ''}, record_to_dict(record_class()))
+
+    def test_invalid_identifiers_fall_back(self):
+        record_class = build_record_class('test', ['a b'], slots=True)
+        record = record_class(**{'a b': 1})
+        self.assertEqual({'a b': 1}, record_to_dict(record))
+
+    def test_reserved_names_fall_back(self):
+        for column in ('self', '_asdict', 'class', 'parse'):
+            record_class = build_record_class(
+                'test', [column, 'a'], attrs={'parse': None}, slots=True)
+            self.assertNotIn('__slots__', vars(record_class))
+            record = record_class(**{column: 1, 'a': 2})
+            self.assertEqual({column: 1, 'a': 2}, record_to_dict(record))
+
+    def test_benchmark_slotted_record(self):
+        dict_time, dict_peak = self._measure(
+            build_record_class('test', COLUMNS))
+        slots_time, slots_peak = self._measure(
+            build_record_class('test', COLUMNS, slots=True))
+        self.logger.info(
+            f'dict class: {dict_time*1000:.1f}ms {dict_peak/2**20:.1f}MiB\t'
+            f'slots class: {slots_time*1000:.1f}ms {slots_peak/2**20:.1f}MiB')
+        self.assertLess(slots_peak, dict_peak)
@@ -1,10 +1,29 @@
+import re
 import time
 from datetime import datetime, timedelta
-from unittest import TestCase
+from itertools import product
+from unittest import TestCase, mock
 
-from pynect.utils import calc_iterations, is_date_older_than_delta, split_list
+from pynect.utils import (calc_iterations, camel_to_snake,
+                          camel_to_snake_keys, is_date_older_than_delta,
+                          snake_case_records, split_list)
+from pynect.utils import utils
 from tests import configure_logger
 
+PARTS = ['', ' ', '_', 'id', 'ID', 'Id', 'customer', 'Account', 'HTTP',
+         'Response2', '9x', 'aB']
+KEYS = [''.join(parts) for parts in product(PARTS, repeat=3)]
+
+
+def legacy_camel_to_snake(name) -> str:
+    """camel_to_snake before the patterns were compiled and cached"""
+    pattern1 = re.compile(r'(\s+)')
+    pattern2 = re.compile(r'([^_])([A-Z][a-z]+)')
+    pattern3 = re.compile(r'([a-z0-9])([A-Z])')
+    name = pattern1.sub('_', name.strip())
+    name = pattern2.sub(r'\1_\2', name)
+    return pattern3.sub(r'\1_\2', name).lower()
+
 
 class TestUtils(TestCase):
     date: datetime
@@ -49,3 +68,43 @@ class TestUtils(TestCase):
         expected_result = [1, 2, 3]
         result = next(split_list(initial_records, 3))
         self.assertEqual(expected_result, result)
+
+    def test_camel_to_snake(self):
+        self.assertEqual('customer_account_id', camel_to_snake(
+            ' customerAccount ID'))
+        self.assertEqual('http_response_code',
+                         camel_to_snake('HTTPResponseCode'))
+        self.assertEqual(['first_name', 'last_name'],
+                         camel_to_snake_keys(['firstName', 'LastName']))
+        records = snake_case_records([{'firstName': 'a', 'Age': 1},
+                                      {'firstName': 'b', 'Age': 2},
+                                      {'lastName': 'c'}])
+        self.assertEqual([{'first_name': 'a', 'age': 1},
+                          {'first_name': 'b', 'age': 2},
+                          {'last_name': 'c'}], list(records))
+        records = snake_case_records(
+            ({f'key{i % 5}': i} for i in range(20)), max_layouts=2)
+        self.assertEqual([{f'key{i % 5}': i} for i in range(20)],
+                         list(records))
+
+    def test_memoized_camel_to_snake(self):
+        expected = [legacy_camel_to_snake(key) for key in KEYS]
+        self.assertEqual(expected,
+                         [camel_to_snake.__wrapped__(key) for key in KEYS])
+        camel_to_snake.cache_clear()
+        # The second pass is answered by the cache
+        for _ in range(2):
+            self.assertEqual(expected, camel_to_snake_keys(KEYS))
+        info = camel_to_snake.cache_info()
+        self.assertLessEqual(info.currsize, info.maxsize)
+        self.assertGreater(info.hits, 0)
+
+    def test_snake_case_records_layouts_are_bounded(self):
+        records = [{f'key{i % 3}': i} for i in range(30)]
+        for max_layouts, conversions in ((3, 3), (2, 30)):
+            convert = mock.Mock(wraps=utils.camel_to_snake_keys)
+            with mock.patch.object(utils, 'camel_to_snake_keys', convert):
+                self.assertEqual(records, list(snake_case_records(
+                    records, max_layouts=max_layouts)))
+            # Three layouts in turn never hit a cache of two
+            self.assertEqual(conversions, convert.call_count)
@@ -0,0 +1,75 @@
+import gzip
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, skipIf
+
+from pynect.utils import dump_data_to_file, get_writer
+from pynect.utils.columnar import pa
+
+RECORDS = [{'id': i, 'name': f'record {i}'} for i in range(10)]
+
+
+class TestWriters(TestCase):
+
+    def test_json_writer(self):
+        with TemporaryDirectory() as folder:
+            path = dump_data_to_file('test', Path(folder), RECORDS)
+            self.assertEqual(RECORDS, json.loads(Path(path).read_text()))
+
+    def test_ndjson_writer(self):
+        with TemporaryDirectory() as folder:
+            path = dump_data_to_file('test', Path(folder), RECORDS, 'ndjson')
+            lines = Path(path).read_text().splitlines()
+        self.assertTrue(str(path).endswith('.ndjson'))
+        self.assertEqual(RECORDS, [json.loads(line) for line in lines])
+
+    def test_gzip_ndjson_writer(self):
+        with TemporaryDirectory() as folder:
+            path = Path(folder, 'test.ndjson.gz')
+            with get_writer('ndjson.gz', path) as writer:
+                writer.write_many(RECORDS)
+            with gzip.open(path, 'rt') as file:
+                data = [json.loads(line) for line in file]
+        self.assertEqual(RECORDS, data)
+
+    @skipIf(pa is None, 'pyarrow is not installed')
+    def test_parquet_writer(self):
+        import pyarrow.parquet as pq
+        with TemporaryDirectory() as folder:
+            path = Path(folder, 'test.parquet')
+            with get_writer('parquet', path, batch_size=3) as writer:
+                writer.write_many(RECORDS)
+            self.assertEqual(RECORDS, pq.read_table(path).to_pylist())
+
+    @skipIf(pa is None, 'pyarrow is not installed')
+    def test_parquet_null_columns(self):
+        import pyarrow.parquet as pq
+        records = [{'id': i, 'note': None if i < 4 else f'note {i}',
+                    'empty': None} for i in range(8)]
+        with TemporaryDirectory() as folder:
+            path = Path(folder, 'test.parquet')
+            with get_writer('parquet', path, batch_size=2) as writer:
+                writer.write_many(records)
+            table = pq.read_table(path)
+            self.assertEqual(records, table.to_pylist())
+            self.assertEqual(pa.string(), table.schema.field('note').type)
+            schema = pa.schema([('id', pa.int32()), ('note', pa.string()),
+                                ('empty', pa.float64())])
+            with get_writer('parquet', path, batch_size=2,
+                            schema=schema) as writer:
+                writer.write_many(records)
+            self.assertEqual(schema, pq.read_table(path).schema)
+
+    def test_failed_write_leaves_no_file(self):
+        with TemporaryDirectory() as folder:
+            with self.assertRaises(RuntimeError):
+                with get_writer('ndjson', Path(folder, 'test.ndjson')) as w:
+                    w.write(RECORDS[0])
+                    raise RuntimeError
+            self.assertEqual([], list(Path(folder).iterdir()))
+
+    def test_invalid_format(self):
+        with TemporaryDirectory() as folder:
+            self.assertRaises(ValueError, get_writer, 'xml',
+                              Path(folder, 'test.xml'))